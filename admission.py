@@ -0,0 +1,274 @@
+"""
+Toelating van upstream-fetches naar psalmboek.nl.
+
+- `ConcurrencyLimiter`: hooguit `limit` fetches tegelijk, de rest wacht in een begrensde
+  FIFO-wachtrij. Wacht een fetch langer dan zijn budget (de request-deadline, zie
+  resilience.deadline, of `max_wait`), dan volgt een 503.
+- Load shedding: als de verwachte wachttijd (wachtrij / limit × mediane upstream-latency)
+  het budget al overschrijdt, wordt er niet eens gewacht maar direct een 503 gegeven.
+- `ClientLimiter`: token bucket per client (API-key of IP), alleen voor fetches die echt
+  naar upstream gaan. Cache-hits komen hier nooit langs en worden dus nooit afgeknepen.
+
+Wie de client is, zet de API-middleware in de contextvar `CLIENT`; achtergrondwerk
+(opwarmen, prefetch, stale-while-revalidate) heeft geen client en telt alleen mee voor de
+concurrency. Een afwijzing is een `Rejected` met statuscode (429/503) en Retry-After.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import math
+import threading
+import time
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from typing import AsyncIterator, Deque, Dict, Iterator, Optional
+
+import resilience
+
+CLIENT: ContextVar[Optional[str]] = ContextVar("admission_client", default=None)
+
+QUEUE_FULL, QUEUE_TIMEOUT = "queue_full", "queue_timeout"
+PREDICTED_WAIT, RATE_LIMITED = "predicted_wait", "rate_limited"
+
+
+class Rejected(RuntimeError):
+    """Fetch niet toegelaten; `status_code` 429 (client te snel) of 503 (upstream vol)."""
+
+    def __init__(self, status_code: int, reason: str, retry_after: float, message: str):
+        super().__init__(message)
+        self.status_code = status_code
+        self.reason = reason
+        self.retry_after = retry_after
+
+    @property
+    def headers(self) -> Dict[str, str]:
+        return {"Retry-After": str(max(1, math.ceil(self.retry_after))), "Cache-Control": "no-store"}
+
+
+class TokenBucket:
+    __slots__ = ("rate", "burst", "tokens", "updated")
+
+    def __init__(self, rate: float, burst: float, now: float):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = now
+
+    def take(self, now: float) -> float:
+        """0 als er een token was, anders het aantal seconden tot het volgende token."""
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+
+class ClientLimiter:
+    def __init__(self, rate: float, burst: int, *, max_clients: int = 10000):
+        self.rate = rate
+        self.burst = burst
+        self.max_clients = max_clients
+        self._buckets: "OrderedDict[str, TokenBucket]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def take(self, client: str) -> float:
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._buckets.get(client)
+            if bucket is None:
+                bucket = self._buckets[client] = TokenBucket(self.rate, self.burst, now)
+                # Minst recent geziene clients eerst weg (een volle bucket is toch de begintoestand).
+                while len(self._buckets) > self.max_clients:
+                    self._buckets.popitem(last=False)
+            else:
+                self._buckets.move_to_end(client)
+            return bucket.take(now)
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+
+class _Waiter:
+    __slots__ = ("event", "loop", "future", "granted")
+
+    def __init__(self, event=None, loop=None, future=None):
+        self.event: Optional[threading.Event] = event
+        self.loop: Optional[asyncio.AbstractEventLoop] = loop
+        self.future: Optional[asyncio.Future] = future
+        self.granted = False
+
+
+def _grant(future: asyncio.Future) -> None:
+    if not future.done():
+        future.set_result(None)
+
+
+class ConcurrencyLimiter:
+    """FIFO-semafoor voor threads én event loops; een vrijgekomen plek gaat direct naar de volgende."""
+
+    def __init__(self, limit: int, max_queue: int = 32):
+        self.limit = limit
+        self.max_queue = max_queue
+        self.active = 0
+        self._waiters: Deque[_Waiter] = deque()
+        self._lock = threading.Lock()
+
+    @property
+    def queued(self) -> int:
+        return len(self._waiters)
+
+    def predicted_wait(self, latency: Optional[float]) -> float:
+        """Geschatte wachttijd voor een nieuwe fetch; 0 bij een vrije plek of zonder latencydata."""
+        with self._lock:
+            if self.active < self.limit or latency is None:
+                return 0.0
+            return (len(self._waiters) // self.limit + 1) * latency
+
+    def _enter(self, waiter: _Waiter) -> bool:
+        with self._lock:
+            if self.active < self.limit and not self._waiters:
+                self.active += 1
+                return True
+            if len(self._waiters) >= self.max_queue:
+                raise Rejected(503, QUEUE_FULL, 1.0, "Wachtrij naar psalmboek.nl is vol; probeer het zo opnieuw.")
+            self._waiters.append(waiter)
+            return False
+
+    def _abandon(self, waiter: _Waiter) -> bool:
+        """Haalt een wachtende uit de rij; False als hij intussen toch een plek kreeg."""
+        with self._lock:
+            if waiter.granted:
+                return False
+            self._waiters.remove(waiter)
+            return True
+
+    def release(self) -> None:
+        with self._lock:
+            while self._waiters:
+                waiter = self._waiters.popleft()
+                waiter.granted = True
+                if waiter.event is not None:
+                    waiter.event.set()
+                    return
+                try:
+                    waiter.loop.call_soon_threadsafe(_grant, waiter.future)
+                    return
+                except RuntimeError:  # event loop al gesloten: volgende wachtende
+                    continue
+            self.active -= 1
+
+    @staticmethod
+    def _timed_out(budget: float) -> Rejected:
+        return Rejected(503, QUEUE_TIMEOUT, budget, "Wachten op psalmboek.nl duurde te lang; probeer het zo opnieuw.")
+
+    def acquire(self, budget: float) -> None:
+        waiter = _Waiter(event=threading.Event())
+        if self._enter(waiter):
+            return
+        if not waiter.event.wait(max(0.0, budget)) and self._abandon(waiter):
+            raise self._timed_out(budget)
+
+    async def aacquire(self, budget: float) -> None:
+        loop = asyncio.get_running_loop()
+        waiter = _Waiter(loop=loop, future=loop.create_future())
+        if self._enter(waiter):
+            return
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter.future), max(0.0, budget))
+        except asyncio.TimeoutError:
+            if self._abandon(waiter):
+                raise self._timed_out(budget) from None
+        except asyncio.CancelledError:
+            if not self._abandon(waiter):
+                self.release()
+            raise
+
+
+class Admission:
+    def __init__(
+        self,
+        limiter: Optional[ConcurrencyLimiter] = None,
+        clients: Optional[ClientLimiter] = None,
+        *,
+        max_wait: float = 5.0,
+        latency: Optional[resilience.LatencyTracker] = None,
+    ):
+        self.limiter = limiter
+        self.clients = clients
+        self.max_wait = max_wait
+        self.latency = latency
+        self._lock = threading.Lock()
+        self.counts = {"admitted": 0, QUEUE_FULL: 0, QUEUE_TIMEOUT: 0, PREDICTED_WAIT: 0, RATE_LIMITED: 0}
+
+    def _count(self, key: str) -> None:
+        with self._lock:
+            self.counts[key] += 1
+
+    def _budget(self) -> float:
+        """Controleert de client en de verwachte wachttijd; geeft hoe lang er gewacht mag worden."""
+        client = CLIENT.get()
+        if client is not None and self.clients is not None:
+            retry_after = self.clients.take(client)
+            if retry_after:
+                self._count(RATE_LIMITED)
+                raise Rejected(429, RATE_LIMITED, retry_after, "Te veel verzoeken die psalmboek.nl raken; rustig aan.")
+        budget = self.max_wait
+        remaining = resilience.remaining()
+        if remaining is not None:
+            budget = min(budget, remaining)
+        if self.limiter is not None:
+            predicted = self.limiter.predicted_wait(self.latency.percentile(50) if self.latency is not None else None)
+            if predicted > budget:
+                self._count(PREDICTED_WAIT)
+                raise Rejected(503, PREDICTED_WAIT, predicted, "psalmboek.nl is druk; probeer het zo opnieuw.")
+        return budget
+
+    def _rejected(self, exc: Rejected) -> Rejected:
+        self._count(exc.reason)
+        return exc
+
+    @contextmanager
+    def slot(self) -> Iterator[None]:
+        budget = self._budget()
+        if self.limiter is None:
+            self._count("admitted")
+            yield
+            return
+        try:
+            self.limiter.acquire(budget)
+        except Rejected as exc:
+            raise self._rejected(exc) from None
+        self._count("admitted")
+        try:
+            yield
+        finally:
+            self.limiter.release()
+
+    @asynccontextmanager
+    async def aslot(self) -> AsyncIterator[None]:
+        budget = self._budget()
+        if self.limiter is None:
+            self._count("admitted")
+            yield
+            return
+        try:
+            await self.limiter.aacquire(budget)
+        except Rejected as exc:
+            raise self._rejected(exc) from None
+        self._count("admitted")
+        try:
+            yield
+        finally:
+            self.limiter.release()
+
+    def stats(self) -> Dict[str, object]:
+        with self._lock:
+            stats: Dict[str, object] = dict(self.counts)
+        if self.limiter is not None:
+            stats.update(limit=self.limiter.limit, in_flight=self.limiter.active, queued=self.limiter.queued)
+        if self.clients is not None:
+            stats["clients"] = len(self.clients)
+        return stats
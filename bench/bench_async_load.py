@@ -0,0 +1,87 @@
+"""
+Loadtest: blijft de latency van cache-hits vlak terwijl upstream-calls traag zijn?
+
+Draait de FastAPI-app in-process (ASGI), warmt één psalm op en vuurt daarna tegelijk
+trage cold-requests (andere psalmen) en snelle cache-hits af.
+
+    python bench/bench_async_load.py --upstream-delay 2.0 --cold 60 --hits 500
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import pathlib
+import statistics
+import sys
+import time
+
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+import httpx  # noqa: E402
+
+import main  # noqa: E402
+from cache import TTLCache  # noqa: E402
+from psalms import live_client  # noqa: E402
+
+PAGE = '<div id="psalmkolom2">' + "".join(
+    f"<p><strong>Vers {n}</strong><br />regel een<br />regel twee</p>" for n in range(1, 9)
+) + "</div>"
+
+
+def _percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+async def _timed(http, query, bucket):
+    started = time.perf_counter()
+    response = await http.get("/api/psalm/lookup", params={"query": query})
+    bucket.append(time.perf_counter() - started)
+    return response.status_code
+
+
+async def run(upstream_delay: float, cold: int, hits: int) -> None:
+    async def slow_fetch(psalm: int) -> str:
+        await asyncio.sleep(0.0 if psalm == 23 else upstream_delay)
+        return PAGE
+
+    main.client = live_client
+    live_client._cache = TTLCache(600)
+    live_client._afetch_overview = slow_fetch  # type: ignore[method-assign]
+
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as http:
+        await http.get("/api/psalm/lookup", params={"query": "ps 23:1-3"})
+
+        baseline: list[float] = []
+        await asyncio.gather(*(_timed(http, "ps 23:1-3", baseline) for _ in range(hits)))
+
+        cold_latency: list[float] = []
+        cold_tasks = [
+            asyncio.create_task(_timed(http, f"ps {1 + (i % 149) + (i % 149 >= 22)}:1", cold_latency))
+            for i in range(cold)
+        ]
+        await asyncio.sleep(0.01)
+        loaded: list[float] = []
+        await asyncio.gather(*(_timed(http, "ps 23:1-3", loaded) for _ in range(hits)))
+        await asyncio.gather(*cold_tasks)
+
+    for label, samples in (("cache-hit (rustig)", baseline), ("cache-hit (onder last)", loaded), ("cold", cold_latency)):
+        print(
+            f"{label:24s} n={len(samples):4d} "
+            f"p50={statistics.median(samples) * 1000:7.2f}ms "
+            f"p95={_percentile(samples, 95) * 1000:7.2f}ms "
+            f"p99={_percentile(samples, 99) * 1000:7.2f}ms"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--upstream-delay", type=float, default=1.0)
+    parser.add_argument("--cold", type=int, default=60)
+    parser.add_argument("--hits", type=int, default=300)
+    args = parser.parse_args()
+    asyncio.run(run(args.upstream_delay, args.cold, args.hits))
@@ -0,0 +1,144 @@
+"""
+Coldstart-benchmark: importtijd van de app en tijd van processtart tot de eerste antwoorden.
+
+1. Import-rapport: `python -X importtime -c "import main"`, samengevat per top-level pakket
+   (cumulatief) en de duurste modules op eigen tijd, plus welke zware afhankelijkheden
+   (httpx, h2, bs4) al bij het importeren geladen worden.
+2. Start: uvicorn als subprocess tegen een lokale psalmboek.nl-stub; gemeten wordt de tijd tot
+   de eerste 200 op /healthz en daarna tot de eerste 200 op /api/psalm/lookup (koude psalm).
+   Opwarmen en prefetch staan uit, zodat de lookup echt de eerste upstream-fetch is.
+
+    python bench/bench_cold_start.py --runs 5 --upstream-delay 0.05
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import pathlib
+import re
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from collections import defaultdict
+from typing import Dict, List, Tuple
+
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / "tests"))
+
+from psalmboek_stub import PsalmboekStub, fixture_pages  # noqa: E402
+
+_IMPORTTIME = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$")
+HEAVY = ("httpx", "h2", "httpcore", "bs4")
+
+
+def import_report(env: Dict[str, str], top: int) -> None:
+    code = "import sys, main; print(','.join(m for m in %r if m in sys.modules))" % (HEAVY,)
+    out = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code], cwd=ROOT, env=env, capture_output=True, text=True, check=True
+    )
+    modules: List[Tuple[int, int, int, str]] = []
+    for line in out.stderr.splitlines():
+        match = _IMPORTTIME.match(line)
+        if match:
+            modules.append((int(match[1]), int(match[2]), len(match[3]) // 2, match[4]))
+    # importtime meldt kinderen vóór hun ouder: de diepte-1-regels vlak vóór "main" zijn de
+    # directe imports van de app, gegroepeerd per top-level pakket.
+    packages: Dict[str, int] = defaultdict(int)
+    children: List[Tuple[str, int]] = []
+    main_total = 0
+    for _, cumulative, depth, name in modules:
+        if depth == 1:
+            children.append((name.split(".")[0], cumulative))
+        elif depth == 0:
+            if name == "main":
+                main_total = cumulative
+                for package, micros in children:
+                    packages[package] += micros
+            children = []
+
+    print(f"import main (cumulatief)      : {main_total / 1000:8.1f} ms  (-X importtime telt overhead mee)")
+    print("directe imports van main, per pakket:")
+    for name, micros in sorted(packages.items(), key=lambda item: -item[1])[:top]:
+        print(f"  {name:28s}: {micros / 1000:8.1f} ms")
+    print("duurste modules (eigen tijd):")
+    for self_us, _, _, name in sorted(modules, reverse=True)[:top]:
+        print(f"  {name:28s}: {self_us / 1000:8.1f} ms")
+    print(f"zwaar al geladen na import    : {out.stdout.strip() or '-'}")
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _wait_for(url: str, deadline: float) -> float:
+    while time.perf_counter() < deadline:
+        try:
+            with urllib.request.urlopen(url, timeout=5) as response:
+                if response.status == 200:
+                    response.read()
+                    return time.perf_counter()
+        except (urllib.error.URLError, ConnectionError):
+            time.sleep(0.005)
+    raise TimeoutError(url)
+
+
+def start_once(env: Dict[str, str], query: str) -> Tuple[float, float]:
+    port = _free_port()
+    started = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=ROOT,
+        env=env,
+    )
+    try:
+        base = f"http://127.0.0.1:{port}"
+        healthy = _wait_for(base + "/healthz", started + 30)
+        lookup = _wait_for(f"{base}/api/psalm/lookup?{urllib.parse.urlencode({'query': query})}", healthy + 30)
+        return healthy - started, lookup - started
+    finally:
+        server.terminate()
+        server.wait(10)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--upstream-delay", type=float, default=0.05)
+    parser.add_argument("--query", default="psalm 23 vers 1")
+    parser.add_argument("--top", type=int, default=12)
+    parser.add_argument("--skip-imports", action="store_true")
+    args = parser.parse_args()
+
+    with PsalmboekStub(fixture_pages(), delay=args.upstream_delay) as stub:
+        env = {
+            **os.environ,
+            "PSALM_SOURCE_BASE": stub.base_url,
+            "WARMUP_PSALMS": "",
+            "POPULARITY_TOP_N": "0",
+            "PREFETCH_INTERVAL_SECONDS": "0",
+        }
+        if not args.skip_imports:
+            import_report(env, args.top)
+            print()
+        healthz, lookup = [], []
+        for _ in range(args.runs):
+            first_health, first_lookup = start_once(env, args.query)
+            healthz.append(first_health)
+            lookup.append(first_lookup)
+        print(f"runs (mediaan)                : {args.runs}")
+        print(f"start → eerste /healthz       : {statistics.median(healthz) * 1000:8.1f} ms")
+        print(f"start → eerste lookup         : {statistics.median(lookup) * 1000:8.1f} ms")
+        print(f"upstream requests             : {stub.request_count}")
+
+
+if __name__ == "__main__":
+    main()
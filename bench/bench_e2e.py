@@ -0,0 +1,182 @@
+"""
+End-to-end benchmark: FastAPI-app (in-process, ASGI) → PsalmboekClient → lokale psalmboek.nl-stub.
+
+De stub serveert opgenomen psalmen.php-pagina's (tests/fixtures, verder gegenereerd) en kan
+latency, 5xx-fouten en 403's injecteren. De querymix bestaat uit de psalm-utterances uit
+tests/golden_cases.json plus een lange staart over alle psalmen, gewogen naar populariteit
+(Zipf). Per scenario (cold cache, daarna warm) worden p50/p95/p99, doorvoer, fouten,
+upstream-requests en cache-hitratio gerapporteerd en als JSON bewaard in bench/results/.
+
+    python bench/bench_e2e.py --requests 2000 --concurrency 32 --upstream-delay 0.05
+    python bench/bench_e2e.py --compare bench/results/e2e-20240101-120000.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import pathlib
+import platform
+import random
+import subprocess
+import sys
+import time
+from typing import Any, Dict, List, Optional
+
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / "tests"))
+
+import httpx  # noqa: E402
+
+import main  # noqa: E402
+from config import settings  # noqa: E402
+from psalm_client import PsalmboekClient  # noqa: E402
+from psalmboek_stub import PsalmboekStub, fixture_pages  # noqa: E402
+
+RESULTS_DIR = ROOT / "bench" / "results"
+
+
+def query_mix(seed: int, zipf: float) -> tuple:
+    """(queries, gewichten): golden utterances eerst (populairst), dan de lange staart."""
+    cases = json.loads((ROOT / "tests" / "golden_cases.json").read_text(encoding="utf-8"))
+    queries = [case["utterance"] for case in cases if case["expected_intent"] == "psalm_lookup_1773"]
+    tail = list(range(1, 151))
+    random.Random(seed).shuffle(tail)
+    queries += [f"psalm {psalm}:1-2" for psalm in tail]
+    weights = [1 / (rank**zipf) for rank in range(1, len(queries) + 1)]
+    return queries, weights
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))] if ordered else 0.0
+
+
+async def run_scenario(http: httpx.AsyncClient, queries: List[str], concurrency: int) -> Dict[str, Any]:
+    latencies: List[float] = []
+    statuses: Dict[int, int] = {}
+    pending = iter(queries)
+
+    async def worker() -> None:
+        for query in pending:
+            started = time.perf_counter()
+            response = await http.get("/api/psalm/lookup", params={"query": query})
+            latencies.append(time.perf_counter() - started)
+            statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    return {
+        "requests": len(latencies),
+        "seconds": round(elapsed, 4),
+        "throughput_rps": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(percentile(latencies, 50) * 1000, 3),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 3),
+        "errors": sum(count for status, count in statuses.items() if status >= 500),
+        "statuses": {str(status): count for status, count in sorted(statuses.items())},
+    }
+
+
+def _cache_delta(before: Dict[str, int], after: Dict[str, int]) -> Dict[str, Any]:
+    hits = after["hits"] + after["stale_hits"] - before["hits"] - before["stale_hits"]
+    misses = after["misses"] - before["misses"]
+    return {"hits": hits, "misses": misses, "hit_ratio": round(hits / (hits + misses), 4) if hits + misses else 0.0}
+
+
+async def run(args: argparse.Namespace) -> Dict[str, Any]:
+    queries, weights = query_mix(args.seed, args.zipf)
+    sample = random.Random(args.seed).choices(queries, weights=weights, k=args.requests)
+
+    stub = PsalmboekStub(
+        fixture_pages(),
+        delay=args.upstream_delay,
+        jitter=args.upstream_jitter,
+        error_rate=args.error_rate,
+        forbidden_rate=args.forbidden_rate,
+        seed=args.seed,
+    )
+    scenarios: Dict[str, Any] = {}
+    with stub:
+        client = PsalmboekClient(stub.base_url, settings.PSALM_BERIJMING, cache_seconds=args.cache_seconds)
+        main.client = client
+        transport = httpx.ASGITransport(app=main.app)
+        try:
+            async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=60) as http:
+                for name in ("cold", "warm"):
+                    stub.reset_counts()
+                    before = client._cache.stats()
+                    result = await run_scenario(http, sample, args.concurrency)
+                    result["upstream_requests"] = stub.request_count
+                    result["upstream_statuses"] = {str(k): v for k, v in sorted(stub.statuses.items())}
+                    result["cache"] = _cache_delta(before, client._cache.stats())
+                    scenarios[name] = result
+        finally:
+            await client.aclose()
+
+    return {
+        "benchmark": "e2e",
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "git_commit": _git_commit(),
+        "python": platform.python_version(),
+        "config": {key: value for key, value in vars(args).items() if key not in ("out", "compare")},
+        "scenarios": scenarios,
+    }
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def report(results: Dict[str, Any], baseline: Optional[Dict[str, Any]] = None) -> None:
+    print(f"{'scenario':8s} {'n':>6s} {'req/s':>9s} {'p50 ms':>9s} {'p95 ms':>9s} {'p99 ms':>9s} {'fout':>5s} {'upstream':>9s} {'hit%':>6s}")
+    for name, row in results["scenarios"].items():
+        print(
+            f"{name:8s} {row['requests']:6d} {row['throughput_rps']:9.1f} {row['p50_ms']:9.2f} {row['p95_ms']:9.2f} "
+            f"{row['p99_ms']:9.2f} {row['errors']:5d} {row['upstream_requests']:9d} {row['cache']['hit_ratio'] * 100:6.1f}"
+        )
+        old = (baseline or {}).get("scenarios", {}).get(name)
+        if old:
+            deltas = " ".join(
+                f"{key}={(row[key] - old[key]) / old[key] * 100:+.1f}%"
+                for key in ("throughput_rps", "p50_ms", "p95_ms", "p99_ms")
+                if old[key]
+            )
+            print(f"{'':8s} t.o.v. {baseline.get('git_commit') or 'baseline'}: {deltas}")
+
+
+def main_cli() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--upstream-delay", type=float, default=0.05, help="vaste upstream-latency (s)")
+    parser.add_argument("--upstream-jitter", type=float, default=0.05, help="extra uniforme latency 0..j (s)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="kans op een 503 van de stub")
+    parser.add_argument("--forbidden-rate", type=float, default=0.0, help="kans op een 403 van de stub")
+    parser.add_argument("--cache-seconds", type=int, default=600)
+    parser.add_argument("--zipf", type=float, default=1.1, help="populariteitsverdeling van de querymix")
+    parser.add_argument("--seed", type=int, default=1773)
+    parser.add_argument("--out", help="pad voor de JSON-resultaten (standaard bench/results/e2e-<tijd>.json)")
+    parser.add_argument("--compare", help="eerder resultaatbestand om mee te vergelijken")
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args))
+    out = pathlib.Path(args.out) if args.out else RESULTS_DIR / f"e2e-{time.strftime('%Y%m%d-%H%M%S')}.json"
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps(results, indent=2), encoding="utf-8")
+
+    baseline = json.loads(pathlib.Path(args.compare).read_text(encoding="utf-8")) if args.compare else None
+    report(results, baseline)
+    print(f"resultaten: {out}")
+
+
+if __name__ == "__main__":
+    main_cli()
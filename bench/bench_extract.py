@@ -0,0 +1,52 @@
+"""
+Micro-benchmark van de extractie-engines per psalmpagina.
+
+Gebruikt de fixtures in tests/fixtures en een gegenereerde psalm 119 (88 verzen).
+
+    python bench/bench_extract.py --repeat 200
+"""
+
+from __future__ import annotations
+
+import argparse
+import pathlib
+import sys
+import timeit
+
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / "tests"))
+
+from psalm_extract import ENGINES  # noqa: E402
+from psalmboek_stub import render_page  # noqa: E402
+
+
+def pages() -> dict:
+    found = {
+        path.stem: path.read_text(encoding="utf-8")
+        for path in sorted((ROOT / "tests" / "fixtures").glob("psalmen_*.html"))
+    }
+    found["psalmen_119_gegenereerd"] = render_page(
+        {vers: "\n".join(f"Regel {n} van vers {vers}, met &#39;t en &eacute;" for n in range(8)) for vers in range(1, 89)}
+    )
+    return found
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    print(f"{'pagina':28s} {'KiB':>6s} " + " ".join(f"{name:>12s}" for name in ENGINES) + "   versnelling")
+    for name, html in pages().items():
+        timings = {}
+        for engine, extract in ENGINES.items():
+            extract(html)
+            timings[engine] = min(timeit.repeat(lambda: extract(html), number=args.repeat, repeat=3)) / args.repeat
+        speedup = timings["bs4"] / timings["fast"]
+        cells = " ".join(f"{timings[engine] * 1e6:10.1f}µs" for engine in ENGINES)
+        print(f"{name:28s} {len(html) / 1024:6.1f} {cells}   {speedup:6.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""
+Cache-hit-latency terwijl er tegelijk koude psalmpagina's geparsed worden, met en zonder
+extractie-pool.
+
+Draait de FastAPI-app in-process (ASGI). Upstream levert direct een grote synthetische
+pagina (standaard ~400 KB, orde psalm 119 met navigatie), zodat de extractie het werk is.
+Per ronde lopen `--cold` koude lookups naast `--hits` cache-hits op een warme psalm.
+
+    python bench/bench_extract_pool.py --workers 2 --cold 40 --hits 400
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import pathlib
+import statistics
+import sys
+import time
+
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+import httpx  # noqa: E402
+
+import main  # noqa: E402
+from cache import TTLCache  # noqa: E402
+from extract_pool import ExtractionPool  # noqa: E402
+from psalm_extract import ENGINES, get_engine  # noqa: E402
+from psalms import live_client  # noqa: E402
+from response_cache import ResponseCache  # noqa: E402
+
+
+def _page(kilobytes: int) -> str:
+    lines = "<br />".join(f"regel {i} met wat tekst erin" for i in range(8))
+    verse = "<p><strong>Vers {n}</strong><br />" + lines + "</p>"
+    links = "".join(f'<li><a href="/psalmen.php?p={i}">Psalm {i}</a></li>' for i in range(1, 151))
+    navigation = f"<ul>{links}</ul>"
+    body = "".join(verse.format(n=n) for n in range(1, 177))
+    filler = navigation * max(1, (kilobytes * 1024 - len(body)) // len(navigation))
+    return f'<html><body>{filler}<div id="psalmkolom2">{body}</div></body></html>'
+
+
+def _percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+async def _timed(http, query, bucket):
+    started = time.perf_counter()
+    response = await http.get("/api/psalm/lookup", params={"query": query})
+    bucket.append(time.perf_counter() - started)
+    return response.status_code
+
+
+async def _round(page: str, cold: int, hits: int) -> list:
+    async def fetch(psalm: int, previous=None) -> str:
+        await asyncio.sleep(0.001)
+        return page
+
+    # Ook de validators leeg, anders herkent de client de HTML van een vorige ronde en parset niet.
+    live_client._cache = TTLCache(600)
+    live_client._validators = TTLCache(600)
+    live_client._afetch_overview = fetch  # type: ignore[method-assign]
+    # De response-cache zou de hits al vóór de client afvangen; hier gaat het om de client.
+    main.response_cache = ResponseCache(0)
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as http:
+        await http.get("/api/psalm/lookup", params={"query": "ps 23:1-3"})
+        latencies: list = []
+        cold_tasks = [
+            asyncio.create_task(_timed(http, f"ps {1 + (i % 149) + (i % 149 >= 22)}:1", [])) for i in range(cold)
+        ]
+
+        async def hit_loop():
+            for _ in range(hits):
+                await _timed(http, "ps 23:1-3", latencies)
+                await asyncio.sleep(0)
+
+        await asyncio.gather(hit_loop(), *cold_tasks)
+    return latencies
+
+
+def run(workers: int, kilobytes: int, cold: int, hits: int, engine: str) -> None:
+    main.client = live_client
+    live_client.extraction_engine = engine
+    live_client._extract = get_engine(engine)
+    main.max_verses = None
+    page = _page(kilobytes)
+    print(
+        f"pagina {len(page) // 1024} KB, engine {engine}, {cold} koude lookups naast {hits} cache-hits, "
+        f"{os.cpu_count()} CPU's"
+    )
+    pool = ExtractionPool(workers, engine, min_bytes=0)
+    pool.start()
+    try:
+        for label, extraction_pool in (("zonder pool", None), (f"pool ({workers} workers)", pool)):
+            live_client.extraction_pool = extraction_pool
+            started = time.perf_counter()
+            samples = asyncio.run(_round(page, cold, hits))
+            print(
+                f"{label:20s} {time.perf_counter() - started:6.2f}s  "
+                f"cache-hit p50={statistics.median(samples) * 1000:7.2f}ms "
+                f"p95={_percentile(samples, 95) * 1000:7.2f}ms "
+                f"p99={_percentile(samples, 99) * 1000:7.2f}ms"
+            )
+    finally:
+        live_client.extraction_pool = None
+        pool.shutdown()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--kilobytes", type=int, default=400)
+    parser.add_argument("--cold", type=int, default=40)
+    parser.add_argument("--hits", type=int, default=400)
+    parser.add_argument("--engine", default="fast", choices=sorted(ENGINES))
+    args = parser.parse_args()
+    run(args.workers, args.kilobytes, args.cold, args.hits, args.engine)
@@ -0,0 +1,67 @@
+"""
+Micro-benchmark van parse_psalm_reference: koud (memo leeg) en warm (gememoiseerd).
+
+Gebruikt de psalm-utterances uit tests/golden_cases.json. Met --baseline kan een oudere
+psalm_parser.py ernaast gemeten worden, bijvoorbeeld:
+
+    git show f6c6cb7:psalm_parser.py > /tmp/psalm_parser_oud.py
+    python bench/bench_parser.py --baseline /tmp/psalm_parser_oud.py
+"""
+
+from __future__ import annotations
+
+import argparse
+import importlib.util
+import json
+import pathlib
+import sys
+import timeit
+
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+import psalm_parser  # noqa: E402
+
+
+def utterances() -> list:
+    cases = json.loads((ROOT / "tests" / "golden_cases.json").read_text(encoding="utf-8"))
+    return [case["utterance"] for case in cases if case["expected_intent"] == "psalm_lookup_1773"]
+
+
+def load_baseline(path: str):
+    spec = importlib.util.spec_from_file_location("psalm_parser_baseline", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module.parse_psalm_reference
+
+
+def rate(fn, inputs: list, repeat: int) -> float:
+    seconds = min(timeit.repeat(lambda: [fn(text) for text in inputs], number=repeat, repeat=3))
+    return len(inputs) * repeat / seconds
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=2000)
+    parser.add_argument("--baseline", help="pad naar een oudere psalm_parser.py")
+    args = parser.parse_args()
+
+    inputs = utterances()
+
+    uncached = psalm_parser._parse_normalized.__wrapped__
+
+    def cold(text):
+        return [psalm_parser._to_parsed(ref) for ref in uncached(psalm_parser._normalize_input(text))]
+
+    results = {"koud": rate(cold, inputs, args.repeat), "warm": rate(psalm_parser.parse_psalm_reference, inputs, args.repeat)}
+    if args.baseline:
+        results["baseline"] = rate(load_baseline(args.baseline), inputs, args.repeat)
+
+    print(f"{len(inputs)} utterances x {args.repeat}")
+    for name, per_second in results.items():
+        print(f"{name:10s} {per_second:12,.0f} parses/s")
+    print(f"memo-info: {psalm_parser._parse_normalized.cache_info()}")
+
+
+if __name__ == "__main__":
+    main()
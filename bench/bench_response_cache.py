@@ -0,0 +1,81 @@
+"""
+CPU-tijd per lookup-request met en zonder response-cache.
+
+Draait de FastAPI-app in-process (ASGI) met een in-memory versmap, zodat alleen het werk in
+de app zelf gemeten wordt: parsen, opbouwen, valideren en serialiseren tegenover een
+cache-hit. Daarnaast het handlerwerk los, zonder de ASGI/HTTP-laag.
+
+    python bench/bench_response_cache.py --requests 2000
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import pathlib
+import sys
+import time
+import timeit
+
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+import httpx  # noqa: E402
+
+import main  # noqa: E402
+from response_cache import ResponseCache, encode_json  # noqa: E402
+
+QUERIES = ("ps 23:1-3", "Psalm 119 vers 1 t/m 8 en 105", "ps 42:1", "Ps. 68 vers 1, 2 en 10", "psalm 134 vers 1 t/m 3")
+VERS_MAP = {
+    vers: "\n".join(f"regel {n} van vers {vers}, met wat tekst erbij" for n in range(8)) for vers in range(1, 177)
+}
+
+
+async def _fake_verses(psalm, verses):
+    return {vers: VERS_MAP[vers] for vers in verses if vers in VERS_MAP}
+
+
+async def _cpu_per_request(cache: ResponseCache, requests: int) -> float:
+    main.response_cache = cache
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as http:
+        for query in QUERIES:
+            assert (await http.get("/api/psalm/lookup", params={"query": query})).status_code == 200
+        started = time.process_time()
+        for i in range(requests):
+            await http.get("/api/psalm/lookup", params={"query": QUERIES[i % len(QUERIES)]})
+        return (time.process_time() - started) / requests
+
+
+def _handler_work(query: str) -> bytes:
+    parsed, _ = main._parse_lookup(query)
+    found = {vers: VERS_MAP[vers] for vers in parsed.request["verses"] if vers in VERS_MAP}
+    payload, _ = main._lookup_payload(parsed, found)
+    main._validate(payload)
+    return encode_json(payload)
+
+
+def run() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=2000)
+    args = parser.parse_args()
+
+    main.client.aget_verses = _fake_verses  # type: ignore[method-assign]
+    main.max_verses = None
+
+    off = asyncio.run(_cpu_per_request(ResponseCache(0), args.requests))
+    on = asyncio.run(_cpu_per_request(ResponseCache(600), args.requests))
+    print(f"{'ASGI-request':30s} zonder cache {off * 1e6:8.1f} µs  met cache {on * 1e6:8.1f} µs  "
+          f"bespaard {(off - on) * 1e6:7.1f} µs ({(1 - on / off) * 100:4.1f}%)")
+
+    cache = main.response_cache
+    number = max(1, args.requests)
+    for query in QUERIES:
+        miss = min(timeit.repeat(lambda: _handler_work(query), number=number, repeat=3)) / number
+        hit = min(timeit.repeat(lambda: cache.get(query), number=number, repeat=3)) / number
+        print(f"{query:30s} opbouwen {miss * 1e6:8.1f} µs  cache-hit {hit * 1e6:8.1f} µs")
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,69 @@
+"""
+Micro-benchmark van de zoekindex op een corpus ter grootte van alle 150 psalmen.
+
+Het corpus is synthetisch (Zipf-verdeeld vocabulaire, ~2400 verzen van 8 regels) aangevuld
+met de opgenomen pagina's uit tests/fixtures, zodat echte beginregels ook gezocht worden.
+
+    python bench/bench_search.py
+"""
+
+from __future__ import annotations
+
+import argparse
+import pathlib
+import random
+import sys
+import time
+import timeit
+
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from psalm_extract import get_engine  # noqa: E402
+from search_index import SearchIndex  # noqa: E402
+
+QUERIES = ("Gelijk een hert", '"mijn herder"', "ik hef mijn og", "Heer", "genade trouw", "zalig* vreze")
+
+
+def corpus(seed: int):
+    rng = random.Random(seed)
+    syllables = ["ge", "lijk", "heer", "trouw", "zalig", "na", "de", "ver", "ont", "men", "lof", "zang", "hei", "lig"]
+    vocabulary = sorted({"".join(rng.choices(syllables, k=rng.randint(1, 3))) for _ in range(20000)})
+    weights = [1 / (rank**1.1) for rank in range(1, len(vocabulary) + 1)]
+    extract = get_engine("fast")
+    recorded = {
+        int(path.stem.split("_")[1]): extract(path.read_text(encoding="utf-8"))
+        for path in (ROOT / "tests" / "fixtures").glob("psalmen_*.html")
+        if path.stem.split("_")[1].isdigit()
+    }
+    for psalm in range(1, 151):
+        if psalm in recorded:
+            yield psalm, recorded[psalm]
+            continue
+        yield psalm, {
+            vers: "\n".join(" ".join(rng.choices(vocabulary, weights, k=6)) for _ in range(8))
+            for vers in range(1, rng.randint(4, 30))
+        }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=1773)
+    args = parser.parse_args()
+
+    vers_maps = list(corpus(args.seed))
+    index = SearchIndex()
+    started = time.perf_counter()
+    index.add_many(vers_maps)
+    print(f"index: {index.psalms} psalmen, {len(index)} verzen in {(time.perf_counter() - started) * 1000:.1f} ms")
+
+    print(f"{'query':24s} {'hits':>5s} {'µs/query':>9s}")
+    for query in QUERIES:
+        hits = index.search(query, 10)
+        seconds = min(timeit.repeat(lambda: index.search(query, 10), number=args.repeat, repeat=3))
+        print(f"{query:24s} {len(hits):5d} {seconds / args.repeat * 1e6:9.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+Indexeren van een Statenvertaling-bestand op ware grootte en verwijzingen oplossen.
+
+Zonder --path wordt een synthetisch bestand gemaakt met de omvang van de echte
+Statenvertaling (66 boeken, ~31.000 verzen, ~4,5 MB, deels met boek-kopregels).
+
+    python bench/bench_statenvertaling.py
+    python bench/bench_statenvertaling.py --path data/nl_Statenvertaling.txt
+"""
+
+from __future__ import annotations
+
+import argparse
+import pathlib
+import random
+import sys
+import tempfile
+import time
+
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from statenvertaling import BOOKS, StatenvertalingIndex, parse_ref  # noqa: E402
+
+WORDS = ("de", "HEERE", "zeide", "tot", "Mozes", "en", "het", "volk", "Israëls", "want", "Hij", "is", "goed", "zijn")
+
+
+def write_corpus(path: pathlib.Path, seed: int) -> None:
+    rng = random.Random(seed)
+    with path.open("w", encoding="utf-8") as fh:
+        for number, (book, _) in enumerate(BOOKS):
+            headers = number % 2 == 1
+            if headers:
+                fh.write(f"\n{book}\n")
+            for chapter in range(1, 20 if book != "Psalmen" else 151):
+                for verse in range(1, rng.randint(10, 40)):
+                    text = " ".join(rng.choices(WORDS, k=rng.randint(15, 40))) + "."
+                    fh.write(f"{chapter}:{verse} {text}\n" if headers else f"{book} {chapter}:{verse} {text}\n")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--path")
+    parser.add_argument("--refs", type=int, default=20000)
+    parser.add_argument("--seed", type=int, default=1637)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = pathlib.Path(args.path) if args.path else pathlib.Path(tmp) / "nl_Statenvertaling.txt"
+        if not args.path:
+            write_corpus(path, args.seed)
+        started = time.perf_counter()
+        index = StatenvertalingIndex(path)
+        print(
+            f"index: {len(index)} verzen uit {path.stat().st_size / 1e6:.1f} MB "
+            f"in {(time.perf_counter() - started) * 1000:.0f} ms"
+        )
+
+        rng = random.Random(args.seed)
+        books = [(name, aliases) for name, aliases in BOOKS]
+        refs = []
+        for _ in range(args.refs):
+            name, aliases = rng.choice(books)
+            spelling = rng.choice((name, *aliases, f"{aliases[0]}." if aliases else name))
+            start = rng.randint(1, 12)
+            span = f"{start}-{start + rng.randint(1, 4)}" if rng.random() < 0.3 else f"{start}"
+            refs.append(f"{spelling} {rng.randint(1, 19)}:{span}")
+
+        for label in ("koud (parse-memo leeg)", "warm"):
+            if label.startswith("koud"):
+                parse_ref.cache_clear()
+            started = time.perf_counter()
+            statuses = [index.resolve(ref).status for ref in refs]
+            seconds = time.perf_counter() - started
+            print(
+                f"{label:24s} {len(refs) / seconds:9.0f} refs/s  {seconds / len(refs) * 1e6:6.1f} µs/ref  "
+                f"ok={statuses.count('ok')} not_found={statuses.count('not_found')}"
+            )
+        index.close()
+
+
+if __name__ == "__main__":
+    main()
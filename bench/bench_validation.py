@@ -0,0 +1,64 @@
+"""
+Micro-benchmark van de response-validatie op grote resultaten (heel psalm 119: 88 verzen).
+
+Met --baseline kan een oudere response_validation.py ernaast gemeten worden:
+
+    git show f6c6cb7:response_validation.py > /tmp/response_validation_oud.py
+    python bench/bench_validation.py --baseline /tmp/response_validation_oud.py
+"""
+
+from __future__ import annotations
+
+import argparse
+import importlib.util
+import pathlib
+import sys
+import timeit
+
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from response_validation import ensure_response_matches_schema  # noqa: E402
+
+
+def payload(verses: int) -> dict:
+    return {
+        "intent": "psalm_lookup_1773",
+        "status": "ok",
+        "request": {"psalm_number": 119, "verses": list(range(1, verses + 1))},
+        "result": {
+            "verified": True,
+            "verses": [{"verse": v, "text": "\n".join(f"Regel {n} van vers {v}" for n in range(8))} for v in range(1, verses + 1)],
+        },
+    }
+
+
+def load_baseline(path: str):
+    spec = importlib.util.spec_from_file_location("response_validation_baseline", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module.ensure_response_matches_schema
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=2000)
+    parser.add_argument("--baseline", help="pad naar een oudere response_validation.py")
+    args = parser.parse_args()
+
+    validators = {"gecompileerd": ensure_response_matches_schema}
+    if args.baseline:
+        validators["baseline"] = load_baseline(args.baseline)
+
+    print(f"{'verzen':>6s} " + " ".join(f"{name:>14s}" for name in validators) + "   (µs per response)")
+    for size in (1, 10, 88):
+        data = payload(size)
+        cells = []
+        for validate in validators.values():
+            seconds = min(timeit.repeat(lambda: validate(data), number=args.repeat, repeat=3))
+            cells.append(f"{seconds / args.repeat * 1e6:14.1f}")
+        print(f"{size:6d} " + " ".join(cells))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+Warm-restart benchmark: tijd van processtart tot de eerste cache-hit.
+
+Vergelijkt een "herstarte" worker zonder gedeelde cache (moet psalmboek.nl scrapen; hier een
+lokale stub met vertraging) met een worker die de SQLite-laag van zijn voorganger erft.
+
+    python bench/bench_warm_restart.py --upstream-delay 0.4 --psalms 23 42 119
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import pathlib
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / "tests"))
+
+from psalmboek_stub import PsalmboekStub  # noqa: E402
+
+CHILD = """
+import sys, time
+started = float(sys.argv[1])
+from psalms import client
+for psalm in map(int, sys.argv[2:]):
+    client.get_vers_map(psalm)
+print(time.time() - started)
+"""
+
+
+def _worker(env: dict, psalms: list[int]) -> float:
+    started = time.time()
+    out = subprocess.run(
+        [sys.executable, "-c", CHILD, str(started), *map(str, psalms)],
+        cwd=ROOT,
+        env=env,
+        check=True,
+        capture_output=True,
+        text=True,
+    )
+    return float(out.stdout.strip().splitlines()[-1])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--upstream-delay", type=float, default=0.4)
+    parser.add_argument("--psalms", type=int, nargs="+", default=[23, 42, 119])
+    args = parser.parse_args()
+
+    with PsalmboekStub(delay=args.upstream_delay) as stub, tempfile.TemporaryDirectory() as tmp:
+        env = {**os.environ, "PSALM_SOURCE_BASE": stub.base_url, "CACHE_SECONDS": "600"}
+        disk_env = {**env, "CACHE_SQLITE_PATH": os.path.join(tmp, "verzen.sqlite")}
+
+        cold = _worker(env, args.psalms)
+        first = _worker(disk_env, args.psalms)
+        warm = _worker(disk_env, args.psalms)
+
+        print(f"zonder SQLite-laag            : {cold * 1000:8.1f} ms")
+        print(f"SQLite-laag, eerste start     : {first * 1000:8.1f} ms")
+        print(f"SQLite-laag, warme herstart   : {warm * 1000:8.1f} ms")
+        print(f"upstream requests             : {stub.request_count}")
+
+
+if __name__ == "__main__":
+    main()
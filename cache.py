@@ -0,0 +1,148 @@
+"""
+Begrensde, thread-safe TTL+LRU-cache met stale-while-revalidate.
+
+- `ttl`: zolang is een entry vers.
+- `max_stale`: zo lang na het verlopen van de TTL mag een entry nog als "stale" geserveerd
+  worden (terwijl de aanroeper op de achtergrond ververst, of als de bron faalt).
+- `max_entries` / `max_bytes`: budget; de minst recent gebruikte entries gaan er eerst uit.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Generic, Hashable, Optional, Tuple, TypeVar
+
+V = TypeVar("V")
+
+
+class _Entry(Generic[V]):
+    __slots__ = ("value", "stored_at", "size")
+
+    def __init__(self, value: V, stored_at: float, size: int):
+        self.value = value
+        self.stored_at = stored_at
+        self.size = size
+
+
+class TTLCache(Generic[V]):
+    def __init__(
+        self,
+        ttl: float,
+        *,
+        max_entries: int = 512,
+        max_bytes: int = 32 * 1024 * 1024,
+        max_stale: float = 0.0,
+        sizeof: Optional[Callable[[V], int]] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.ttl = max(0.0, ttl)
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.max_stale = max(0.0, max_stale)
+        self._sizeof = sizeof or (lambda value: 1)
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Hashable, _Entry[V]]" = OrderedDict()
+        self._bytes = 0
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0
+
+    def get(self, key: Hashable) -> Optional[Tuple[V, bool]]:
+        """Geeft (waarde, vers) of None. Entries voorbij ttl + max_stale tellen als miss."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            age = self._clock() - entry.stored_at
+            if age > self.ttl + self.max_stale:
+                self._remove(key)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            if age <= self.ttl:
+                self.hits += 1
+                return entry.value, True
+            self.stale_hits += 1
+            return entry.value, False
+
+    def set(self, key: Hashable, value: V, *, age: float = 0.0) -> None:
+        """Slaat value op; `age` > 0 voor waarden die elders al eerder zijn opgehaald."""
+        if not self.enabled:
+            return
+        size = self._sizeof(value)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = _Entry(value, self._clock() - age, size)
+            self._bytes += size
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+
+    def age(self, key: Hashable) -> Optional[float]:
+        """Leeftijd van een bruikbare entry in seconden (telt niet mee in de statistieken)."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            age = self._clock() - entry.stored_at
+            return age if age <= self.ttl + self.max_stale else None
+
+    def peek(self, key: Hashable) -> Optional[V]:
+        """Waarde ongeacht leeftijd, zonder statistieken of LRU-volgorde te raken."""
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry.value if entry is not None else None
+
+    def touch(self, key: Hashable) -> bool:
+        """Maakt een bestaande entry weer vers zonder de waarde te vervangen."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return False
+            entry.stored_at = self._clock()
+            self._entries.move_to_end(key)
+            return True
+
+    def delete(self, key: Hashable) -> None:
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def _remove(self, key: Hashable) -> None:
+        entry = self._entries.pop(key)
+        self._bytes -= entry.size
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._entries
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "hits": self.hits,
+                "stale_hits": self.stale_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
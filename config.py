@@ -6,6 +6,107 @@ class Settings(BaseSettings):
     PSALM_SOURCE_BASE: AnyHttpUrl = "https://psalmboek.nl"
     PSALM_BERIJMING: str = "1773"
     CACHE_SECONDS: int = 600
+    CACHE_MAX_ENTRIES: int = 512
+    CACHE_MAX_BYTES: int = 32 * 1024 * 1024
+    # Hoe lang na het verlopen van CACHE_SECONDS een versmap nog stale geserveerd mag worden
+    # (tijdens een achtergrond-refresh of als psalmboek.nl faalt).
+    CACHE_MAX_STALE_SECONDS: int = 86400
+    # Optionele gedeelde SQLite-cache (WAL) voor alle workers en over herstarts heen; leeg = uit.
+    CACHE_SQLITE_PATH: str = ""
+    # HTML-extractie: "bs4" (BeautifulSoup-referentie) of "fast" (gerichte scanner, valt bij
+    # afwijkende markup terug op bs4). bs4 blijft standaard tot "fast" op opgenomen pagina's klopt.
+    EXTRACTION_ENGINE: str = "bs4"
+    # Extractie in zoveel aparte processen (houdt de GIL niet vast); 0 = in-process (thread).
+    EXTRACTION_POOL_WORKERS: int = 0
+    # Kleinere pagina's worden ook met pool in-process geëxtraheerd (pickelen kost dan meer).
+    EXTRACTION_POOL_MIN_BYTES: int = 16384
+    # Max. aantal psalmen dat een batch-lookup tegelijk bij de bron ophaalt.
+    BATCH_FETCH_CONCURRENCY: int = 4
+    # Gezangen 1938 als tweede bron (zie sources.py), met een eigen cachepartitie zodat druk
+    # psalmverkeer de gezangen niet uit het geheugen verdringt. {base} = PSALM_SOURCE_BASE.
+    # Standaard uit: URL-sjabloon en paginastructuur zijn nog niet tegen psalmboek.nl geverifieerd.
+    GEZANGEN_ENABLED: bool = False
+    GEZANGEN_URL_TEMPLATE: str = "{base}/gezangen.php?bundel=1938&gezang={number}"
+    # Extractie-engine voor de gezangenpagina's (zie psalm_extract.ENGINES); leeg = EXTRACTION_ENGINE.
+    GEZANGEN_EXTRACTION_ENGINE: str = ""
+    GEZANGEN_COUNT: int = 306
+    GEZANGEN_CACHE_MAX_ENTRIES: int = 128
+    GEZANGEN_CACHE_MAX_BYTES: int = 8 * 1024 * 1024
+    # Max-verstabel voor de gezangen; leeg = data/max_verses_gezangen_1938.json.
+    GEZANGEN_MAX_VERSES_PATH: str = ""
+    # Pad naar een offline snapshot (zie psalm_snapshot.py); leeg = alleen live scrapen.
+    PSALM_SNAPSHOT_PATH: str = ""
+
+    # Max-verstabel (zie max_verses.py); leeg = data/max_verses_<berijming>.json.
+    MAX_VERSES_PATH: str = ""
+    # Statenvertaling voor scripture_refs (zie statenvertaling.py); leeg = data/nl_Statenvertaling.txt.
+    STATENVERTALING_PATH: str = ""
+    # Response-validatie tegen het JSON-schema: "full" (tests/staging), "sampled" of "off".
+    VALIDATION_MODE: str = "full"
+    # Fractie van de responses die in "sampled"-modus gevalideerd wordt.
+    VALIDATION_SAMPLE_RATE: float = 0.05
+
+    # HTTP-caching van lookup-responses (ETag + Cache-Control); versteksten veranderen niet.
+    HTTP_CACHE_MAX_AGE: int = 86400
+    HTTP_CACHE_IMMUTABLE: bool = False
+    # Korte cachetijd voor 400/404; 5xx krijgt altijd no-store.
+    HTTP_CACHE_ERROR_MAX_AGE: int = 60
+    # Cache van complete, geserialiseerde lookup-responses (zelfde TTL als CACHE_SECONDS); 0 = uit.
+    RESPONSE_CACHE_ENTRIES: int = 4096
+    RESPONSE_CACHE_MAX_BYTES: int = 16 * 1024 * 1024
+    # Cachetijd van de plugin-bestanden (openapi.yaml, ai-plugin.json, logo); daarna revalideren via ETag.
+    STATIC_MAX_AGE: int = 3600
+
+    # Resilience rond psalmboek.nl (zie resilience.py): totale timeout per poging, breaker die
+    # na N opeenvolgende fouten opent en na RESET seconden één proefrequest toelaat.
+    UPSTREAM_TIMEOUT_SECONDS: float = 15.0
+    UPSTREAM_BREAKER_FAILURES: int = 5
+    UPSTREAM_BREAKER_RESET_SECONDS: float = 30.0
+    # Retries (en hedges) samen hooguit deze fractie van de upstream-requests.
+    UPSTREAM_RETRY_BUDGET_RATIO: float = 0.1
+    UPSTREAM_RETRIES: int = 1
+    # Tweede request na de p95-latency als het eerste uitblijft (alleen async).
+    UPSTREAM_HEDGE: bool = False
+    # Deadline per API-request; een kortere X-Request-Timeout van de aanroeper wint, maar nooit
+    # korter dan REQUEST_TIMEOUT_FLOOR_SECONDS.
+    REQUEST_DEADLINE_SECONDS: float = 10.0
+    REQUEST_TIMEOUT_FLOOR_SECONDS: float = 1.0
+    # Zo lang hergebruikt /healthz?deep=1 de uitkomst van de upstream-probe.
+    HEALTHZ_PROBE_CACHE_SECONDS: float = 5.0
+    # Hooguit zoveel fetches tegelijk naar psalmboek.nl (0 = onbegrensd); de rest wacht in een
+    # wachtrij van UPSTREAM_MAX_QUEUE, maximaal UPSTREAM_QUEUE_WAIT_SECONDS (of de request-deadline).
+    UPSTREAM_MAX_CONCURRENCY: int = 4
+    UPSTREAM_MAX_QUEUE: int = 32
+    UPSTREAM_QUEUE_WAIT_SECONDS: float = 5.0
+    # Token bucket per client (X-API-Key of IP) voor verzoeken die upstream raken; cache-hits
+    # tellen niet mee. 0 = uit; pas aanzetten als TRUSTED_PROXIES klopt, anders delen alle
+    # gebruikers achter de proxy één bucket.
+    CLIENT_MISS_RATE: float = 0.0
+    CLIENT_MISS_BURST: int = 30
+    # Komma-gescheiden API-keys met een eigen bucket; onbekende keys tellen als hun IP-adres.
+    CLIENT_API_KEYS: str = ""
+    # Komma-gescheiden adressen van de eigen reverse proxies (bijv. Caddy); alleen van hen wordt
+    # X-Forwarded-For geloofd.
+    TRUSTED_PROXIES: str = ""
+
+    # Opwarmen na een herstart (zie warmup.py): deze psalmen plus de bewaarde top-N; leeg = uit.
+    WARMUP_PSALMS: str = "23,42,68,84,103,116,119,121,134"
+    WARMUP_CONCURRENCY: int = 2
+    # Pauze per worker na elke upstream-fetch tijdens opwarmen en vooruit verversen.
+    WARMUP_DELAY_SECONDS: float = 0.5
+    # Populariteit per psalm (JSON); leeg = alleen in het geheugen.
+    POPULARITY_PATH: str = ""
+    # Zoveel populairste psalmen worden bij het starten geladen en vóór hun TTL ververst.
+    POPULARITY_TOP_N: int = 20
+    # Interval van de prefetch-loop; 0 = uit.
+    PREFETCH_INTERVAL_SECONDS: float = 60.0
+    # Lockbestand zodat van alle uvicorn-workers op deze host er één de prefetch-loop draait;
+    # leeg = elke worker (alleen zinvol bij WEB_CONCURRENCY=1).
+    PREFETCH_LOCK_PATH: str = "/tmp/psalmboek-prefetch.lock"
+
+    # Zoekindex: ook alle 150 psalmen opwarmen (volledige crawl, gepaced), zodat
+    # /api/psalm/search niet alleen eerder opgevraagde psalmen vindt.
+    SEARCH_PRELOAD: bool = False
 
     class Config:
         env_file = ".env"
@@ -0,0 +1,140 @@
+"""
+Optionele procespool voor de HTML-extractie.
+
+Extractie is CPU-werk in pure Python en houdt de GIL vast; met `asyncio.to_thread` blokkeert
+een paar gelijktijdige koude psalmpagina's dus nog steeds de hele worker, cache-hits
+inbegrepen. Met een pool draait de extractie in aparte processen: de request-thread wacht
+alleen op het resultaat (zonder GIL) en de event loop blijft vrij.
+
+- Begrensd: hooguit `max_pending` pagina's tegelijk bij de pool (per sync/async pad); de rest wacht.
+- Warme workers: `start()` start alle processen en laadt de engine vooraf (lifespan), zodat
+  de eerste koude psalm niet ook nog een processtart betaalt.
+- Kleine pagina's (< `min_bytes`) worden in-process geëxtraheerd (async: in een thread, zoals
+  zonder pool); daar kost het pickelen en heen-en-weer sturen meer dan het parsen zelf.
+- Een kapotte pool (bijv. een gecrashte worker) valt terug op in-process extractie.
+
+Workers krijgen de HTML als gewone str en geven een compacte tuple van (vers, tekst) terug.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Optional, Tuple
+
+from psalm_extract import get_engine
+from sqlite_cache import HashedVersMap, content_hash, hashed
+
+logger = logging.getLogger(__name__)
+
+# (verzen als tuple, content_hash): de hash wordt in de worker berekend, niet op de event loop.
+_Compact = Tuple[Tuple[Tuple[int, str], ...], str]
+
+
+def _warm_worker(engine: str) -> None:
+    extract = get_engine(engine)
+    # Eén lege extractie compileert de regexen / importeert bs4 in dit proces.
+    extract('<div id="psalmkolom2"><p><strong>Vers 1</strong><br />x</p></div>')
+
+
+def _extract_compact(engine: str, html: str) -> _Compact:
+    vers_map = get_engine(engine)(html)
+    return tuple(vers_map.items()), content_hash(vers_map)
+
+
+def _ping() -> int:
+    return multiprocessing.current_process().pid or 0
+
+
+class ExtractionPool:
+    def __init__(self, workers: int, engine: str = "fast", *, min_bytes: int = 16384, max_pending: int = 0):
+        self.workers = workers
+        self.engine = engine
+        self.min_bytes = min_bytes
+        self.max_pending = max_pending or workers * 2
+        engine_fn = get_engine(engine)
+        self._extract = lambda html: hashed(engine_fn(html))
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(self.max_pending)
+        # asyncio.Semaphore hoort bij één event loop; per loop lazy aangemaakt (zoals de AsyncClient).
+        self._aslots: Optional[asyncio.Semaphore] = None
+        self._aslots_loop: Optional[asyncio.AbstractEventLoop] = None
+        self.stats = {"pooled": 0, "inline": 0, "fallback": 0}
+
+    def _pool(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_warm_worker,
+                    initargs=(self.engine,),
+                )
+            return self._executor
+
+    def start(self) -> None:
+        """Start alle workers en wacht tot ze opgewarmd zijn (elke submit zonder vrije worker start er één)."""
+        pool = self._pool()
+        for future in [pool.submit(_ping) for _ in range(self.workers)]:
+            future.result()
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    def _inline(self, html: str) -> bool:
+        return len(html) < self.min_bytes
+
+    def _count(self, key: str) -> None:
+        with self._lock:
+            self.stats[key] += 1
+
+    def _broken(self, exc: BaseException) -> None:
+        logger.warning("Extractie-pool onbruikbaar, terugval op in-process extractie: %s", exc)
+        self._count("fallback")
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def extract(self, html: str) -> HashedVersMap:
+        """Blokkerende variant (sync client, threads): wacht op de pool zonder de GIL te houden."""
+        if self._inline(html):
+            self._count("inline")
+            return self._extract(html)
+        with self._slots:
+            try:
+                compact = self._pool().submit(_extract_compact, self.engine, str(html)).result()
+            except BrokenProcessPool as exc:
+                self._broken(exc)
+                return self._extract(html)
+        self._count("pooled")
+        return HashedVersMap(*compact)
+
+    def _async_slots(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        if self._aslots is None or self._aslots_loop is not loop:
+            self._aslots = asyncio.Semaphore(self.max_pending)
+            self._aslots_loop = loop
+        return self._aslots
+
+    async def aextract(self, html: str) -> HashedVersMap:
+        if self._inline(html):
+            self._count("inline")
+            return await asyncio.to_thread(self._extract, html)
+        async with self._async_slots():
+            try:
+                future = self._pool().submit(_extract_compact, self.engine, str(html))
+                compact = await asyncio.wrap_future(future)
+            except BrokenProcessPool as exc:
+                self._broken(exc)
+                return await asyncio.to_thread(self._extract, html)
+        self._count("pooled")
+        return HashedVersMap(*compact)
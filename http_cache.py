@@ -0,0 +1,87 @@
+"""
+HTTP-caching voor de lookup-endpoints: sterke ETags, Cache-Control en If-None-Match → 304.
+
+De ETag is afgeleid van het genormaliseerde verzoek (bijv. ("lookup", 23, (1, 2, 3))) en de
+content-hash van de geleverde verzen. Per verzoek onthoudt een begrensde memo de laatst
+uitgegeven ETag, zodat een herhaald conditioneel verzoek een 304 krijgt zonder de client
+aan te spreken of de payload opnieuw te valideren. De memo verloopt met dezelfde TTL als de
+verscache: daarna wordt de inhoud eerst weer opgehaald voordat er een 304 volgt.
+"""
+
+from __future__ import annotations
+
+import hashlib
+from typing import Dict, Hashable, Mapping, Optional
+
+from fastapi.responses import Response
+
+from cache import TTLCache
+from sqlite_cache import content_hash
+
+# Statussen met een (korte) publieke cachetijd; al het andere krijgt no-store.
+_ERROR_CACHEABLE = {400, 404}
+
+
+def make_etag(key: Hashable, content: Mapping[int, object]) -> str:
+    digest = hashlib.sha256(f"{key!r}\0{content_hash(content)}".encode("utf-8")).hexdigest()
+    return f'"{digest[:32]}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Zwakke vergelijking zoals RFC 9110 die voorschrijft voor If-None-Match."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(candidate.strip().removeprefix("W/") == opaque for candidate in if_none_match.split(","))
+
+
+class HttpCachePolicy:
+    def __init__(
+        self,
+        *,
+        max_age: int,
+        immutable: bool = False,
+        error_max_age: int = 60,
+        memo_seconds: float = 600,
+        memo_entries: int = 4096,
+    ):
+        self.max_age = max_age
+        self.immutable = immutable
+        self.error_max_age = error_max_age
+        self._etags: TTLCache[str] = TTLCache(memo_seconds, max_entries=memo_entries)
+
+    def cache_control(self, status_code: int) -> str:
+        if status_code == 200 and self.max_age > 0:
+            return f"public, max-age={self.max_age}" + (", immutable" if self.immutable else "")
+        if status_code in _ERROR_CACHEABLE and self.error_max_age > 0:
+            return f"public, max-age={self.error_max_age}"
+        return "no-store"
+
+    def headers(self, status_code: int, etag: Optional[str] = None) -> Dict[str, str]:
+        headers = {"Cache-Control": self.cache_control(status_code)}
+        if etag is not None:
+            headers["ETag"] = etag
+        return headers
+
+    def known_etag(self, key: Hashable) -> Optional[str]:
+        cached = self._etags.get(key)
+        return cached[0] if cached is not None and cached[1] else None
+
+    def remember(self, key: Hashable, content: Mapping[int, object]) -> str:
+        etag = make_etag(key, content)
+        self._etags.set(key, etag)
+        return etag
+
+    def not_modified(self, key: Hashable, if_none_match: Optional[str]) -> Optional[Response]:
+        """304 als de client de actuele versie al heeft; anders None (verder verwerken)."""
+        if not if_none_match:
+            return None
+        etag = self.known_etag(key)
+        if etag is None or not etag_matches(if_none_match, etag):
+            return None
+        return self.not_modified_response(etag)
+
+    def not_modified_response(self, etag: str) -> Response:
+        return Response(status_code=304, headers=self.headers(200, etag))
@@ -1,19 +1,107 @@
 from __future__ import annotations
 
-from typing import Any, Dict, List
+import asyncio
+import hashlib
+import json
+import time
+from contextlib import asynccontextmanager
+from functools import lru_cache
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional, Tuple
 
-from fastapi import FastAPI, HTTPException, Query
+from fastapi import FastAPI, HTTPException, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import HTMLResponse, JSONResponse, RedirectResponse, Response
+from fastapi.responses import HTMLResponse, JSONResponse, RedirectResponse, Response, StreamingResponse
 
+import metrics
+import resilience
+from admission import CLIENT, Rejected
 from config import settings
-from psalm_parser import ParsedPsalmReference, parse_psalm_reference
-from psalms import client
-from response_validation import ensure_response_matches_schema
-from schemas import PsalmMaxResponse, PsalmVersResponse
+from http_cache import HttpCachePolicy, etag_matches
+from psalm_parser import ParsedPsalmReference, parse_psalm_references
+from psalms import SnapshotClient, client, live_client, max_verses, sources
+from response_cache import CachedResponse, ResponseCache, encode_json
+from response_cache import cache_key as response_cache_key
+from response_validation import ResponseValidator
+from schemas import (
+    PsalmLookupBatchRequest,
+    PsalmMaxResponse,
+    PsalmVersResponse,
+    ScriptureRefsRequest,
+    SourceLookupRequest,
+)
+from search_index import SearchHit, SearchIndex
+from sources import Source, UnknownSource
+from static_assets import StaticAsset
+from statenvertaling import open_statenvertaling
+from warmup import LeaderLock, PopularityTracker, Warmup, parse_psalm_list, prefetch_loop
+
+# Groeit mee met elke versmap die de client extraheert (of in één keer uit een snapshot).
+search_index = SearchIndex()
+client.subscribe(search_index.add_psalm)
+# Kant-en-klare 200-antwoorden van psalm_lookup; een gewijzigde versmap maakt ze ongeldig.
+response_cache = ResponseCache(
+    settings.CACHE_SECONDS,
+    max_entries=settings.RESPONSE_CACHE_ENTRIES,
+    max_bytes=settings.RESPONSE_CACHE_MAX_BYTES,
+)
+client.subscribe(response_cache.on_vers_map)
+
+# Geïndexeerde Statenvertaling (mmap); None als het tekstbestand er niet is.
+bible = open_statenvertaling(settings.STATENVERTALING_PATH or None)
+
+popularity = PopularityTracker(settings.POPULARITY_PATH or None)
+popularity.load()
+warmup = Warmup(
+    client,
+    parse_psalm_list(settings.WARMUP_PSALMS)
+    + popularity.top(settings.POPULARITY_TOP_N)
+    + (list(range(1, 151)) if settings.SEARCH_PRELOAD else []),
+    concurrency=settings.WARMUP_CONCURRENCY,
+    delay=settings.WARMUP_DELAY_SECONDS,
+)
+
+
+@asynccontextmanager
+async def lifespan(_: FastAPI) -> AsyncIterator[None]:
+    pool = live_client.extraction_pool
+    if pool is not None:
+        # Workers starten vóór de opwarming, zodat die al in de pool parset.
+        await asyncio.to_thread(pool.start)
+    # httpx/h2 en de SSL-context worden lazy geladen; hier alvast in een thread, zodat de eerste
+    # fetch (opwarming of request) dat niet op de event loop hoeft te doen. Blokkeert de start niet.
+    tasks = [asyncio.create_task(asyncio.to_thread(live_client.prepare)), asyncio.create_task(warmup.run())]
+    if isinstance(client, SnapshotClient):
+        tasks.append(asyncio.create_task(asyncio.to_thread(client.publish_all)))
+    prefetch_lock = LeaderLock(settings.PREFETCH_LOCK_PATH or None)
+    if settings.PREFETCH_INTERVAL_SECONDS > 0:
+        tasks.append(
+            asyncio.create_task(
+                prefetch_loop(
+                    client,
+                    popularity,
+                    top_n=settings.POPULARITY_TOP_N,
+                    interval=settings.PREFETCH_INTERVAL_SECONDS,
+                    delay=settings.WARMUP_DELAY_SECONDS,
+                    lock=prefetch_lock,
+                )
+            )
+        )
+    yield
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    prefetch_lock.release()
+    popularity.save()
+    await client.aclose()
+    for source in sources:
+        if source.client is not client:
+            await source.client.aclose()
+    if pool is not None:
+        await asyncio.to_thread(pool.shutdown)
 
 
 app = FastAPI(
+    lifespan=lifespan,
     title="Bijbels-Pastoraat-NL Backend",
     version="1.0.0",
     description="API voor berijmde psalmverzen (1773) via psalmboek.nl",
@@ -40,21 +128,261 @@ def root() -> RedirectResponse:
     return RedirectResponse(url="/docs")
 
 
-@app.get("/healthz", include_in_schema=False)
-def healthz() -> Dict[str, str]:
-    return {"status": "ok"}
+@lru_cache(maxsize=8)
+def _csv_set(value: str) -> frozenset:
+    return frozenset(part.strip() for part in value.split(",") if part.strip())
+
 
+def _client_ip(request: Request) -> str:
+    """Het IP van de client; achter een vertrouwde proxy het laatste niet-proxy-adres uit X-Forwarded-For."""
+    host = request.client.host if request.client else "onbekend"
+    trusted = _csv_set(settings.TRUSTED_PROXIES)
+    if host not in trusted:
+        return host
+    # Van rechts naar links: links daarvan kan de client zelf alles invullen.
+    for hop in reversed(request.headers.get("x-forwarded-for", "").split(",")):
+        hop = hop.strip()
+        if hop and hop not in trusted:
+            return hop
+    return host
 
-def _schema_response(payload: Dict[str, Any], *, status_code: int = 200) -> JSONResponse:
+
+def _client_key(request: Request) -> Optional[str]:
     """
-    Valideert payload tegen het response-schema voor psalm_lookup_1773.
-    Als validatie faalt: geef een duidelijke 500 met detail (zodat je het kunt fixen).
+    Wie de upstream-misses van dit verzoek betaalt (token bucket); alleen voor /api/psalm/* en
+    /api/bronnen/*. Alleen keys uit CLIENT_API_KEYS krijgen een eigen bucket: een willekeurige
+    key per verzoek mag geen verse burst opleveren.
     """
+    if not request.url.path.startswith(("/api/psalm/", "/api/bronnen/")):
+        return None
+    api_key = request.headers.get("x-api-key")
+    if api_key and api_key in _csv_set(settings.CLIENT_API_KEYS):
+        return "key:" + hashlib.blake2b(api_key.encode("utf-8"), digest_size=8).hexdigest()
+    return "ip:" + _client_ip(request)
+
+
+def _request_deadline(request: Request) -> Tuple[float, bool]:
+    """
+    Deadline voor upstream-calls: de config, of een kortere X-Request-Timeout (seconden, met
+    ondergrens). Tweede waarde: de aanroeper heeft de deadline zelf ingekort.
+    """
+    seconds = settings.REQUEST_DEADLINE_SECONDS
+    header = request.headers.get("x-request-timeout")
+    if header:
+        try:
+            requested = float(header)
+        except ValueError:
+            return seconds, False
+        if requested > 0:
+            requested = max(requested, settings.REQUEST_TIMEOUT_FLOOR_SECONDS)
+            if requested < seconds:
+                return requested, True
+    return seconds, False
+
+
+@app.middleware("http")
+async def instrument_requests(request: Request, call_next):
+    started = time.perf_counter()
+    status = "500"
+    client_token = CLIENT.set(_client_key(request))
+    seconds, from_caller = _request_deadline(request)
+    with metrics.HTTP_IN_FLIGHT.track(), resilience.deadline(seconds, caller=from_caller):
+        try:
+            response = await call_next(request)
+            status = str(response.status_code)
+            return response
+        finally:
+            route = request.scope.get("route")
+            metrics.HTTP_REQUEST_SECONDS.labels(
+                method=request.method, route=getattr(route, "path", "unmatched"), status=status
+            ).observe(time.perf_counter() - started)
+            CLIENT.reset(client_token)
+
+
+_CACHE_EVENTS = (("hit", "hits"), ("stale_hit", "stale_hits"), ("miss", "misses"), ("eviction", "evictions"), ("write", "writes"))
+
+
+def _cache_families():
+    tiers = {**client.cache_stats(), "response": response_cache.stats()}
+    events = [
+        ({"tier": tier, "event": event}, stats[key])
+        for tier, stats in tiers.items()
+        for event, key in _CACHE_EVENTS
+        if key in stats
+    ]
+    yield "counter", "psalm_cache_events", "Cache-events per laag (memory, sqlite, response).", events
+    yield "gauge", "psalm_cache_entries", "Aantal entries in de in-memory cache.", [
+        ({"tier": tier}, stats["entries"]) for tier, stats in tiers.items() if "entries" in stats
+    ]
+    yield "gauge", "psalm_cache_bytes", "Geschat geheugengebruik van de in-memory cache.", [
+        ({"tier": tier}, stats["bytes"]) for tier, stats in tiers.items() if "bytes" in stats
+    ]
+
+
+def _revalidation_families():
+    stats = client.revalidation_stats()
+    outcomes = [({"result": r}, stats[r]) for r in ("not_modified", "unchanged", "changed") if r in stats]
+    yield "counter", "psalm_upstream_revalidations", "Refreshes: not_modified (304), unchanged, changed.", outcomes
+    yield "counter", "psalm_upstream_bytes_saved", "Niet gedownloade bytes dankzij 304-antwoorden.", [
+        ({}, stats.get("bytes_saved", 0))
+    ]
+    yield "counter", "psalm_parse_seconds_saved", "Uitgespaarde extractietijd bij ongewijzigde pagina's.", [
+        ({}, stats.get("parse_seconds_saved", 0.0))
+    ]
+
+
+def _resilience_families():
+    stats = client.resilience_stats()
+    if not stats:
+        return
+    yield "gauge", "psalm_upstream_breaker_state", "Circuit breaker: 0 = closed, 1 = half_open, 2 = open.", [
+        ({}, resilience.STATE_VALUES[stats["state"]])
+    ]
+    yield "counter", "psalm_upstream_breaker_transitions", "Overgangen van de circuit breaker per doeltoestand.", [
+        ({"state": state}, count) for state, count in stats["transitions"].items()
+    ]
+    yield "counter", "psalm_upstream_guard_events", "Resilience-events rond de upstream-fetch.", [
+        ({"event": event}, stats[event])
+        for event in ("rejected", "retries", "hedges", "hedge_wins", "budget_exhausted", "deadline_exceeded", "stale_served")
+    ]
+
+
+metrics.REGISTRY.add_collector(_cache_families)
+metrics.REGISTRY.add_collector(_revalidation_families)
+metrics.REGISTRY.add_collector(_resilience_families)
+
+
+def _extraction_pool_families():
+    pool = live_client.extraction_pool
+    if pool is None:
+        return
+    yield "counter", "psalm_extraction_pool", "Extracties per pad: pooled, inline (kleine pagina), fallback.", [
+        ({"path": path}, count) for path, count in pool.stats.items()
+    ]
+
+
+metrics.REGISTRY.add_collector(_extraction_pool_families)
+
+
+def _admission_families():
+    stats = live_client.admission.stats()
+    yield "counter", "psalm_admission_events", "Toelating van upstream-fetches: admitted of de reden van afwijzing.", [
+        ({"event": event}, stats[event])
+        for event in ("admitted", "queue_full", "queue_timeout", "predicted_wait", "rate_limited")
+    ]
+    if "limit" in stats:
+        yield "gauge", "psalm_upstream_in_flight", "Lopende fetches naar psalmboek.nl.", [({}, stats["in_flight"])]
+        yield "gauge", "psalm_upstream_queue_depth", "Fetches die wachten op een vrije plek.", [({}, stats["queued"])]
+    if "clients" in stats:
+        yield "gauge", "psalm_admission_clients", "Clients met een token bucket.", [({}, stats["clients"])]
+
+
+metrics.REGISTRY.add_collector(_admission_families)
+
+
+def _source_families():
+    """Cachepartitie per bron (eigen budget); de tier-families hierboven tonen alleen de standaardbron."""
+    stats = {source.name: source.cache_stats().get("memory", {}) for source in sources}
+    yield "counter", "psalm_source_cache_events", "Cache-events in het geheugen, per bron.", [
+        ({"source": name, "event": event}, memory[key])
+        for name, memory in stats.items()
+        for event, key in _CACHE_EVENTS
+        if key in memory
+    ]
+    yield "gauge", "psalm_source_cache_entries", "Entries in de cachepartitie van de bron.", [
+        ({"source": name}, memory["entries"]) for name, memory in stats.items() if "entries" in memory
+    ]
+    yield "gauge", "psalm_source_cache_bytes", "Geschat geheugengebruik van de cachepartitie van de bron.", [
+        ({"source": name}, memory["bytes"]) for name, memory in stats.items() if "bytes" in memory
+    ]
+
+
+metrics.REGISTRY.add_collector(_source_families)
+
+
+def _singleflight_families():
+    """Gedeelde fetches per bron: leaders deden de fetch, coalesced wachtten erop mee."""
+    stats = {}
+    for source in sources:
+        # Bij een snapshot doet de live fallback-client de fetches.
+        flight = getattr(getattr(source.client, "fallback", None) or source.client, "singleflight", None)
+        if flight is not None:
+            stats[source.name] = flight.stats()
+    yield "counter", "psalm_singleflight_events", "Misses per bron: eigen fetch (leader) of meegewacht (coalesced).", [
+        ({"source": name, "role": role}, flight[key])
+        for name, flight in stats.items()
+        for role, key in (("leader", "leaders"), ("coalesced", "coalesced"))
+    ]
+    yield "gauge", "psalm_singleflight_inflight", "Lopende gedeelde fetches per bron.", [
+        ({"source": name}, flight["inflight"]) for name, flight in stats.items()
+    ]
+
+
+metrics.REGISTRY.add_collector(_singleflight_families)
+
+
+@app.get("/metrics", include_in_schema=False)
+def prometheus_metrics() -> Response:
+    return Response(content=metrics.REGISTRY.render(), media_type=metrics.CONTENT_TYPE)
+
+
+@app.get("/healthz", include_in_schema=False)
+async def healthz(deep: bool = False) -> Dict[str, Any]:
+    """Liveness; met ?deep=1 ook bereikbaarheid van psalmboek.nl en opwarming van de cache."""
+    if not deep:
+        return {"status": "ok"}
+    upstream = await client.aprobe()
+    tiers = client.cache_stats()
+    memory = tiers.get("memory", {})
+    lookups = memory.get("hits", 0) + memory.get("stale_hits", 0) + memory.get("misses", 0)
+    return {
+        "status": "ok" if upstream.get("reachable") is not False else "degraded",
+        "upstream": upstream,
+        "cache": {
+            **tiers,
+            "hit_ratio": round((lookups - memory.get("misses", 0)) / lookups, 4) if lookups else None,
+        },
+    }
+
+
+@app.get("/readyz", include_in_schema=False)
+def readyz() -> JSONResponse:
+    """Readiness voor de proxy: 503 tot de warm-set geladen is (los van liveness)."""
+    status = warmup.status()
+    if not warmup.ready:
+        return JSONResponse({"status": "warming_up", "warmup": status}, status_code=503)
+    return JSONResponse({"status": "ready", "warmup": status})
+
+
+response_validator = ResponseValidator(mode=settings.VALIDATION_MODE, sample_rate=settings.VALIDATION_SAMPLE_RATE)
+
+
+def _validate(payload: Dict[str, Any]) -> None:
     try:
-        ensure_response_matches_schema(payload)
+        elapsed = response_validator.validate(payload)
     except ValueError as exc:
         raise HTTPException(status_code=500, detail=f"Schema-validatie faalde: {exc}")
-    return JSONResponse(content=payload, status_code=status_code)
+    if elapsed is not None:
+        metrics.VALIDATION_SECONDS.observe(elapsed)
+
+
+cache_policy = HttpCachePolicy(
+    max_age=settings.HTTP_CACHE_MAX_AGE,
+    immutable=settings.HTTP_CACHE_IMMUTABLE,
+    error_max_age=settings.HTTP_CACHE_ERROR_MAX_AGE,
+    memo_seconds=settings.CACHE_SECONDS,
+)
+
+
+def _schema_response(
+    payload: Dict[str, Any], *, status_code: int = 200, headers: Optional[Dict[str, str]] = None
+) -> JSONResponse:
+    """
+    Valideert payload tegen het response-schema voor psalm_lookup_1773.
+    Als validatie faalt: geef een duidelijke 500 met detail (zodat je het kunt fixen).
+    """
+    _validate(payload)
+    return JSONResponse(content=payload, status_code=status_code, headers=headers)
 
 
 OPENAPI_YAML = """openapi: 3.1.0
@@ -67,6 +395,10 @@ info:
       - GET /api/psalm/vers?psalm={1..150}&vers={1..}
       - GET /api/psalm/max?psalm={1..150}
       - GET /api/psalm/lookup?query=<psalmverzoek>
+      - POST /api/psalm/lookup/batch
+      - GET /api/psalm/search?q=<tekstfragment>
+      - POST /api/bijbel/refs
+      - GET /api/bronnen, GET /api/bronnen/{bron}/{nummer}, POST /api/bronnen/lookup
 servers:
   - url: https://gpt-harbers.duckdns.org
 paths:
@@ -109,44 +441,140 @@ paths:
           name: query
           required: true
           schema: { type: string, minLength: 1 }
+        - in: query
+          name: stream
+          schema: { type: boolean, default: false }
+          description: NDJSON-stream (ook via Accept application/x-ndjson)
       responses:
-        "200": { description: Schema-conform resultaat }
+        "200": { description: Schema-conform resultaat; bij meerdere psalmen {results} zoals de batch }
         "404": { description: Vers niet gevonden in bron }
         "502": { description: Fout bij bron of verificatie }
+  /api/psalm/lookup/batch:
+    post:
+      summary: Meerdere psalmverzoeken in één request (per item een eigen status)
+      operationId: psalm_lookup_1773_batch
+      requestBody:
+        required: true
+        content:
+          application/json:
+            schema:
+              type: object
+              required: [queries]
+              properties:
+                queries: { type: array, minItems: 1, maxItems: 50, items: { type: string } }
+      responses:
+        "200": { description: Per psalmverwijzing een schema-conform resultaat, in dezelfde volgorde }
+        "422": { description: Validatiefout (body onjuist) }
+  /api/psalm/search:
+    get:
+      summary: Zoek verzen op tekst (hoofdletter- en diakriet-ongevoelig, frasen en prefixen)
+      operationId: psalm_search_1773
+      parameters:
+        - in: query
+          name: q
+          required: true
+          schema: { type: string, minLength: 1, maxLength: 200 }
+        - in: query
+          name: limit
+          schema: { type: integer, minimum: 1, maximum: 50, default: 10 }
+      responses:
+        "200": { description: Gerangschikte verzen, elk als psalm_lookup_1773-resultaat }
+        "422": { description: Validatiefout (query-parameters onjuist) }
+  /api/bronnen:
+    get:
+      summary: Beschikbare bronnen (psalmen 1773, gezangen 1938) en hun cachepartitie
+      operationId: list_sources
+      responses:
+        "200": { description: Standaardbron en per bron naam, label, aantal en cachebezetting }
+  /api/bronnen/{bron}/{nummer}:
+    get:
+      summary: Verzen uit één bron, bijv. gezangen_1938
+      operationId: source_lookup
+      parameters:
+        - in: path
+          name: bron
+          required: true
+          schema: { type: string }
+        - in: path
+          name: nummer
+          required: true
+          schema: { type: integer, minimum: 1 }
+        - in: query
+          name: vers
+          schema: { type: array, items: { type: integer, minimum: 1 } }
+          description: Herhaalbaar; zonder vers alle verzen
+      responses:
+        "200": { description: "status ok met de verzen" }
+        "404": { description: Onbekende bron, nummer of vers }
+        "502": { description: Fout bij bron }
+  /api/bronnen/lookup:
+    post:
+      summary: Verzoeken voor meerdere bronnen tegelijk (per item een eigen status)
+      operationId: source_lookup_batch
+      requestBody:
+        required: true
+        content:
+          application/json:
+            schema:
+              type: object
+              required: [items]
+              properties:
+                items:
+                  type: array
+                  minItems: 1
+                  maxItems: 50
+                  items:
+                    type: object
+                    required: [bron, nummer]
+                    properties:
+                      bron: { type: string }
+                      nummer: { type: integer, minimum: 1 }
+                      verzen: { type: array, items: { type: integer, minimum: 1 } }
+      responses:
+        "200": { description: Per item status_code en antwoord, in dezelfde volgorde }
+        "422": { description: Validatiefout (body onjuist) }
+  /api/bijbel/refs:
+    post:
+      summary: Citeer bijbelverwijzingen exact uit de Statenvertaling
+      operationId: scripture_refs_statenvertaling
+      requestBody:
+        required: true
+        content:
+          application/json:
+            schema:
+              type: object
+              required: [refs]
+              properties:
+                refs: { type: array, minItems: 1, maxItems: 500, items: { type: string } }
+      responses:
+        "200": { description: Per verwijzing status (ok, invalid_ref, not_found) en de verzen }
+        "422": { description: Validatiefout (body onjuist) }
+        "503": { description: nl_Statenvertaling.txt niet geladen }
 """
 
 
-@app.get("/openapi.yaml", include_in_schema=False)
-def openapi_yaml() -> Response:
-    return Response(content=OPENAPI_YAML, media_type="application/yaml")
-
-
-@app.get("/.well-known/ai-plugin.json", include_in_schema=False)
-def manifest() -> JSONResponse:
-    return JSONResponse(
-        {
-            "schema_version": "v1",
-            "name_for_human": "Bijbels-Pastoraat-NL",
-            "name_for_model": "bijbels_pastoraat",
-            "description_for_human": "Haal psalmverzen op uit de officiële berijming van 1773.",
-            "description_for_model": (
-                "Bijbelse pastorale zorg (gereformeerd, Christus-centraal). "
-                "Voor berijmde psalmen (1773) gebruik altijd de plugin bijbels_pastoraat.get_berijmd_psalmvers "
-                "(GET /api/psalm/vers). "
-                "Bij meerdere verzen: normaliseer via /api/psalm/lookup?query=... "
-                "Bij plugin-fout: 'Vers <x> van Psalm <y> kon niet worden opgehaald.'"
-            ),
-            "auth": {"type": "none"},
-            "api": {
-                "type": "openapi",
-                "url": "https://gpt-harbers.duckdns.org/openapi.yaml",
-                "is_user_authenticated": False,
-            },
-            "logo_url": "https://gpt-harbers.duckdns.org/static/logo.svg",
-            "contact_email": "support@bijbels-pastoraat-nl.onrender.com",
-            "legal_info_url": "https://gpt-harbers.duckdns.org/legal",
-        }
-    )
+PLUGIN_MANIFEST = {
+    "schema_version": "v1",
+    "name_for_human": "Bijbels-Pastoraat-NL",
+    "name_for_model": "bijbels_pastoraat",
+    "description_for_human": "Haal psalmverzen op uit de officiële berijming van 1773.",
+    "description_for_model": (
+        "Bijbelse pastorale zorg (gereformeerd, Christus-centraal). "
+        "Voor berijmde psalmen (1773) gebruik altijd de plugin bijbels_pastoraat.get_berijmd_psalmvers "
+        "(GET /api/psalm/vers). "
+        "Bij meerdere verzen: normaliseer via /api/psalm/lookup?query=... "
+        "Bij plugin-fout: 'Vers <x> van Psalm <y> kon niet worden opgehaald.'"
+    ),
+    "auth": {"type": "none"},
+    "api": {
+        "type": "openapi",
+        "url": "https://gpt-harbers.duckdns.org/openapi.yaml",
+        "is_user_authenticated": False,
+    },
+    "logo_url": "https://gpt-harbers.duckdns.org/static/logo.svg",
+    "contact_email": "support@bijbels-pastoraat-nl.onrender.com",
+    "legal_info_url": "https://gpt-harbers.duckdns.org/legal",
+}
 
 
 SVG_LOGO = """<?xml version="1.0"?>
@@ -157,9 +585,31 @@ SVG_LOGO = """<?xml version="1.0"?>
 """
 
 
+# Eén keer als bytes met ETag en gecomprimeerde varianten; per request alleen nog kiezen.
+STATIC_ASSETS = {
+    "openapi.yaml": StaticAsset(OPENAPI_YAML, "application/yaml", max_age=settings.STATIC_MAX_AGE),
+    "ai-plugin.json": StaticAsset(encode_json(PLUGIN_MANIFEST), "application/json", max_age=settings.STATIC_MAX_AGE),
+    "logo.svg": StaticAsset(SVG_LOGO, "image/svg+xml", max_age=settings.STATIC_MAX_AGE),
+}
+
+
+def _static(name: str, request: Request) -> Response:
+    return STATIC_ASSETS[name].response(request.headers.get("accept-encoding"), request.headers.get("if-none-match"))
+
+
+@app.get("/openapi.yaml", include_in_schema=False)
+async def openapi_yaml(request: Request) -> Response:
+    return _static("openapi.yaml", request)
+
+
+@app.get("/.well-known/ai-plugin.json", include_in_schema=False)
+async def manifest(request: Request) -> Response:
+    return _static("ai-plugin.json", request)
+
+
 @app.get("/static/logo.svg", include_in_schema=False)
-def logo_svg() -> Response:
-    return Response(content=SVG_LOGO, media_type="image/svg+xml")
+async def logo_svg(request: Request) -> Response:
+    return _static("logo.svg", request)
 
 
 @app.get("/legal", include_in_schema=False, response_class=HTMLResponse)
@@ -170,16 +620,17 @@ def legal() -> str:
 # --- API ---------------------------------------------------------------------
 
 
-@app.get("/api/psalm/lookup")
-def psalm_lookup(query: str = Query(..., min_length=1)) -> JSONResponse:
+_Parsed = Tuple[Optional[ParsedPsalmReference], Optional[Dict[str, Any]]]
+
+
+def _parse_lookup(query: str) -> List[_Parsed]:
     """
-    Ondersteunt invoer zoals:
-    - 'Psalm 118: 1, 2 en 5'
-    - 'ps 118:1-3,5'
-    - 'Ps. 23 vers 1 t/m 3 en 6'
+    Per psalmverwijzing (parsed, None), bijv. twee voor 'Ps 23:1-3; Ps 121:1 en 2'.
+    Bij een fout één (None, schema-conforme foutpayload) voor het hele verzoek.
     """
+    started = time.perf_counter()
     try:
-        parsed: ParsedPsalmReference = parse_psalm_reference(query)
+        refs = parse_psalm_references(query)
     except Exception as exc:
         payload = {
             "intent": "psalm_lookup_1773",
@@ -187,74 +638,319 @@ def psalm_lookup(query: str = Query(..., min_length=1)) -> JSONResponse:
             "request": {"raw": query},
             "result": {"message": f"Ongeldig verzoek: {exc}"},
         }
-        return _schema_response(payload, status_code=400)
+        return [(None, payload)]
+    finally:
+        metrics.PARSE_SECONDS.observe(time.perf_counter() - started)
 
-    if parsed.status != "ok":
+    if refs[-1].status != "ok":
         # parser levert zelf schema-conforme foutstructuur via to_dict()
-        return _schema_response(parsed.to_dict(), status_code=400)
+        return [(None, refs[-1].to_dict())]
+    return [(parsed, None) for parsed in refs]
 
-    psalm_number = int(parsed.request["psalm_number"])
+
+def _source_error_payload(parsed: ParsedPsalmReference, exc: Exception) -> Dict[str, Any]:
+    return {
+        "intent": "psalm_lookup_1773",
+        "status": "verification_failed",
+        "request": parsed.request,
+        "result": {"message": f"Fout bij bron: {exc}"},
+    }
+
+
+def _not_found_payload(parsed: ParsedPsalmReference, vers: int) -> Dict[str, Any]:
+    return {
+        "intent": "psalm_lookup_1773",
+        "status": "not_found",
+        "request": parsed.request,
+        "result": {"message": f"Vers {vers} van Psalm {parsed.request['psalm_number']} kon niet worden opgehaald."},
+    }
+
+
+def _known_max_vers(psalm: int) -> Optional[int]:
+    return max_verses.get(psalm) if max_verses is not None else None
+
+
+def _out_of_range_payload(parsed: ParsedPsalmReference) -> Optional[Dict[str, Any]]:
+    """not_found zonder fetch als de max-verstabel al zegt dat een vers niet bestaat."""
+    max_vers = _known_max_vers(int(parsed.request["psalm_number"]))
+    if max_vers is None:
+        return None
+    beyond = [v for v in parsed.request["verses"] if v > max_vers]
+    return _not_found_payload(parsed, beyond[0]) if beyond else None
+
+
+def _lookup_payload(parsed: ParsedPsalmReference, found: Dict[int, str]) -> Tuple[Dict[str, Any], int]:
+    """Bouwt het ok/not_found-antwoord uit de (gevonden) verzen van één psalm."""
     verses: List[int] = list(parsed.request["verses"])
 
+    missing = [v for v in verses if v not in found]
+    if missing:
+        return _not_found_payload(parsed, missing[0]), 404
+
+    verse_payloads: List[Dict[str, Any]] = [{"verse": verse, "text": found[verse]} for verse in verses]
+
+    payload = {
+        "intent": "psalm_lookup_1773",
+        "status": "ok",
+        "request": parsed.request,
+        "result": {"verified": True, "verses": verse_payloads},
+    }
+    return payload, 200
+
+
+NDJSON = "application/x-ndjson"
+
+
+def _ndjson(record: Dict[str, Any]) -> bytes:
+    return json.dumps(record, ensure_ascii=False).encode("utf-8") + b"\n"
+
+
+def _stream_records(
+    parsed: ParsedPsalmReference, found: Optional[Dict[int, str]], error: Optional[Exception], check
+) -> Iterable[bytes]:
+    """Verzen en trailer van een gestreamde lookup; `check` valideert elk record (of is None)."""
+    psalm_number = parsed.request["psalm_number"]
+    status, message = "ok", None
+    if error is not None:
+        status, message = "verification_failed", f"Fout bij bron: {error}"
+    else:
+        missing = next((vers for vers in parsed.request["verses"] if vers not in found), None)
+        if missing is not None:
+            status, message = "not_found", f"Vers {missing} van Psalm {psalm_number} kon niet worden opgehaald."
+
+    count = 0
+    if status == "ok":
+        for vers in parsed.request["verses"]:
+            item = {"verse": vers, "text": found[vers]}
+            if check is not None:
+                check.verse(item)
+            count += 1
+            yield _ndjson({"type": "verse", **item})
+    if check is not None:
+        check.status(status)
+    trailer: Dict[str, Any] = {"type": "status", "status": status, "verified": status == "ok", "count": count}
+    if message is not None:
+        trailer["message"] = message
+    yield _ndjson(trailer)
+
+
+async def _lookup_stream(parsed: ParsedPsalmReference) -> AsyncIterator[bytes]:
+    """
+    NDJSON: eerst het request (direct, nog vóór de fetch), dan één record per vers en tot
+    slot een trailer met de status. De HTTP-status is dan al 200; fouten staan in de trailer.
+    """
+    check = response_validator.stream()
     try:
-        max_vers = client.get_max_vers(psalm_number)
-    except Exception as exc:
-        payload = {
-            "intent": "psalm_lookup_1773",
-            "status": "verification_failed",
-            "request": parsed.request,
-            "result": {"message": f"Fout bij bron: {exc}"},
-        }
-        return _schema_response(payload, status_code=502)
+        if check is not None:
+            check.request(parsed.request)
+        yield _ndjson({"type": "request", "intent": "psalm_lookup_1773", "request": parsed.request})
+        found: Optional[Dict[int, str]] = None
+        error: Optional[Exception] = None
+        try:
+            # De hele psalm komt in één fetch binnen; de verzen worden daarna per stuk verstuurd.
+            found = await client.aget_vers_map(int(parsed.request["psalm_number"]))
+        except Exception as exc:
+            error = exc
+        for record in _stream_records(parsed, found, error, check):
+            yield record
+    except ValueError as exc:
+        yield _ndjson({"type": "error", "message": f"Schema-validatie faalde: {exc}"})
+    finally:
+        if check is not None:
+            metrics.VALIDATION_SECONDS.observe(check.close())
+
+
+def _wants_stream(request: Request, stream: bool) -> bool:
+    return stream or NDJSON in request.headers.get("accept", "")
+
+
+def _cached_response(cached: CachedResponse, if_none_match: Optional[str]) -> Response:
+    if etag_matches(if_none_match, cached.etag):
+        return cache_policy.not_modified_response(cached.etag)
+    return Response(content=cached.body, media_type="application/json", headers=cached.headers)
 
-    out_of_range = [v for v in verses if v > max_vers]
-    if out_of_range:
-        payload = {
-            "intent": "psalm_lookup_1773",
-            "status": "not_found",
-            "request": parsed.request,
-            "result": {"message": f"Vers {out_of_range[0]} van Psalm {psalm_number} kon niet worden opgehaald."},
-        }
-        return _schema_response(payload, status_code=404)
 
-    verse_payloads: List[Dict[str, Any]] = []
+@app.get("/api/psalm/lookup")
+async def psalm_lookup(
+    request: Request, query: str = Query(..., min_length=1), stream: bool = Query(False)
+) -> Response:
+    """
+    Ondersteunt invoer zoals:
+    - 'Psalm 118: 1, 2 en 5'
+    - 'ps 118:1-3,5'
+    - 'Ps. 23 vers 1 t/m 3 en 6'
+
+    Met ?stream=true of `Accept: application/x-ndjson` komt het antwoord als NDJSON-stream.
+    Meerdere psalmen ('Ps 23:1-3; Ps 121:1 en 2') geven {"results": [...]} zoals de batch.
+    """
+    streaming = _wants_stream(request, stream)
+    if_none_match = request.headers.get("if-none-match")
+    cached = None if streaming else response_cache.get(query)
+    if cached is not None:
+        # Eerder gevalideerd en geserialiseerd antwoord: geen parse, fetch of validatie.
+        popularity.record(cached.psalm)
+        return _cached_response(cached, if_none_match)
+
+    parsed_refs = _parse_lookup(query)
+    if len(parsed_refs) > 1:
+        # Meerdere psalmen: per verwijzing een eigen antwoord, net als bij de batch.
+        results = await _lookup_results([(query, item) for item in parsed_refs])
+        return JSONResponse({"results": results}, headers={"Cache-Control": "no-store"})
+    parsed, error = parsed_refs[0]
+    if error is not None:
+        return _schema_response(error, status_code=400, headers=cache_policy.headers(400))
+    out_of_range = _out_of_range_payload(parsed)
+    if out_of_range is not None:
+        return _schema_response(out_of_range, status_code=404, headers=cache_policy.headers(404))
+
+    psalm_number = int(parsed.request["psalm_number"])
+    popularity.record(psalm_number)
+    if streaming:
+        return StreamingResponse(_lookup_stream(parsed), media_type=NDJSON, headers={"Cache-Control": "no-store"})
+    cache_key = response_cache_key(client.berijming, parsed.request)
+    cached = response_cache.get_key(cache_key, query)
+    if cached is not None:
+        return _cached_response(cached, if_none_match)
+    not_modified = cache_policy.not_modified(cache_key, if_none_match)
+    if not_modified is not None:
+        return not_modified
+
+    generation = response_cache.generation(psalm_number)
     try:
-        for verse in verses:
-            text = client.get_vers(psalm_number, verse)
-            verse_payloads.append({"verse": verse, "text": text})
-    except ValueError:
-        payload = {
-            "intent": "psalm_lookup_1773",
-            "status": "not_found",
-            "request": parsed.request,
-            "result": {"message": f"Vers {verse} van Psalm {psalm_number} kon niet worden opgehaald."},
-        }
-        return _schema_response(payload, status_code=404)
+        # Eén fetch/parse voor de hele psalm, ongeacht het aantal gevraagde verzen.
+        found = await client.aget_verses(psalm_number, parsed.request["verses"])
+    except Rejected as exc:
+        return _schema_response(_source_error_payload(parsed, exc), status_code=exc.status_code, headers=exc.headers)
     except Exception as exc:
-        payload = {
-            "intent": "psalm_lookup_1773",
-            "status": "verification_failed",
-            "request": parsed.request,
-            "result": {"message": f"Fout bij bron: {exc}"},
-        }
-        return _schema_response(payload, status_code=502)
+        return _schema_response(_source_error_payload(parsed, exc), status_code=502, headers=cache_policy.headers(502))
 
-    payload = {
+    payload, status_code = _lookup_payload(parsed, found)
+    if status_code != 200:
+        return _schema_response(payload, status_code=status_code, headers=cache_policy.headers(status_code))
+
+    etag = cache_policy.remember(cache_key, found)
+    _validate(payload)
+    headers = cache_policy.headers(200, etag)
+    body = encode_json(payload)
+    response_cache.put(query, cache_key, psalm_number, generation, body, headers, etag)
+    if etag_matches(if_none_match, etag):
+        return cache_policy.not_modified_response(etag)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+async def _lookup_results(items: List[Tuple[str, _Parsed]]) -> List[Dict[str, Any]]:
+    """Per (query, parse-resultaat) een schema-conform antwoord; elke psalm hooguit één fetch."""
+    rejected = [_out_of_range_payload(parsed) if parsed is not None else None for _, (parsed, _) in items]
+    psalms = {
+        int(parsed.request["psalm_number"])
+        for (_, (parsed, _)), out_of_range in zip(items, rejected)
+        if parsed is not None and out_of_range is None
+    }
+    for psalm in psalms:
+        popularity.record(psalm)
+
+    semaphore = asyncio.Semaphore(max(1, settings.BATCH_FETCH_CONCURRENCY))
+
+    async def fetch(psalm: int) -> Tuple[int, Any]:
+        async with semaphore:
+            try:
+                return psalm, await client.aget_vers_map(psalm)
+            except Exception as exc:
+                return psalm, exc
+
+    vers_maps = dict(await asyncio.gather(*(fetch(psalm) for psalm in sorted(psalms))))
+
+    results: List[Dict[str, Any]] = []
+    for (query, (parsed, error)), out_of_range in zip(items, rejected):
+        if error is not None:
+            payload, status_code = error, 400
+        elif out_of_range is not None:
+            payload, status_code = out_of_range, 404
+        else:
+            vers_map = vers_maps[int(parsed.request["psalm_number"])]
+            if isinstance(vers_map, Exception):
+                status_code = vers_map.status_code if isinstance(vers_map, Rejected) else 502
+                payload = _source_error_payload(parsed, vers_map)
+            else:
+                payload, status_code = _lookup_payload(parsed, vers_map)
+        _validate(payload)
+        results.append({"query": query, "status_code": status_code, "response": payload})
+    return results
+
+
+@app.post("/api/psalm/lookup/batch")
+async def psalm_lookup_batch(body: PsalmLookupBatchRequest) -> JSONResponse:
+    """
+    Meerdere psalmverzoeken in één request (bijv. een complete orde van dienst).
+    Elke psalm wordt hooguit één keer opgehaald, met begrensde gelijktijdigheid;
+    elk item krijgt een eigen schema-conform antwoord en statuscode. Een query met
+    meerdere psalmen ('Ps 23:1-3; Ps 121:1') levert opeenvolgende items met dezelfde query.
+    """
+    items = [(query, parsed) for query in body.queries for parsed in _parse_lookup(query)]
+    return JSONResponse({"results": await _lookup_results(items)})
+
+
+def _search_payload(hit: SearchHit) -> Dict[str, Any]:
+    return {
         "intent": "psalm_lookup_1773",
         "status": "ok",
-        "request": parsed.request,
-        "result": {"verified": True, "verses": verse_payloads},
+        "request": {"psalm_number": hit.psalm, "verses": [hit.vers]},
+        "result": {"verified": True, "verses": [{"verse": hit.vers, "text": hit.text}]},
     }
-    return _schema_response(payload)
+
+
+@app.get("/api/psalm/search")
+def psalm_search(
+    q: str = Query(..., min_length=1, max_length=200), limit: int = Query(10, ge=1, le=50)
+) -> JSONResponse:
+    """
+    Zoekt op (een deel van) de verstekst, bijv. 'Gelijk een hert' of '"ik hef mijn ogen"'.
+    Doorzoekt alleen psalmen die al in de index staan (zie `indexed_psalms`).
+    """
+    results = []
+    for hit in search_index.search(q, limit):
+        payload = _search_payload(hit)
+        _validate(payload)
+        results.append({"score": hit.score, "response": payload})
+    return JSONResponse({"query": q, "indexed_psalms": search_index.psalms, "results": results})
+
+
+@app.post("/api/bijbel/refs")
+def scripture_refs(body: ScriptureRefsRequest) -> JSONResponse:
+    """
+    Citeert verwijzingen zoals 'Johannes 3:16' of 'Ps. 23:1-3' exact uit nl_Statenvertaling.txt
+    (voor de scripture_refs van pastoral_duiding_reformed). Elk item krijgt een eigen status:
+    ok, invalid_ref of not_found.
+    """
+    if bible is None:
+        raise HTTPException(status_code=503, detail="nl_Statenvertaling.txt is niet geladen (STATENVERTALING_PATH).")
+    return JSONResponse({"results": [bible.resolve(ref).to_dict() for ref in body.refs]})
 
 
 @app.get("/api/psalm/max", response_model=PsalmMaxResponse)
-def get_psalm_max(psalm: int = Query(..., ge=1, le=150)) -> PsalmMaxResponse:
+async def get_psalm_max(
+    request: Request, response: Response, psalm: int = Query(..., ge=1, le=150)
+) -> PsalmMaxResponse:
+    popularity.record(psalm)
+    cache_key = ("max", client.berijming, psalm)
+    if_none_match = request.headers.get("if-none-match")
+    not_modified = cache_policy.not_modified(cache_key, if_none_match)
+    if not_modified is not None:
+        return not_modified
+
     try:
-        max_vers = client.get_max_vers(psalm)
+        max_vers = _known_max_vers(psalm) or await client.aget_max_vers(psalm)
+    except Rejected as exc:
+        raise HTTPException(status_code=exc.status_code, detail=str(exc), headers=exc.headers) from exc
     except Exception as exc:
-        raise HTTPException(status_code=502, detail=f"Fout bij ophalen bron: {exc}") from exc
+        raise HTTPException(
+            status_code=502, detail=f"Fout bij ophalen bron: {exc}", headers=cache_policy.headers(502)
+        ) from exc
 
+    etag = cache_policy.remember(cache_key, {psalm: max_vers})
+    if etag_matches(if_none_match, etag):
+        return cache_policy.not_modified_response(etag)
+    response.headers.update(cache_policy.headers(200, etag))
     return PsalmMaxResponse(
         psalm=psalm,
         max_vers=max_vers,
@@ -263,25 +959,152 @@ def get_psalm_max(psalm: int = Query(..., ge=1, le=150)) -> PsalmMaxResponse:
 
 
 @app.get("/api/psalm/vers", response_model=PsalmVersResponse)
-def get_psalm_vers(psalm: int = Query(..., ge=1, le=150), vers: int = Query(..., ge=1)) -> PsalmVersResponse:
+async def get_psalm_vers(
+    request: Request, response: Response, psalm: int = Query(..., ge=1, le=150), vers: int = Query(..., ge=1)
+) -> PsalmVersResponse:
+    popularity.record(psalm)
+    cache_key = ("vers", client.berijming, psalm, vers)
+    if_none_match = request.headers.get("if-none-match")
+    not_modified = cache_policy.not_modified(cache_key, if_none_match)
+    if not_modified is not None:
+        return not_modified
+
     try:
-        max_vers = client.get_max_vers(psalm)
+        max_vers = _known_max_vers(psalm) or await client.aget_max_vers(psalm)
+    except Rejected as exc:
+        raise HTTPException(status_code=exc.status_code, detail=str(exc), headers=exc.headers) from exc
     except Exception as exc:
-        raise HTTPException(status_code=502, detail=f"Fout bij ophalen bron: {exc}") from exc
+        raise HTTPException(
+            status_code=502, detail=f"Fout bij ophalen bron: {exc}", headers=cache_policy.headers(502)
+        ) from exc
 
     if vers > max_vers:
-        raise HTTPException(status_code=400, detail=f"Vers {vers} van Psalm {psalm} kon niet worden opgehaald.")
+        raise HTTPException(
+            status_code=400,
+            detail=f"Vers {vers} van Psalm {psalm} kon niet worden opgehaald.",
+            headers=cache_policy.headers(400),
+        )
 
     try:
-        text = client.get_vers(psalm, vers)
+        text = await client.aget_vers(psalm, vers)
     except ValueError:
-        raise HTTPException(status_code=404, detail=f"Vers {vers} van Psalm {psalm} kon niet worden opgehaald.")
+        raise HTTPException(
+            status_code=404,
+            detail=f"Vers {vers} van Psalm {psalm} kon niet worden opgehaald.",
+            headers=cache_policy.headers(404),
+        )
+    except Rejected as exc:
+        raise HTTPException(status_code=exc.status_code, detail=str(exc), headers=exc.headers) from exc
     except Exception as exc:
-        raise HTTPException(status_code=502, detail=f"Fout bij ophalen bron: {exc}") from exc
+        raise HTTPException(
+            status_code=502, detail=f"Fout bij ophalen bron: {exc}", headers=cache_policy.headers(502)
+        ) from exc
 
+    etag = cache_policy.remember(cache_key, {vers: text})
+    if etag_matches(if_none_match, etag):
+        return cache_policy.not_modified_response(etag)
+    response.headers.update(cache_policy.headers(200, etag))
     return PsalmVersResponse(
         psalm=psalm,
         vers=vers,
         text=text,
         bron=f"{settings.PSALM_SOURCE_BASE}/psalmen.php?berijming={client.berijming}&psalm={psalm}#{vers}",
     )
+
+
+# --- Bronnen (psalmen 1773, gezangen 1938, ...) -------------------------------------------
+
+
+def _source_payload(
+    name: str, number: int, status: str, *, source: Optional[Source] = None, message: Optional[str] = None
+) -> Dict[str, Any]:
+    payload: Dict[str, Any] = {"bron": name, "nummer": number, "status": status}
+    url = source.url(number) if source is not None else None
+    if url is not None:
+        payload["bron_url"] = url
+    if message is not None:
+        payload["message"] = message
+    return payload
+
+
+def _source_precheck(name: str, number: int, verses: List[int]) -> Optional[Tuple[Dict[str, Any], int]]:
+    """Fout zonder fetch: onbekende bron, nummer buiten de collectie of vers voorbij de max-verstabel."""
+    try:
+        source = sources.get(name)
+        source.check(number)
+    except UnknownSource:
+        return _source_payload(name, number, "unknown_source", message=f"Onbekende bron: {name}."), 404
+    except ValueError as exc:
+        return _source_payload(name, number, "not_found", message=str(exc)), 404
+    max_vers = source.known_max_vers(number)
+    beyond = [vers for vers in verses if max_vers is not None and vers > max_vers]
+    if beyond:
+        message = f"Vers {beyond[0]} van {source.label} {number} kon niet worden opgehaald."
+        return _source_payload(name, number, "not_found", source=source, message=message), 404
+    return None
+
+
+def _source_result(name: str, number: int, verses: List[int], vers_map: Any) -> Tuple[Dict[str, Any], int]:
+    """Antwoord voor één (bron, nummer, verzen) uit de versmap of de fout van de fetch."""
+    source = sources.get(name)
+    if isinstance(vers_map, Exception):
+        status_code = vers_map.status_code if isinstance(vers_map, Rejected) else 502
+        message = f"Fout bij bron: {vers_map}"
+        return _source_payload(name, number, "verification_failed", source=source, message=message), status_code
+    wanted = verses or sorted(vers_map)
+    missing = [vers for vers in wanted if vers not in vers_map]
+    if missing:
+        message = f"Vers {missing[0]} van {source.label} {number} kon niet worden opgehaald."
+        return _source_payload(name, number, "not_found", source=source, message=message), 404
+    payload = _source_payload(name, number, "ok", source=source)
+    payload["verses"] = [{"verse": vers, "text": vers_map[vers]} for vers in wanted]
+    return payload, 200
+
+
+@app.get("/api/bronnen")
+def list_sources() -> JSONResponse:
+    """Beschikbare bronnen met hun omvang en de bezetting van hun cachepartitie."""
+    default = sources.default.name if sources.default is not None else None
+    return JSONResponse({"standaard": default, "bronnen": [source.describe() for source in sources]})
+
+
+@app.get("/api/bronnen/{bron}/{nummer}")
+async def source_lookup(bron: str, nummer: int, vers: List[int] = Query([])) -> JSONResponse:
+    """
+    Verzen uit één bron, bijv. /api/bronnen/gezangen_1938/12?vers=1&vers=3; zonder `vers`
+    alle verzen. De bestaande /api/psalm/*-endpoints blijven de psalmen 1773 bedienen.
+    """
+    verses = sorted(set(vers))
+    rejected = _source_precheck(bron, nummer, verses)
+    if rejected is not None:
+        payload, status_code = rejected
+        return JSONResponse(payload, status_code=status_code, headers=cache_policy.headers(status_code))
+    try:
+        vers_map: Any = await sources.get(bron).aget_vers_map(nummer)
+    except Exception as exc:
+        vers_map = exc
+    payload, status_code = _source_result(bron, nummer, verses, vers_map)
+    headers = vers_map.headers if isinstance(vers_map, Rejected) else cache_policy.headers(status_code)
+    return JSONResponse(payload, status_code=status_code, headers=headers)
+
+
+@app.post("/api/bronnen/lookup")
+async def source_lookup_batch(body: SourceLookupRequest) -> JSONResponse:
+    """
+    Verzoeken voor meerdere bronnen in één request. Elk (bron, nummer) wordt hooguit één keer
+    opgehaald; de bronnen gelijktijdig, per bron met BATCH_FETCH_CONCURRENCY tegelijk.
+    """
+    items = [(item.bron, item.nummer, sorted(set(item.verzen))) for item in body.items]
+    rejected = [_source_precheck(name, number, verses) for name, number, verses in items]
+    vers_maps = await sources.afetch_many(
+        [(name, number) for (name, number, _), error in zip(items, rejected) if error is None],
+        concurrency=settings.BATCH_FETCH_CONCURRENCY,
+    )
+
+    results: List[Dict[str, Any]] = []
+    for (name, number, verses), error in zip(items, rejected):
+        payload, status_code = error if error is not None else _source_result(
+            name, number, verses, vers_maps[(name, number)]
+        )
+        results.append({"status_code": status_code, "response": payload})
+    return JSONResponse({"results": results})
@@ -0,0 +1,179 @@
+"""
+Vooraf berekende tabel met het hoogste versnummer per psalm, per berijming.
+
+De tabel staat als JSON in data/max_verses_<berijming>.json en wordt bij het importeren
+geladen (zie psalms.py). Daarmee zijn /api/psalm/max en de bereikcontrole van verzoeken
+pure geheugenlookups; alleen psalmen die niet in de tabel staan gaan nog naar de client.
+
+Bouwen (crawlt psalmboek.nl één keer, of leest een bestaande snapshot):
+    python max_verses.py build
+    python max_verses.py build --from-snapshot data/psalmen_1773.snap
+
+Controleren op drift met de live site (exit-code 1 bij verschillen; zie
+.github/workflows/verify-max-verses.yml):
+    python max_verses.py verify
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import pathlib
+import sys
+import time
+from typing import Dict, Iterable, Mapping, Optional, Tuple
+
+FORMAT_VERSION = 1
+DATA_DIR = pathlib.Path(__file__).resolve().parent / "data"
+
+
+def default_path(berijming: str) -> pathlib.Path:
+    return DATA_DIR / f"max_verses_{berijming}.json"
+
+
+class MaxVerseTable:
+    def __init__(
+        self,
+        berijming: str,
+        max_verses: Mapping[int, int],
+        *,
+        generated_at: Optional[str] = None,
+        source: Optional[str] = None,
+    ):
+        self.berijming = berijming
+        self.max_verses: Dict[int, int] = dict(max_verses)
+        self.generated_at = generated_at
+        self.source = source
+
+    def get(self, psalm: int) -> Optional[int]:
+        return self.max_verses.get(psalm)
+
+    def __contains__(self, psalm: object) -> bool:
+        return psalm in self.max_verses
+
+    def __len__(self) -> int:
+        return len(self.max_verses)
+
+    def to_dict(self) -> Dict[str, object]:
+        return {
+            "format": FORMAT_VERSION,
+            "berijming": self.berijming,
+            "generated_at": self.generated_at,
+            "source": self.source,
+            "max_verses": {str(psalm): self.max_verses[psalm] for psalm in sorted(self.max_verses)},
+        }
+
+
+def write_table(path: os.PathLike, table: MaxVerseTable) -> None:
+    """Schrijft de tabel atomair (gesorteerd, zodat diffs in review leesbaar zijn)."""
+    path = pathlib.Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(path.name + ".tmp")
+    tmp_path.write_text(json.dumps(table.to_dict(), indent=2) + "\n", encoding="utf-8")
+    os.replace(tmp_path, path)
+
+
+def load_table(
+    berijming: str, path: Optional[os.PathLike] = None, *, max_number: int = 150
+) -> Optional[MaxVerseTable]:
+    """Laadt de tabel voor berijming (nummers 1..max_number); None als het bestand (nog) niet bestaat."""
+    path = pathlib.Path(path) if path else default_path(berijming)
+    if not path.exists():
+        return None
+    data = json.loads(path.read_text(encoding="utf-8"))
+    if data.get("format") != FORMAT_VERSION:
+        raise ValueError(f"Max-verstabel {path}: formaat {data.get('format')} wordt niet ondersteund.")
+    if data.get("berijming") != berijming:
+        raise ValueError(f"Max-verstabel {path} is voor berijming {data.get('berijming')}, niet {berijming}.")
+    max_verses = {int(psalm): int(max_vers) for psalm, max_vers in data["max_verses"].items()}
+    invalid = [psalm for psalm, max_vers in max_verses.items() if not 1 <= psalm <= max_number or max_vers < 1]
+    if invalid:
+        raise ValueError(f"Max-verstabel {path}: ongeldige waarden voor psalm {invalid[0]}.")
+    return MaxVerseTable(berijming, max_verses, generated_at=data.get("generated_at"), source=data.get("source"))
+
+
+def build(client, psalms: Iterable[int], delay: float = 1.0) -> MaxVerseTable:
+    """Haalt het hoogste versnummer per psalm op via de client (live of snapshot)."""
+    max_verses: Dict[int, int] = {}
+    for psalm in psalms:
+        max_verses[psalm] = client.get_max_vers(psalm)
+        print(f"psalm {psalm}: {max_verses[psalm]} verzen")
+        if delay:
+            time.sleep(delay)
+    return MaxVerseTable(
+        client.berijming,
+        max_verses,
+        generated_at=time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        source=getattr(client, "base_url", None) or getattr(client, "path", None),
+    )
+
+
+def verify(table: MaxVerseTable, client, delay: float = 1.0) -> Dict[int, Tuple[int, Optional[int]]]:
+    """Vergelijkt de tabel met de bron: {psalm: (tabel, live)} voor elke afwijking."""
+    drift: Dict[int, Tuple[int, Optional[int]]] = {}
+    for psalm in sorted(table.max_verses):
+        try:
+            live: Optional[int] = client.get_max_vers(psalm)
+        except Exception as exc:
+            print(f"psalm {psalm}: niet op te halen ({exc})", file=sys.stderr)
+            live = None
+        if live != table.max_verses[psalm]:
+            drift[psalm] = (table.max_verses[psalm], live)
+        if delay:
+            time.sleep(delay)
+    return drift
+
+
+def _main() -> int:
+    parser = argparse.ArgumentParser(description="Bouw of controleer de max-verstabel.")
+    parser.add_argument("--berijming", default=None, help="standaard PSALM_BERIJMING uit de config")
+    parser.add_argument("--bron", default=None, help="andere bron uit het register, bijv. gezangen_1938 (sources.py)")
+    parser.add_argument("--path", default=None, help="standaard data/max_verses_<berijming>.json")
+    sub = parser.add_subparsers(dest="command", required=True)
+    build_cmd = sub.add_parser("build", help="crawl psalmboek.nl (of een snapshot) en schrijf de tabel")
+    build_cmd.add_argument("--first", type=int, default=1)
+    build_cmd.add_argument("--last", type=int, default=None, help="standaard het aantal nummers van de bron")
+    build_cmd.add_argument("--delay", type=float, default=1.0, help="pauze tussen requests (beleefd naar de bron)")
+    build_cmd.add_argument("--from-snapshot", help="lees uit een psalm-snapshot in plaats van live")
+    verify_cmd = sub.add_parser("verify", help="vergelijk de tabel met de live site")
+    verify_cmd.add_argument("--delay", type=float, default=1.0)
+    args = parser.parse_args()
+
+    from config import settings
+    from psalm_client import client as live_client
+
+    count = 150
+    if args.bron:
+        from psalms import sources
+
+        entry = sources.get(args.bron)
+        live_client, count = entry.client, entry.count
+    berijming = args.berijming or (live_client.berijming if args.bron else settings.PSALM_BERIJMING)
+    path = pathlib.Path(args.path) if args.path else default_path(berijming)
+
+    if args.command == "build":
+        source = live_client
+        if args.from_snapshot:
+            from psalm_snapshot import SnapshotClient
+
+            source = SnapshotClient(args.from_snapshot)
+        last = args.last or count
+        table = build(source, range(args.first, last + 1), delay=0 if args.from_snapshot else args.delay)
+        write_table(path, table)
+        print(f"tabel geschreven: {path} ({len(table)} psalmen)")
+        return 0
+
+    table = load_table(berijming, path, max_number=count)
+    if table is None:
+        print(f"geen tabel gevonden: {path}", file=sys.stderr)
+        return 2
+    drift = verify(table, live_client, delay=args.delay)
+    for psalm, (expected, live) in drift.items():
+        print(f"DRIFT psalm {psalm}: tabel {expected}, live {live}")
+    print(f"{len(table)} psalmen gecontroleerd, {len(drift)} afwijkingen")
+    return 1 if drift else 0
+
+
+if __name__ == "__main__":
+    sys.exit(_main())
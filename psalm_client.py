@@ -1,97 +1,762 @@
-import re
-import time
-from typing import Dict
+from __future__ import annotations
 
-import httpx
+import asyncio
+import hashlib
+import logging
+import sqlite3
+import ssl
+import threading
+import time
+from functools import lru_cache
+from typing import TYPE_CHECKING, Callable, Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
 
+import metrics
+from admission import Admission, ClientLimiter, ConcurrencyLimiter, Rejected
+from cache import TTLCache
 from config import settings
+from extract_pool import ExtractionPool
+from psalm_extract import get_engine
+from resilience import CircuitBreaker, CircuitOpenError, DeadlineExceeded, RetryBudget, UpstreamGuard
+from singleflight import SingleFlight
+from sqlite_cache import SqliteVerseCache, hashed
+
+if TYPE_CHECKING:
+    import httpx
+
+logger = logging.getLogger(__name__)
 
 UA = "BijbelsPastoraatNL/1.0 (+https://gpt-harbers.duckdns.org)"
+FALLBACK_UA = "Mozilla/5.0"
+# Pagina per nummer; {base} = base_url, {berijming} en {number} per client/verzoek.
+PSALMEN_URL = "{base}/psalmen.php?berijming={berijming}&psalm={number}"
+
+
+@lru_cache(maxsize=None)
+def _httpx():
+    """httpx (en via http2=True de h2-stack) pas bij de eerste fetch laden: scheelt bij elke coldstart."""
+    import httpx
+
+    return httpx
+
+
+@lru_cache(maxsize=None)
+def _ssl_context() -> ssl.SSLContext:
+    """Eén SSL-context voor alle clients en bronnen: de CA-bundel laden kost per context tientallen ms."""
+    return _httpx().create_ssl_context()
+
+
+def _vers_map_size(vers_map: Dict[int, str]) -> int:
+    """Benadering van het geheugengebruik van een versmap (tekst + dict-overhead)."""
+    return 64 + sum(len(text.encode("utf-8")) + 64 for text in vers_map.values())
+
+
+def _html_hash(html: str) -> str:
+    return hashlib.blake2b(html.encode("utf-8"), digest_size=16).hexdigest()
+
+
+class UpstreamPage(str):
+    """HTML van psalmen.php, met de validators uit de response-headers."""
+
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+
+
+class NotModified(Exception):
+    """psalmboek.nl antwoordde 304 op een conditioneel verzoek."""
+
+
+class _Validators(NamedTuple):
+    etag: Optional[str]
+    last_modified: Optional[str]
+    html_hash: str
+    html_bytes: int
+    parse_seconds: float
 
 
 class PsalmboekClient:
-    """Scraper voor psalmboek.nl (berijming 1773) – leest alleen /psalmen.php."""
+    """
+    Scraper voor psalmboek.nl: één collectie (standaard de psalmen, berijming 1773) via één
+    paginasjabloon. `berijming` is ook de cachepartitie (geheugen, SQLite, singleflight).
+    """
 
-    def __init__(self, base_url: str, berijming: str, cache_seconds: int = 0):
+    def __init__(
+        self,
+        base_url: str,
+        berijming: str,
+        cache_seconds: int = 0,
+        *,
+        cache_max_entries: int = 512,
+        cache_max_bytes: int = 32 * 1024 * 1024,
+        cache_max_stale: int = 0,
+        disk_cache: Optional[SqliteVerseCache] = None,
+        extraction_engine: str = "fast",
+        resilience: Optional[UpstreamGuard] = None,
+        extraction_pool: Optional[ExtractionPool] = None,
+        admission: Optional[Admission] = None,
+        url_template: str = PSALMEN_URL,
+        probe_cache_seconds: float = 5.0,
+    ):
         self.base_url = base_url.rstrip("/")
         self.berijming = berijming
-        self.cache_seconds = max(0, cache_seconds)
-        self._cache: Dict[tuple, tuple[float, object]] = {}
-        self._http = httpx.Client(
-            http2=True,
-            headers={"User-Agent": UA},
-            timeout=httpx.Timeout(15.0, connect=10.0, read=10.0),
-            follow_redirects=True,
+        self.url_template = url_template
+        self.extraction_engine = extraction_engine
+        self._extract = get_engine(extraction_engine)
+        # Optioneel: extractie in aparte processen, zodat parsen de GIL niet vasthoudt (extract_pool.py).
+        self.extraction_pool = extraction_pool
+        self._cache: TTLCache[Dict[int, str]] = TTLCache(
+            cache_seconds,
+            max_entries=cache_max_entries,
+            max_bytes=cache_max_bytes,
+            max_stale=cache_max_stale,
+            sizeof=_vers_map_size,
+        )
+        # Per psalm de upstream-validators (ETag/Last-Modified/HTML-hash) van de laatste fetch,
+        # zodat een refresh conditioneel kan en een ongewijzigde pagina niet opnieuw geparsed wordt.
+        # Geen versmap: die blijft onder het LRU-/bytebudget van _cache en komt bij een 304 uit
+        # _cache of SQLite (_known_vers_map); is hij daar verdrongen, dan volgt een gewone fetch.
+        self._validators: TTLCache[_Validators] = TTLCache(
+            cache_seconds + max(cache_max_stale, cache_seconds), max_entries=cache_max_entries
+        )
+        self._revalidation_lock = threading.Lock()
+        self.revalidation = {
+            "not_modified": 0,
+            "unchanged": 0,
+            "changed": 0,
+            "bytes_saved": 0,
+            "parse_seconds_saved": 0.0,
+        }
+        # Optionele gedeelde laag onder het geheugen (zie sqlite_cache.py).
+        self._disk = disk_cache
+        # Wie wil weten welke versmappen er binnenkomen (bijv. de zoekindex); zie subscribe().
+        self._listeners: List[Callable[[int, Dict[int, str]], None]] = []
+        # Circuit breaker, retry-budget, hedging en deadlines rond elke upstream-fetch.
+        self.resilience = resilience or UpstreamGuard()
+        # Begrenst gelijktijdige fetches en het aantal misses per client (zie admission.py).
+        self.admission = admission or Admission()
+        self._refreshing: Set[tuple] = set()
+        self._refresh_lock = threading.Lock()
+        # Gelijktijdige misses op dezelfde (berijming, psalm) delen één fetch en parse; de
+        # verstreken deadline van de leider geldt niet voor de wachtenden.
+        self.singleflight = SingleFlight(leader_only=(DeadlineExceeded,))
+        # Laatste uitkomst van aprobe() met tijdstip; herhaalde deep health checks raken de bron niet.
+        self.probe_cache_seconds = probe_cache_seconds
+        self._probe: Optional[Tuple[float, Dict[str, object]]] = None
+        # Beide HTTP-clients worden pas bij de eerste fetch aangemaakt; de AsyncClient per
+        # event loop, die deelt dan zijn HTTP/2-pool over alle async requests.
+        self._http: httpx.Client | None = None
+        self._http_lock = threading.Lock()
+        self._ahttp: httpx.AsyncClient | None = None
+        self._ahttp_loop: asyncio.AbstractEventLoop | None = None
+
+    def _http_options(self) -> dict:
+        return {
+            "http2": True,
+            "verify": _ssl_context(),
+            "headers": {"User-Agent": UA},
+            "timeout": _httpx().Timeout(15.0, connect=10.0, read=10.0),
+            "follow_redirects": True,
+        }
+
+    def prepare(self) -> None:
+        """Laadt httpx en h2 en bouwt de SSL-context vooraf; de lifespan doet dit in een thread."""
+        self._sync_http()
+
+    def _sync_http(self) -> httpx.Client:
+        if self._http is None:
+            options = self._http_options()
+            with self._http_lock:
+                if self._http is None:
+                    self._http = _httpx().Client(**options)
+        return self._http
+
+    def _async_http(self) -> httpx.AsyncClient:
+        loop = asyncio.get_running_loop()
+        if self._ahttp is None or self._ahttp_loop is not loop:
+            self._ahttp = _httpx().AsyncClient(**self._http_options())
+            self._ahttp_loop = loop
+        return self._ahttp
+
+    async def aclose(self) -> None:
+        if self._ahttp is not None:
+            await self._ahttp.aclose()
+            self._ahttp = None
+            self._ahttp_loop = None
+
+    def page_url(self, number: int) -> str:
+        return self.url_template.format(base=self.base_url, berijming=self.berijming, number=number)
+
+    @staticmethod
+    def _observe_fetch(started: float, status: str, user_agent: str) -> None:
+        metrics.UPSTREAM_FETCH_SECONDS.labels(status=status, user_agent=user_agent).observe(
+            time.perf_counter() - started
         )
 
-    def _overview_url(self, psalm: int) -> str:
-        return f"{self.base_url}/psalmen.php?berijming={self.berijming}&psalm={psalm}"
+    @staticmethod
+    def _request_headers(user_agent: str, previous: Optional[_Validators]) -> Optional[Dict[str, str]]:
+        headers: Dict[str, str] = {"User-Agent": FALLBACK_UA} if user_agent == "fallback" else {}
+        if previous is not None:
+            if previous.etag:
+                headers["If-None-Match"] = previous.etag
+            if previous.last_modified:
+                headers["If-Modified-Since"] = previous.last_modified
+        return headers or None
+
+    @staticmethod
+    def _timeout(timeout: Optional[float]):
+        """Timeout van de resilience-laag (afgekapt op de request-deadline), anders de clientdefault."""
+        httpx = _httpx()
+        return httpx.USE_CLIENT_DEFAULT if timeout is None else httpx.Timeout(timeout, connect=min(timeout, 10.0))
+
+    def _get(
+        self,
+        url: str,
+        user_agent: str = "default",
+        previous: Optional[_Validators] = None,
+        timeout: Optional[float] = None,
+    ) -> httpx.Response:
+        headers = self._request_headers(user_agent, previous)
+        started = time.perf_counter()
+        try:
+            response = self._sync_http().get(url, headers=headers, timeout=self._timeout(timeout))
+        except _httpx().HTTPError:
+            self._observe_fetch(started, "error", user_agent)
+            raise
+        self._observe_fetch(started, str(response.status_code), user_agent)
+        return response
+
+    async def _aget(
+        self,
+        url: str,
+        user_agent: str = "default",
+        previous: Optional[_Validators] = None,
+        timeout: Optional[float] = None,
+    ) -> httpx.Response:
+        headers = self._request_headers(user_agent, previous)
+        started = time.perf_counter()
+        try:
+            response = await self._async_http().get(url, headers=headers, timeout=self._timeout(timeout))
+        except _httpx().HTTPError:
+            self._observe_fetch(started, "error", user_agent)
+            raise
+        self._observe_fetch(started, str(response.status_code), user_agent)
+        return response
 
-    def _fetch_overview(self, psalm: int) -> str:
-        url = self._overview_url(psalm)
-        response = self._http.get(url)
-        if response.status_code == 403:
-            response = self._http.get(url, headers={"User-Agent": "Mozilla/5.0"})
+    @staticmethod
+    def _page(response: httpx.Response) -> UpstreamPage:
+        if response.status_code == 304:
+            raise NotModified()
         response.raise_for_status()
-        return response.text
+        page = UpstreamPage(response.text)
+        page.etag = response.headers.get("ETag")
+        page.last_modified = response.headers.get("Last-Modified")
+        return page
+
+    def _fetch_overview(self, psalm: int, previous: Optional[_Validators] = None) -> str:
+        """HTML van de psalmpagina; met `previous` conditioneel (kan NotModified gooien)."""
+        url = self.page_url(psalm)
+
+        def attempt(timeout: float) -> str:
+            response = self._get(url, previous=previous, timeout=timeout)
+            if response.status_code == 403:
+                response = self._get(url, "fallback", previous, timeout)
+            return self._page(response)
+
+        return self.resilience.call(attempt, passthrough=(NotModified,))
+
+    async def _afetch_overview(self, psalm: int, previous: Optional[_Validators] = None) -> str:
+        url = self.page_url(psalm)
+
+        async def fetch(timeout: float) -> str:
+            response = await self._aget(url, previous=previous, timeout=timeout)
+            if response.status_code == 403:
+                response = await self._aget(url, "fallback", previous, timeout)
+            return self._page(response)
+
+        async def attempt(timeout: float) -> str:
+            # httpx-timeouts gelden per fase; wait_for maakt er een totale deadline van.
+            try:
+                return await asyncio.wait_for(fetch(timeout), timeout)
+            except asyncio.TimeoutError:
+                raise TimeoutError(f"Geen antwoord van psalmboek.nl binnen {timeout:.2f} s.") from None
+
+        return await self.resilience.acall(attempt, passthrough=(NotModified,))
+
+    async def aprobe(self, timeout: float = 3.0) -> Dict[str, object]:
+        """
+        Bereikbaarheid van de bron voor /healthz?deep=1 (vult de cache niet). Loopt via toelating
+        en breaker zoals elke fetch, en de uitkomst wordt probe_cache_seconds hergebruikt.
+        """
+        probe = self._probe
+        if probe is not None and time.monotonic() - probe[0] < self.probe_cache_seconds:
+            return probe[1]
+        result = await self.singleflight.ado(("probe", self.berijming), lambda: self._aprobe(timeout))
+        self._probe = (time.monotonic(), result)
+        return result
+
+    async def _aprobe(self, timeout: float) -> Dict[str, object]:
+        httpx = _httpx()
+
+        async def fetch(attempt_timeout: float):
+            response = await self._async_http().get(self.page_url(1), timeout=min(timeout, attempt_timeout))
+            if response.status_code >= 500:
+                response.raise_for_status()  # telt mee voor de breaker
+            return response
+
+        started = time.perf_counter()
+        try:
+            async with self.admission.aslot():
+                response = await self.resilience.acall(fetch)
+        except Rejected as exc:
+            # Druk op de bron, geen storing: niet meten, niet degraderen.
+            return {"reachable": None, "error": exc.reason}
+        except httpx.HTTPStatusError as exc:
+            return {"reachable": False, "status_code": exc.response.status_code}
+        except (httpx.HTTPError, CircuitOpenError, TimeoutError) as exc:
+            return {"reachable": False, "error": type(exc).__name__}
+        return {
+            "reachable": True,
+            "status_code": response.status_code,
+            "latency_ms": round((time.perf_counter() - started) * 1000, 1),
+        }
+
+    def cache_stats(self) -> Dict[str, Dict[str, int]]:
+        """Statistieken per cachelaag (memory, en sqlite indien ingesteld)."""
+        tiers = {"memory": self._cache.stats()}
+        if self._disk is not None:
+            tiers["sqlite"] = self._disk.stats()
+        return tiers
 
     def _extract_vers_map(self, html: str) -> Dict[int, str]:
-        from bs4 import BeautifulSoup
-
-        soup = BeautifulSoup(html, "html.parser")
-        container = soup.find(id="psalmkolom2") or soup
-        verses: Dict[int, str] = {}
-        for p in container.find_all("p"):
-            strong = p.find("strong")
-            a = strong.find("a") if strong else None
-            title = ""
-            if a and a.get_text():
-                title = a.get_text(strip=True)
-            elif strong and strong.get_text():
-                title = strong.get_text(strip=True)
-            match = re.match(r"(?i)^vers\s+(\d+)\b", title)
-            if not match:
-                match = re.match(r"(?i)^vers\s+(\d+)\b", (p.get_text(strip=True) or ""))
-            if not match:
-                continue
-            vers_num = int(match.group(1))
-            raw = p.get_text(separator="\n", strip=True)
-            raw = re.sub(rf"(?i)^\s*vers\s+{vers_num}\s*[:.]?\s*", "", raw).replace("\u00A0", " ").strip()
-            lines = [ln.strip() for ln in raw.splitlines() if ln.strip()]
-            if lines:
-                verses[vers_num] = "\n".join(lines)
-        return verses
+        started = time.perf_counter()
+        if self.extraction_pool is not None:
+            vers_map = self.extraction_pool.extract(html)
+        else:
+            vers_map = hashed(self._extract(html))
+        metrics.EXTRACTION_SECONDS.labels(engine=self.extraction_engine).observe(time.perf_counter() - started)
+        return vers_map
 
-    def get_max_vers(self, psalm: int) -> int:
-        cache_key = ("max", psalm)
-        cached = self._cache.get(cache_key)
-        if cached and time.time() - cached[0] <= self.cache_seconds:
-            return cached[1]  # type: ignore[return-value]
-        vers_map = self._extract_vers_map(self._fetch_overview(psalm))
-        max_vers = max(vers_map) if vers_map else 1
-        if self.cache_seconds > 0:
-            self._cache[cache_key] = (time.time(), max_vers)
-        return max_vers
+    async def _aextract_vers_map(self, html: str) -> Dict[int, str]:
+        if self.extraction_pool is None:
+            return await asyncio.to_thread(self._extract_vers_map, html)
+        started = time.perf_counter()
+        vers_map = await self.extraction_pool.aextract(html)
+        metrics.EXTRACTION_SECONDS.labels(engine=self.extraction_engine).observe(time.perf_counter() - started)
+        return vers_map
 
-    def get_vers(self, psalm: int, vers: int) -> str:
-        cache_key = ("vers", psalm, vers)
-        cached = self._cache.get(cache_key)
-        if cached and time.time() - cached[0] <= self.cache_seconds:
-            return cached[1]  # type: ignore[return-value]
-        vers_map = self._extract_vers_map(self._fetch_overview(psalm))
+    def _cached_vers_map(self, psalm: int) -> Dict[int, str] | None:
+        """
+        Cache-lookup met stale-while-revalidate: een verlopen (maar niet te oude) versmap
+        wordt direct geserveerd terwijl één achtergrond-refresh de bron opnieuw leest.
+        """
+        cached = self._lookup(psalm)
+        if cached is None:
+            return None
+        vers_map, fresh = cached
+        if not fresh:
+            self._refresh_in_background(psalm)
+        return vers_map
+
+    def _fresh_vers_map(self, psalm: int) -> Dict[int, str] | None:
+        cached = self._lookup(psalm)
+        if cached is not None and cached[1]:
+            return cached[0]
+        return None
+
+    def _lookup(self, psalm: int) -> Optional[Tuple[Dict[int, str], bool]]:
+        cached = self._cache.get((self.berijming, psalm))
+        if self._needs_disk(cached):
+            # Een andere worker kan de psalm intussen al ververst hebben.
+            cached = self._prefer_disk(cached, self._lookup_disk(psalm))
+        return cached
+
+    async def _alookup(self, psalm: int) -> Optional[Tuple[Dict[int, str], bool]]:
+        """Als _lookup, maar SQLite (busy_timeout, locks van andere workers) in een thread."""
+        cached = self._cache.get((self.berijming, psalm))
+        if self._needs_disk(cached):
+            cached = self._prefer_disk(cached, await asyncio.to_thread(self._lookup_disk, psalm))
+        return cached
+
+    async def _acached_vers_map(self, psalm: int) -> Dict[int, str] | None:
+        cached = await self._alookup(psalm)
+        if cached is None:
+            return None
+        vers_map, fresh = cached
+        if not fresh:
+            self._refresh_in_background(psalm)
+        return vers_map
+
+    async def _afresh_vers_map(self, psalm: int) -> Dict[int, str] | None:
+        cached = await self._alookup(psalm)
+        if cached is not None and cached[1]:
+            return cached[0]
+        return None
+
+    def _needs_disk(self, cached: Optional[Tuple[Dict[int, str], bool]]) -> bool:
+        return (cached is None or not cached[1]) and self._disk is not None and self._cache.enabled
+
+    @staticmethod
+    def _prefer_disk(cached, from_disk):
+        if from_disk is not None and (cached is None or from_disk[1]):
+            return from_disk
+        return cached
+
+    def _lookup_disk(self, psalm: int) -> Optional[Tuple[Dict[int, str], bool]]:
+        try:
+            row = self._disk.get(self.berijming, psalm)
+        except sqlite3.Error as exc:
+            logger.warning("SQLite-cache niet leesbaar: %s", exc)
+            return None
+        if row is None:
+            return None
+        vers_map, fetched_at, _ = row
+        age = max(0.0, time.time() - fetched_at)
+        if age > self._cache.ttl + self._cache.max_stale:
+            return None
+        # Promoveren naar het geheugen met behoud van de leeftijd uit de gedeelde laag.
+        self._cache.set((self.berijming, psalm), vers_map, age=age)
+        self._publish(psalm, vers_map)
+        return vers_map, age <= self._cache.ttl
+
+    def subscribe(self, listener: Callable[[int, Dict[int, str]], None]) -> None:
+        """listener(psalm, vers_map) voor elke nieuw geëxtraheerde of uit SQLite geladen versmap."""
+        self._listeners.append(listener)
+
+    def _publish(self, psalm: int, vers_map: Dict[int, str]) -> None:
+        for listener in self._listeners:
+            try:
+                listener(psalm, vers_map)
+            except Exception:
+                logger.exception("Listener voor psalm %s faalde", psalm)
+
+    def _store_vers_map(self, psalm: int, vers_map: Dict[int, str], *, disk: bool = True) -> None:
+        """Zet de versmap in het geheugen en (tenzij disk=False) in de SQLite-laag."""
+        self._cache.set((self.berijming, psalm), vers_map)
+        if disk:
+            self._store_disk(psalm, vers_map)
+
+    def _store_disk(self, psalm: int, vers_map: Dict[int, str]) -> None:
+        if self._disk is not None and self._cache.enabled:
+            try:
+                self._disk.put(self.berijming, psalm, vers_map)
+            except sqlite3.Error as exc:
+                logger.warning("SQLite-cache niet schrijfbaar: %s", exc)
+
+    def _settle(self, psalm: int, vers_map: Dict[int, str], publish: bool) -> None:
+        self._store_disk(psalm, vers_map)
+        if publish:
+            self._publish(psalm, vers_map)
+
+    async def _asettle(self, psalm: int, vers_map: Dict[int, str], *, publish: bool = False) -> None:
+        """
+        SQLite-schrijfactie en listeners (zoekindex, responscache) in één thread-hop: de event
+        loop wacht niet op locks en doet geen tokenisatie of hashing. Wel afgewacht, zodat de
+        listeners klaar zijn voordat de aanroeper het antwoord opbouwt.
+        """
+        if (publish and self._listeners) or (self._disk is not None and self._cache.enabled):
+            await asyncio.to_thread(self._settle, psalm, vers_map, publish)
+
+    def _refresh_in_background(self, psalm: int) -> None:
+        cache_key = (self.berijming, psalm)
+        with self._refresh_lock:
+            if cache_key in self._refreshing:
+                return
+            self._refreshing.add(cache_key)
+        threading.Thread(target=self._refresh, args=(psalm,), daemon=True).start()
+
+    def _refresh(self, psalm: int) -> None:
+        cache_key = (self.berijming, psalm)
+        try:
+            self.singleflight.do(cache_key, lambda: self._load_vers_map(psalm))
+        except Exception as exc:
+            # De stale entry blijft geserveerd tot max_stale verstreken is.
+            logger.warning("Achtergrond-refresh van psalm %s faalde: %s", psalm, exc)
+        finally:
+            with self._refresh_lock:
+                self._refreshing.discard(cache_key)
+
+    def get_vers_map(self, psalm: int) -> Dict[int, str]:
+        """
+        Geeft de volledige versmap van één psalm. De pagina wordt per (berijming, psalm)
+        één keer opgehaald en geparsed; max-vers en versteksten komen daarna uit de cache.
+        """
+        vers_map = self._cached_vers_map(psalm)
+        if vers_map is None:
+            vers_map = self.singleflight.do((self.berijming, psalm), lambda: self._load_vers_map(psalm))
+        return vers_map
+
+    def _previous_validators(self, psalm: int) -> Optional[_Validators]:
+        cached = self._validators.get((self.berijming, psalm))
+        return cached[0] if cached is not None else None
+
+    @staticmethod
+    def _conditional(previous: Optional[_Validators]) -> Optional[_Validators]:
+        """Alleen een conditioneel verzoek als er een ETag of Last-Modified is."""
+        return previous if previous is not None and (previous.etag or previous.last_modified) else None
+
+    def _count_revalidation(
+        self, outcome: str, previous: Optional[_Validators] = None, *, bytes_saved: int = 0
+    ) -> None:
+        with self._revalidation_lock:
+            self.revalidation[outcome] += 1
+            self.revalidation["bytes_saved"] += bytes_saved
+            if previous is not None:
+                self.revalidation["parse_seconds_saved"] += previous.parse_seconds
+
+    def _known_vers_map(self, psalm: int) -> Optional[Dict[int, str]]:
+        """Laatste bekende versmap ongeacht leeftijd: uit het geheugen, anders uit de SQLite-laag."""
+        vers_map = self._cache.peek((self.berijming, psalm))
+        return vers_map if vers_map is not None else self._known_from_disk(psalm)
+
+    async def _aknown_vers_map(self, psalm: int) -> Optional[Dict[int, str]]:
+        vers_map = self._cache.peek((self.berijming, psalm))
+        if vers_map is None and self._disk is not None and self._cache.enabled:
+            vers_map = await asyncio.to_thread(self._known_from_disk, psalm)
+        return vers_map
+
+    def _known_from_disk(self, psalm: int) -> Optional[Dict[int, str]]:
+        if self._disk is None or not self._cache.enabled:
+            return None
+        try:
+            row = self._disk.get(self.berijming, psalm)
+        except sqlite3.Error as exc:
+            logger.warning("SQLite-cache niet leesbaar: %s", exc)
+            return None
+        return row[0] if row is not None else None
+
+    def _reuse(
+        self, psalm: int, previous: _Validators, vers_map: Dict[int, str], outcome: str, *, disk: bool = True
+    ) -> Dict[int, str]:
+        """Bron is ongewijzigd: TTL verlengen met de bestaande versmap, zonder te parsen."""
+        self._count_revalidation(outcome, previous, bytes_saved=previous.html_bytes if outcome == "not_modified" else 0)
+        self._validators.set((self.berijming, psalm), previous)
+        self._store_vers_map(psalm, vers_map, disk=disk)
+        return vers_map
+
+    def _unchanged(
+        self,
+        psalm: int,
+        html: str,
+        previous: Optional[_Validators],
+        known: Optional[Dict[int, str]],
+        *,
+        disk: bool = True,
+    ) -> Optional[Dict[int, str]]:
+        if previous is not None and known is not None and _html_hash(html) == previous.html_hash:
+            return self._reuse(psalm, previous, known, "unchanged", disk=disk)
+        return None
+
+    def _serve_stale(self, psalm: int, known: Optional[Dict[int, str]], exc: Exception) -> Dict[int, str]:
+        """Bron niet aan te spreken (breaker open, deadline, afgewezen): laatste bekende versmap, indien aanwezig."""
+        if known is None:
+            raise exc
+        logger.warning("Psalm %s stale geserveerd: %s", psalm, exc)
+        self.resilience.count_stale()
+        return known
+
+    def _remember(
+        self,
+        psalm: int,
+        html: str,
+        vers_map: Dict[int, str],
+        parse_seconds: float,
+        previous: Optional[_Validators],
+        *,
+        disk: bool = True,
+        publish: bool = True,
+    ) -> None:
+        if previous is not None:
+            self._count_revalidation("changed")
+        self._validators.set(
+            (self.berijming, psalm),
+            _Validators(
+                getattr(html, "etag", None),
+                getattr(html, "last_modified", None),
+                _html_hash(html),
+                len(html.encode("utf-8")),
+                parse_seconds,
+            ),
+        )
+        self._store_vers_map(psalm, vers_map, disk=disk)
+        if publish:
+            self._publish(psalm, vers_map)
+
+    def _load_vers_map(self, psalm: int) -> Dict[int, str]:
+        # Opnieuw kijken: een vorige leader kan de psalm net in de cache hebben gezet.
+        vers_map = self._fresh_vers_map(psalm)
+        if vers_map is not None:
+            return vers_map
+        previous = self._previous_validators(psalm)
+        known = self._known_vers_map(psalm) if previous is not None else None
+        # Zonder bekende versmap valt er niets te hergebruiken: dan een onvoorwaardelijke fetch.
+        conditional = self._conditional(previous) if known is not None else None
+        try:
+            with self.admission.slot():
+                html = self._fetch_overview(psalm, conditional) if conditional else self._fetch_overview(psalm)
+        except NotModified:
+            return self._reuse(psalm, previous, known, "not_modified")
+        except (CircuitOpenError, DeadlineExceeded, Rejected) as exc:
+            return self._serve_stale(psalm, known, exc)
+        vers_map = self._unchanged(psalm, html, previous, known)
+        if vers_map is None:
+            started = time.perf_counter()
+            vers_map = self._extract_vers_map(html)
+            self._remember(psalm, html, vers_map, time.perf_counter() - started, previous)
+        return vers_map
+
+    async def aget_vers_map(self, psalm: int) -> Dict[int, str]:
+        """
+        Async variant van get_vers_map. Een cache-hit blijft op de event loop; bij een miss
+        gaat de fetch via de gedeelde AsyncClient en draait de HTML-extractie in een thread
+        (of in de extractie-pool, indien ingesteld).
+        """
+        vers_map = await self._acached_vers_map(psalm)
+        if vers_map is None:
+            vers_map = await self.singleflight.ado((self.berijming, psalm), lambda: self._aload_vers_map(psalm))
+        return vers_map
+
+    async def aprefetch(self, psalm: int, margin: float = 0.0) -> bool:
+        """
+        Laadt psalm in de cache als hij er niet in staat, of ververst hem als hij binnen
+        `margin` seconden verloopt (opwarmen/vooruit verversen). True als er geladen is.
+        """
+        if not self._cache.enabled:
+            return False
+        age = self._cache.age((self.berijming, psalm))
+        if age is not None and self._cache.ttl - age > margin:
+            return False
+        await self.singleflight.ado(
+            (self.berijming, psalm), lambda: self._aload_vers_map(psalm, force=age is not None)
+        )
+        return True
+
+    async def _aload_vers_map(self, psalm: int, force: bool = False) -> Dict[int, str]:
+        vers_map = None if force else await self._afresh_vers_map(psalm)
+        if vers_map is not None:
+            return vers_map
+        previous = self._previous_validators(psalm)
+        known = await self._aknown_vers_map(psalm) if previous is not None else None
+        conditional = self._conditional(previous) if known is not None else None
+        # SQLite en listeners gaan via _asettle naar een thread; de event loop wacht niet op locks.
+        try:
+            async with self.admission.aslot():
+                fetch = self._afetch_overview(psalm, conditional) if conditional else self._afetch_overview(psalm)
+                html = await fetch
+        except NotModified:
+            vers_map = self._reuse(psalm, previous, known, "not_modified", disk=False)
+            await self._asettle(psalm, vers_map)
+            return vers_map
+        except (CircuitOpenError, DeadlineExceeded, Rejected) as exc:
+            return self._serve_stale(psalm, known, exc)
+        vers_map = self._unchanged(psalm, html, previous, known, disk=False)
+        changed = vers_map is None
+        if changed:
+            started = time.perf_counter()
+            vers_map = await self._aextract_vers_map(html)
+            self._remember(psalm, html, vers_map, time.perf_counter() - started, previous, disk=False, publish=False)
+        await self._asettle(psalm, vers_map, publish=changed)
+        return vers_map
+
+    def revalidation_stats(self) -> Dict[str, float]:
+        with self._revalidation_lock:
+            return dict(self.revalidation)
+
+    def resilience_stats(self) -> Dict[str, object]:
+        return self.resilience.stats()
+
+    @staticmethod
+    def _max_from_map(vers_map: Dict[int, str]) -> int:
+        return max(vers_map) if vers_map else 1
+
+    @staticmethod
+    def _vers_from_map(vers_map: Dict[int, str], psalm: int, vers: int) -> str:
         if vers not in vers_map:
             raise ValueError(f"Vers {vers} niet gevonden voor psalm {psalm}.")
-        text = vers_map[vers]
-        if self.cache_seconds > 0:
-            self._cache[cache_key] = (time.time(), text)
-        return text
+        return vers_map[vers]
+
+    @staticmethod
+    def _verses_from_map(vers_map: Dict[int, str], verses: Iterable[int]) -> Dict[int, str]:
+        return {vers: vers_map[vers] for vers in verses if vers in vers_map}
+
+    def get_max_vers(self, psalm: int) -> int:
+        return self._max_from_map(self.get_vers_map(psalm))
+
+    def get_vers(self, psalm: int, vers: int) -> str:
+        return self._vers_from_map(self.get_vers_map(psalm), psalm, vers)
+
+    def get_verses(self, psalm: int, verses: Iterable[int]) -> Dict[int, str]:
+        """
+        Bulk-variant van get_vers: één fetch/parse voor alle gevraagde verzen.
+        Levert alleen de verzen die in de bron bestaan (in gevraagde volgorde);
+        de aanroeper bepaalt zelf welke ontbreken.
+        """
+        return self._verses_from_map(self.get_vers_map(psalm), verses)
+
+    async def aget_max_vers(self, psalm: int) -> int:
+        return self._max_from_map(await self.aget_vers_map(psalm))
 
+    async def aget_vers(self, psalm: int, vers: int) -> str:
+        return self._vers_from_map(await self.aget_vers_map(psalm), psalm, vers)
 
-client = PsalmboekClient(
-    base_url=str(settings.PSALM_SOURCE_BASE),
-    berijming=settings.PSALM_BERIJMING,
-    cache_seconds=settings.CACHE_SECONDS,
+    async def aget_verses(self, psalm: int, verses: Iterable[int]) -> Dict[int, str]:
+        return self._verses_from_map(await self.aget_vers_map(psalm), verses)
+
+_upstream_guard = UpstreamGuard(
+    CircuitBreaker(settings.UPSTREAM_BREAKER_FAILURES, settings.UPSTREAM_BREAKER_RESET_SECONDS),
+    RetryBudget(settings.UPSTREAM_RETRY_BUDGET_RATIO),
+    timeout=settings.UPSTREAM_TIMEOUT_SECONDS,
+    retries=settings.UPSTREAM_RETRIES,
+    hedge=settings.UPSTREAM_HEDGE,
+)
+_admission = Admission(
+    ConcurrencyLimiter(settings.UPSTREAM_MAX_CONCURRENCY, settings.UPSTREAM_MAX_QUEUE)
+    if settings.UPSTREAM_MAX_CONCURRENCY > 0
+    else None,
+    ClientLimiter(settings.CLIENT_MISS_RATE, settings.CLIENT_MISS_BURST) if settings.CLIENT_MISS_RATE > 0 else None,
+    max_wait=settings.UPSTREAM_QUEUE_WAIT_SECONDS,
+    latency=_upstream_guard.latency,
+)
+_extraction_pool = (
+    ExtractionPool(
+        settings.EXTRACTION_POOL_WORKERS,
+        settings.EXTRACTION_ENGINE,
+        min_bytes=settings.EXTRACTION_POOL_MIN_BYTES,
+    )
+    if settings.EXTRACTION_POOL_WORKERS > 0
+    else None
 )
+_disk_cache = SqliteVerseCache(settings.CACHE_SQLITE_PATH) if settings.CACHE_SQLITE_PATH else None
+
+
+def build_client(
+    berijming: str,
+    *,
+    url_template: str = PSALMEN_URL,
+    cache_max_entries: int = settings.CACHE_MAX_ENTRIES,
+    cache_max_bytes: int = settings.CACHE_MAX_BYTES,
+    extraction_engine: str = settings.EXTRACTION_ENGINE,
+) -> PsalmboekClient:
+    """
+    Client voor één collectie op psalmboek.nl. Breaker, toelating, extractie-pool en SQLite
+    zijn gedeeld (zelfde host); geheugencache en singleflight zijn per client.
+    """
+    return PsalmboekClient(
+        base_url=str(settings.PSALM_SOURCE_BASE),
+        berijming=berijming,
+        cache_seconds=settings.CACHE_SECONDS,
+        cache_max_entries=cache_max_entries,
+        cache_max_bytes=cache_max_bytes,
+        cache_max_stale=settings.CACHE_MAX_STALE_SECONDS,
+        disk_cache=_disk_cache,
+        extraction_engine=extraction_engine,
+        resilience=_upstream_guard,
+        extraction_pool=_extraction_pool if extraction_engine == settings.EXTRACTION_ENGINE else None,
+        admission=_admission,
+        url_template=url_template,
+        probe_cache_seconds=settings.HEALTHZ_PROBE_CACHE_SECONDS,
+    )
+
+
+client = build_client(settings.PSALM_BERIJMING)
 
 
 def get_max_vers(psalm: int) -> int:
@@ -100,3 +765,7 @@ def get_max_vers(psalm: int) -> int:
 
 def get_vers(psalm: int, vers: int) -> str:
     return client.get_vers(psalm, vers)
+
+
+def get_verses(psalm: int, verses: Iterable[int]) -> Dict[int, str]:
+    return client.get_verses(psalm, verses)
@@ -0,0 +1,170 @@
+"""
+Extractie-engines voor psalmen.php: HTML → {versnummer: tekst}.
+
+- `bs4`: referentie-implementatie (BeautifulSoup + html.parser), de oorspronkelijke logica.
+- `fast`: gerichte scanner met voorgecompileerde regexen over #psalmkolom2; bouwt geen
+  DOM-boom. Alleen voor nette markup (elke <p> gesloten); bij ongebalanceerde <p>-tags of een
+  lege uitkomst valt hij terug op `bs4`. Gelijkheid is getoetst op de fixtures in tests/, nog
+  niet op opgenomen psalmen.php-pagina's; daarom is `bs4` de standaard (EXTRACTION_ENGINE).
+"""
+
+from __future__ import annotations
+
+import html as html_lib
+import re
+from functools import lru_cache
+from typing import Callable, Dict, List, Tuple
+
+ExtractFn = Callable[[str], Dict[int, str]]
+
+_VERS_TITLE = re.compile(r"(?i)^vers\s+(\d+)\b")
+_VERS_PREFIX = re.compile(r"(?i)^\s*vers\s+")
+_VERS_PREFIX_TAIL = re.compile(r"\s*[:.]?\s*")
+
+
+def _strip_vers_prefix(raw: str, vers_num: int) -> str:
+    """Equivalent van re.sub(rf"(?i)^\\s*vers\\s+{vers_num}\\s*[:.]?\\s*", "", raw)."""
+    match = _VERS_PREFIX.match(raw)
+    if match:
+        digits = str(vers_num)
+        if raw.startswith(digits, match.end()):
+            tail = _VERS_PREFIX_TAIL.match(raw, match.end() + len(digits))
+            return raw[tail.end() :]
+    return raw
+
+
+def _clean_lines(raw: str) -> str:
+    raw = raw.replace("\u00A0", " ").strip()
+    return "\n".join(ln.strip() for ln in raw.splitlines() if ln.strip())
+
+
+# --- referentie: BeautifulSoup ---------------------------------------------------
+
+
+@lru_cache(maxsize=None)
+def _beautiful_soup():
+    from bs4 import BeautifulSoup
+
+    return BeautifulSoup
+
+
+def extract_vers_map_bs4(html: str) -> Dict[int, str]:
+    soup = _beautiful_soup()(html, "html.parser")
+    container = soup.find(id="psalmkolom2") or soup
+    verses: Dict[int, str] = {}
+    for p in container.find_all("p"):
+        strong = p.find("strong")
+        a = strong.find("a") if strong else None
+        title = ""
+        if a and a.get_text():
+            title = a.get_text(strip=True)
+        elif strong and strong.get_text():
+            title = strong.get_text(strip=True)
+        match = _VERS_TITLE.match(title)
+        if not match:
+            match = _VERS_TITLE.match(p.get_text(strip=True) or "")
+        if not match:
+            continue
+        vers_num = int(match.group(1))
+        raw = _strip_vers_prefix(p.get_text(separator="\n", strip=True), vers_num)
+        text = _clean_lines(raw)
+        if text:
+            verses[vers_num] = text
+    return verses
+
+
+# --- snel: gerichte scanner ------------------------------------------------------
+
+_CONTAINER_OPEN = re.compile(r"""<([a-zA-Z][\w-]*)\b[^>]*?\bid\s*=\s*["']?psalmkolom2["'\s>/]""", re.I)
+_PARAGRAPH = re.compile(r"<p(?:\s[^>]*)?>(.*?)</p\s*>", re.I | re.S)
+_P_OPEN = re.compile(r"<p(?:\s[^>]*)?>", re.I)
+_P_CLOSE = re.compile(r"</p\s*>", re.I)
+# Commentaar en script/style-inhoud is voor html.parser geen markup: een "</p>" daarin sluit niets.
+# Vervangen door leeg commentaar, zodat de grenzen tussen tekstknopen blijven staan.
+_OPAQUE = re.compile(r"<!--.*?-->|<script\b.*?</script\s*>|<style\b.*?</style\s*>", re.I | re.S)
+# Een niet-gesloten <strong>/<a> loopt (zoals in html.parser) door tot het einde van de <p>.
+_STRONG = re.compile(r"<strong(?:\s[^>]*)?>(.*?)(?:</strong\s*>|$)", re.I | re.S)
+_ANCHOR = re.compile(r"<a(?:\s[^>]*)?>(.*?)(?:</a\s*>|$)", re.I | re.S)
+# Commentaar, script/style-blokken en gewone tags; tekst staat daartussen.
+_MARKUP = re.compile(r"<!--.*?-->|<script\b.*?</script\s*>|<style\b.*?</style\s*>|<[^>]*>", re.I | re.S)
+
+
+@lru_cache(maxsize=16)
+def _tag_pattern(tag: str) -> "re.Pattern[str]":
+    return re.compile(rf"<(/?){re.escape(tag)}(?:\s[^>]*)?>", re.I)
+
+
+def _container(html: str) -> str:
+    match = _CONTAINER_OPEN.search(html)
+    if not match:
+        return html
+    start = html.find(">", match.start()) + 1
+    depth = 1
+    for tag in _tag_pattern(match.group(1)).finditer(html, start):
+        depth += -1 if tag.group(1) else 1
+        if depth == 0:
+            return html[start : tag.start()]
+    return html[start:]
+
+
+def _strings(fragment: str) -> List[str]:
+    """Alle tekstknopen in een fragment, ge-unescaped (zoals BeautifulSoup ze ziet)."""
+    return [html_lib.unescape(piece) for piece in _MARKUP.split(fragment) if piece]
+
+
+def _joined(strings: List[str], separator: str = "") -> Tuple[str, bool]:
+    """(get_text(strip=True, separator), heeft ruwe tekst) voor een lijst tekstknopen."""
+    has_text = any(strings)
+    return separator.join(s for s in (piece.strip() for piece in strings) if s), has_text
+
+
+def extract_vers_map_fast(html: str) -> Dict[int, str]:
+    container = _OPAQUE.sub("<!---->", _container(html))
+    if len(_P_OPEN.findall(container)) != len(_P_CLOSE.findall(container)):
+        # Niet-gesloten <p>: html.parser nest de alinea's; dat bootst de scanner niet na.
+        return extract_vers_map_bs4(html)
+    verses = _scan_paragraphs(container)
+    # Een lege versmap zou gecachet worden als max_vers=1 of 404; liever de referentie vragen.
+    return verses or extract_vers_map_bs4(html)
+
+
+def _scan_paragraphs(container: str) -> Dict[int, str]:
+    verses: Dict[int, str] = {}
+    for paragraph in _PARAGRAPH.finditer(container):
+        inner = paragraph.group(1)
+        title = ""
+        strong = _STRONG.search(inner)
+        if strong:
+            anchor = _ANCHOR.search(strong.group(1))
+            anchor_text, anchor_has_text = _joined(_strings(anchor.group(1))) if anchor else ("", False)
+            if anchor_has_text:
+                title = anchor_text
+            else:
+                strong_text, strong_has_text = _joined(_strings(strong.group(1)))
+                if strong_has_text:
+                    title = strong_text
+        strings = _strings(inner)
+        match = _VERS_TITLE.match(title)
+        if not match:
+            match = _VERS_TITLE.match(_joined(strings)[0])
+        if not match:
+            continue
+        vers_num = int(match.group(1))
+        raw = _strip_vers_prefix(_joined(strings, "\n")[0], vers_num)
+        text = _clean_lines(raw)
+        if text:
+            verses[vers_num] = text
+    return verses
+
+
+ENGINES: Dict[str, ExtractFn] = {
+    "fast": extract_vers_map_fast,
+    "bs4": extract_vers_map_bs4,
+}
+
+
+def get_engine(name: str) -> ExtractFn:
+    try:
+        return ENGINES[name]
+    except KeyError:
+        raise ValueError(f"Onbekende extractie-engine: {name} (kies uit {', '.join(ENGINES)})") from None
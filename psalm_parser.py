@@ -1,7 +1,39 @@
 from __future__ import annotations
 
 import re
-from typing import Dict, List, Tuple
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+# Eén tokenizer voor de hele invoer (na lowercase): psalm-prefix, vers-woorden, bereiken,
+# scheiders, dubbele punt, getallen en overige woorden. Witruimte valt weg.
+_TOKEN = re.compile(
+    r"""
+      \s+
+    | (?P<psalm>psalmen|psalm|ps\.?)(?![^\W\d_])
+    | (?P<verse>verzen|vers|vs\.?)(?![^\W\d_])
+    | (?P<range>t\s*/\s*m\.?|t\.?\s*m\.?(?![^\W\d_])|tot[\s-]+en[\s-]+met(?![^\W\d_])|[-–])
+    | (?P<sep>[,;&+]|(?:en|plus)(?![^\W\d_]))
+    | (?P<colon>[:.])
+    | (?P<num>\d+)
+    | (?P<word>[^\W\d_]+)
+    | (?P<other>\S)
+    """,
+    re.VERBOSE,
+)
+
+# Snelle route voor de meest voorkomende vorm: "psalm 23:1", "ps. 23 : 1-3", "23:4".
+_SIMPLE = re.compile(r"(?:(?:psalm|ps\.?)\s*)?(\d+)\s*:\s*(\d+)(?:\s*[-–]\s*(\d+))?\.?")
+
+_MEMO_SIZE = 2048
+
+# Bovengrens voor versnummers, gecontroleerd vóór het uitrollen van bereiken: de langste psalm
+# (119) telt 88 verzen, dus hogere nummers zijn altijd fout. Zo blijft elk gememoiseerd
+# resultaat klein, ook bij invoer als "ps 1:1-5000000".
+MAX_VERSE = 200
+
+# (status, psalm_number, verses, message) – onveranderlijk zodat het gememoiseerd kan worden.
+_Ref = Tuple[str, int, Tuple[int, ...], Optional[str]]
+_Token = Tuple[str, str]
 
 
 class ParsedPsalmReference:
@@ -21,81 +53,172 @@ class ParsedPsalmReference:
         return payload
 
 
-def _normalize_verses_text(raw: str) -> str:
-    text = raw.lower().strip()
-    text = re.sub(r"\s*(t/m|t\s*m|tm|tot en met|tot-en-met)\s*", "-", text)
-    text = re.sub(r"\s*(en|&|plus)\s*", ",", text)
-    text = text.replace(";", ",")
-    text = re.sub(r",+", ",", text)
-    return text.strip()
+def _tokenize(text: str) -> List[_Token]:
+    return [(match.lastgroup, match.group()) for match in _TOKEN.finditer(text) if match.lastgroup]
 
 
-def _parse_tokens(verse_part: str) -> Tuple[List[int], str | None]:
-    tokens = [tok.strip() for tok in verse_part.split(",") if tok.strip()]
-    if not tokens:
-        return [], "Versdeel ontbreekt of is leeg"
-
+def _merge_ranges(ranges: List[Tuple[int, int]]) -> Tuple[int, ...]:
+    """Voegt (start, eind)-bereiken samen en rolt ze één keer uit: uniek en oplopend."""
     verses: List[int] = []
-    for token in tokens:
-        if "-" in token:
-            pieces = token.split("-")
-            if len(pieces) != 2:
-                return [], f"Ongeldig bereik: {token}"
-            start_str, end_str = pieces
-            if not start_str.isdigit() or not end_str.isdigit():
-                return [], f"Ongeldig bereik: {token}"
-            start, end = int(start_str), int(end_str)
+    last = 0
+    for start, end in sorted(ranges):
+        if end <= last:
+            continue
+        verses.extend(range(max(start, last + 1), end + 1))
+        last = end
+    return tuple(verses)
+
+
+def _invalid(message: str, psalm_number: int = 1) -> _Ref:
+    return ("invalid_request", psalm_number, (), message)
+
+
+def _starts_reference(tokens: List[_Token], i: int) -> bool:
+    """Een psalm-prefix, of impliciet 'nummer:vers' zoals in '23:1'."""
+    kind = tokens[i][0]
+    if kind == "psalm":
+        return True
+    return (
+        kind == "num"
+        and i + 2 < len(tokens)
+        and tokens[i + 1][0] == "colon"
+        and tokens[i + 2][0] in ("num", "verse")
+    )
+
+
+def _peek_num(tokens: List[_Token], i: int) -> str:
+    return tokens[i][1] if i < len(tokens) and tokens[i][0] == "num" else ""
+
+
+def _parse_verses(tokens: List[_Token], i: int, psalm_number: int) -> Tuple[_Ref, int]:
+    """Leest het versdeel vanaf tokens[i] tot het einde of de volgende psalmverwijzing."""
+    ranges: List[Tuple[int, int]] = []
+    n = len(tokens)
+    while i < n:
+        kind, value = tokens[i]
+        if kind in ("sep", "verse") or (kind == "colon" and value == "." and i == n - 1):
+            # scheiders, opvulwoorden ("en vers 7") en een afsluitende punt
+            i += 1
+            continue
+        if _starts_reference(tokens, i):
+            break
+        if kind == "range":
+            return _invalid(f"Ongeldig bereik: -{_peek_num(tokens, i + 1)}", psalm_number), i
+        if kind != "num":
+            return _invalid(f"Ongeldig vers: {value}", psalm_number), i
+
+        start = end = int(value)
+        text = value
+        i += 1
+        if i < n and tokens[i][0] == "range":
+            text += "-"
+            i += 1
+            if i >= n or tokens[i][0] != "num":
+                return _invalid(f"Ongeldig bereik: {text}", psalm_number), i
+            end = int(tokens[i][1])
+            text += tokens[i][1]
+            i += 1
+            if i < n and tokens[i][0] == "range":
+                return _invalid(f"Ongeldig bereik: {text}-{_peek_num(tokens, i + 1)}", psalm_number), i
             if start < 1 or end < 1 or start > end:
-                return [], f"Ongeldig bereik: {token}"
-            verses.extend(range(start, end + 1))
+                return _invalid(f"Ongeldig bereik: {text}", psalm_number), i
+        elif start < 1:
+            return _invalid(f"Ongeldig vers: {text}", psalm_number), i
+        if end > MAX_VERSE:
+            return _invalid(f"Versnummer buiten bereik: {text} (hoogstens {MAX_VERSE})", psalm_number), i
+        if i < n and tokens[i][0] == "num" and not _starts_reference(tokens, i):
+            return _invalid(f"Ongeldig vers: {text} {tokens[i][1]}", psalm_number), i
+        ranges.append((start, end))
+
+    if not ranges:
+        return _invalid("Versdeel ontbreekt of is leeg", psalm_number), i
+    return ("ok", psalm_number, _merge_ranges(ranges), None), i
+
+
+@lru_cache(maxsize=_MEMO_SIZE)
+def _parse_normalized(text: str) -> Tuple[_Ref, ...]:
+    """Parseert genormaliseerde invoer tot één of meer verwijzingen (gememoiseerd)."""
+    simple = _SIMPLE.fullmatch(text)
+    if simple:
+        psalm_number, start = int(simple.group(1)), int(simple.group(2))
+        end = int(simple.group(3) or start)
+        if 1 <= psalm_number <= 150 and 1 <= start <= end <= MAX_VERSE:
+            return (("ok", psalm_number, tuple(range(start, end + 1)), None),)
+        # foutmeldingen komen uit de volledige tokenizer hieronder
+
+    tokens = _tokenize(text)
+    refs: List[_Ref] = []
+    i, n = 0, len(tokens)
+    while i < n:
+        kind = tokens[i][0]
+        if kind == "psalm":
+            i += 1
+        elif not _starts_reference(tokens, i):
+            # Vóór de eerste verwijzing mogen losse woorden staan ("Zing psalm 23:1").
+            if not refs and kind == "word" and any(t[0] == "psalm" for t in tokens[i:]):
+                i += 1
+                continue
+            if refs and kind == "sep":
+                i += 1
+                continue
+            break
+
+        if i >= n or tokens[i][0] != "num":
+            break
+        psalm_number = int(tokens[i][1])
+        i += 1
+        if psalm_number < 1 or psalm_number > 150:
+            refs.append(_invalid("Psalmnummer buiten bereik", min(150, max(1, psalm_number))))
+            return tuple(refs)
+        if i < n and tokens[i][0] in ("colon", "verse"):
+            i += 1
         else:
-            if not token.isdigit():
-                return [], f"Ongeldig vers: {token}"
-            verse = int(token)
-            if verse < 1:
-                return [], f"Ongeldig vers: {token}"
-            verses.append(verse)
-    return sorted(set(verses)), None
+            refs.append(_invalid("Versdeel ontbreekt of is leeg", psalm_number))
+            return tuple(refs)
 
+        ref, i = _parse_verses(tokens, i, psalm_number)
+        refs.append(ref)
+        if ref[0] != "ok":
+            return tuple(refs)
 
-def parse_psalm_reference(text: str) -> ParsedPsalmReference:
-    if not text or not text.strip():
-        return ParsedPsalmReference("invalid_request", message="Input is leeg")
+    if not refs:
+        return (_invalid("Geen psalmverwijzing gevonden"),)
+    if i < n:
+        refs.append(_invalid(f"Onverwachte tekst: {tokens[i][1]}", refs[-1][1]))
+    return tuple(refs)
 
-    candidates = [
-        re.compile(r"^\s*(?:psalm|ps\.?|ps)?\s*(\d{1,3})\s*[:.]\s*(.+)$", re.IGNORECASE),
-        re.compile(r"^\s*(?:psalm|ps\.?|ps)\s*(\d{1,3})\s*(?:vers|verzen)\s+(.+)$", re.IGNORECASE),
-    ]
 
-    match = None
-    for pattern in candidates:
-        match = pattern.match(text)
-        if match:
-            break
+def _normalize_input(text: str) -> str:
+    return " ".join(text.lower().split())
+
 
-    if not match:
-        return ParsedPsalmReference("invalid_request", message="Geen psalmverwijzing gevonden")
+def _to_parsed(ref: _Ref) -> ParsedPsalmReference:
+    status, psalm_number, verses, message = ref
+    # Altijd een vers request-object: aanroepers mogen het payload-dict vrij gebruiken.
+    return ParsedPsalmReference(status, request={"psalm_number": psalm_number, "verses": list(verses)}, message=message)
 
-    psalm_number = int(match.group(1))
-    if psalm_number < 1 or psalm_number > 150:
-        safe_psalm = min(150, max(1, psalm_number))
+
+def parse_psalm_reference(text: str) -> ParsedPsalmReference:
+    if not text or not text.strip():
+        return ParsedPsalmReference("invalid_request", message="Input is leeg")
+
+    refs = _parse_normalized(_normalize_input(text))
+    if refs[-1][0] != "ok":
+        return _to_parsed(refs[-1])
+    if len(refs) > 1:
         return ParsedPsalmReference(
             "invalid_request",
-            request={"psalm_number": safe_psalm, "verses": []},
-            message="Psalmnummer buiten bereik",
+            request={"psalm_number": refs[0][1], "verses": []},
+            message="Meerdere psalmverwijzingen in één verzoek",
         )
+    return _to_parsed(refs[0])
 
-    verse_part = match.group(2)
-    normalized = _normalize_verses_text(verse_part)
-    verses, error = _parse_tokens(normalized)
-    if error:
-        return ParsedPsalmReference(
-            "invalid_request", request={"psalm_number": psalm_number, "verses": []}, message=error
-        )
-    if not verses:
-        return ParsedPsalmReference(
-            "invalid_request", request={"psalm_number": psalm_number, "verses": []}, message="Geen verzen herkend"
-        )
 
-    request = {"psalm_number": psalm_number, "verses": verses}
-    return ParsedPsalmReference("ok", request=request)
+def parse_psalm_references(text: str) -> List[ParsedPsalmReference]:
+    """
+    Variant voor invoer met meerdere psalmen, zoals 'Ps 23:1-3; Ps 121:1 en 2'.
+    Levert per verwijzing een ParsedPsalmReference; bij een fout is de laatste invalid_request.
+    """
+    if not text or not text.strip():
+        return [ParsedPsalmReference("invalid_request", message="Input is leeg")]
+    return [_to_parsed(ref) for ref in _parse_normalized(_normalize_input(text))]
@@ -0,0 +1,237 @@
+"""
+Offline snapshot van een berijming: alle psalmen in één compact, memory-mapped bestand.
+
+Formaat (versie 1, little-endian):
+- header: magic, versie, hoogste psalmnummer, berijming, aantal verzen, grootte tekstblob
+- max-tabel: per psalm (index 0..max_psalm) het hoogste versnummer als uint16 (0 = ontbreekt)
+- index: per vers (psalm uint16, vers uint16, offset uint32, lengte uint32), gesorteerd
+- blob: alle versteksten achter elkaar als UTF-8
+
+Bouwen (crawlt psalmboek.nl één keer):
+    python psalm_snapshot.py build --out data/psalmen_1773.snap
+"""
+
+from __future__ import annotations
+
+import argparse
+import mmap
+import os
+import struct
+import time
+from typing import Callable, Dict, Iterable, Iterator, List, Mapping, Optional, Tuple
+
+MAGIC = b"PSLMSNAP"
+FORMAT_VERSION = 1
+
+_HEADER = struct.Struct("<8sHH16sII")
+_MAX_ENTRY = struct.Struct("<H")
+_INDEX_ENTRY = struct.Struct("<HHII")
+
+
+def write_snapshot(path: str, berijming: str, corpus: Mapping[int, Mapping[int, str]]) -> None:
+    """Schrijft corpus {psalm: {vers: tekst}} atomair naar path."""
+    max_psalm = max(corpus) if corpus else 0
+    max_table = bytearray(_MAX_ENTRY.size * (max_psalm + 1))
+    index = bytearray()
+    blob = bytearray()
+    count = 0
+    for psalm in sorted(corpus):
+        verses = corpus[psalm]
+        if verses:
+            _MAX_ENTRY.pack_into(max_table, psalm * _MAX_ENTRY.size, max(verses))
+        for vers in sorted(verses):
+            data = verses[vers].encode("utf-8")
+            index += _INDEX_ENTRY.pack(psalm, vers, len(blob), len(data))
+            blob += data
+            count += 1
+
+    header = _HEADER.pack(MAGIC, FORMAT_VERSION, max_psalm, berijming.encode("ascii"), count, len(blob))
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as fh:
+        fh.write(header)
+        fh.write(max_table)
+        fh.write(index)
+        fh.write(blob)
+    os.replace(tmp_path, path)
+
+
+class SnapshotClient:
+    """
+    Beantwoordt get_max_vers/get_vers uit een memory-mapped snapshot: geen netwerk en geen
+    HTML-parsing per request. Psalmen die niet in de snapshot staan gaan naar `fallback`
+    (meestal de live PsalmboekClient).
+    """
+
+    def __init__(self, path: str, fallback: Optional[object] = None):
+        self.path = path
+        self.fallback = fallback
+        self._listeners: List[Callable[[int, Dict[int, str]], None]] = []
+        with open(path, "rb") as fh:
+            self._mm = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, max_psalm, berijming, count, blob_size = _HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC:
+            raise ValueError(f"Geen psalm-snapshot: {path}")
+        if version != FORMAT_VERSION:
+            raise ValueError(f"Snapshotversie {version} wordt niet ondersteund (verwacht {FORMAT_VERSION}).")
+        self.berijming = berijming.rstrip(b"\0").decode("ascii")
+        self.version = version
+
+        offset = _HEADER.size
+        self._max = [m for (m,) in _MAX_ENTRY.iter_unpack(self._mm[offset : offset + _MAX_ENTRY.size * (max_psalm + 1)])]
+        offset += _MAX_ENTRY.size * (max_psalm + 1)
+        index_end = offset + _INDEX_ENTRY.size * count
+        self._blob_start = index_end
+        self._index: Dict[Tuple[int, int], Tuple[int, int]] = {
+            (psalm, vers): (self._blob_start + start, length)
+            for psalm, vers, start, length in _INDEX_ENTRY.iter_unpack(self._mm[offset:index_end])
+        }
+        if index_end + blob_size > len(self._mm):
+            raise ValueError(f"Snapshot is afgekapt: {path}")
+
+    def close(self) -> None:
+        self._mm.close()
+
+    def has_psalm(self, psalm: int) -> bool:
+        return 0 < psalm < len(self._max) and self._max[psalm] > 0
+
+    def _text(self, psalm: int, vers: int) -> Optional[str]:
+        location = self._index.get((psalm, vers))
+        if location is None:
+            return None
+        start, length = location
+        return self._mm[start : start + length].decode("utf-8")
+
+    def get_vers_map(self, psalm: int) -> Dict[int, str]:
+        if not self.has_psalm(psalm):
+            if self.fallback is not None:
+                return self.fallback.get_vers_map(psalm)
+            raise ValueError(f"Psalm {psalm} staat niet in de snapshot.")
+        return self.get_verses(psalm, range(1, self._max[psalm] + 1))
+
+    def get_max_vers(self, psalm: int) -> int:
+        if not self.has_psalm(psalm):
+            if self.fallback is not None:
+                return self.fallback.get_max_vers(psalm)
+            raise ValueError(f"Psalm {psalm} staat niet in de snapshot.")
+        return self._max[psalm]
+
+    def get_vers(self, psalm: int, vers: int) -> str:
+        if not self.has_psalm(psalm) and self.fallback is not None:
+            return self.fallback.get_vers(psalm, vers)
+        text = self._text(psalm, vers)
+        if text is None:
+            raise ValueError(f"Vers {vers} niet gevonden voor psalm {psalm}.")
+        return text
+
+    def get_verses(self, psalm: int, verses: Iterable[int]) -> Dict[int, str]:
+        if not self.has_psalm(psalm) and self.fallback is not None:
+            return self.fallback.get_verses(psalm, verses)
+        found: Dict[int, str] = {}
+        for vers in verses:
+            text = self._text(psalm, vers)
+            if text is not None:
+                found[vers] = text
+        return found
+
+    # Async varianten: de snapshot zelf doet geen I/O, alleen de fallback kan dat.
+
+    async def aget_vers_map(self, psalm: int) -> Dict[int, str]:
+        if not self.has_psalm(psalm) and self.fallback is not None:
+            return await self.fallback.aget_vers_map(psalm)
+        return self.get_vers_map(psalm)
+
+    async def aget_max_vers(self, psalm: int) -> int:
+        if not self.has_psalm(psalm) and self.fallback is not None:
+            return await self.fallback.aget_max_vers(psalm)
+        return self.get_max_vers(psalm)
+
+    async def aget_vers(self, psalm: int, vers: int) -> str:
+        if not self.has_psalm(psalm) and self.fallback is not None:
+            return await self.fallback.aget_vers(psalm, vers)
+        return self.get_vers(psalm, vers)
+
+    async def aget_verses(self, psalm: int, verses: Iterable[int]) -> Dict[int, str]:
+        if not self.has_psalm(psalm) and self.fallback is not None:
+            return await self.fallback.aget_verses(psalm, verses)
+        return self.get_verses(psalm, verses)
+
+    def psalms(self) -> Iterator[int]:
+        return (psalm for psalm in range(1, len(self._max)) if self._max[psalm] > 0)
+
+    def subscribe(self, listener: Callable[[int, Dict[int, str]], None]) -> None:
+        """Zoals PsalmboekClient.subscribe; de inhoud van de snapshot zelf meldt publish_all()."""
+        self._listeners.append(listener)
+        if self.fallback is not None:
+            self.fallback.subscribe(listener)
+
+    def publish_all(self) -> None:
+        """Meldt alle psalmen uit de snapshot aan de listeners (bulk-vulling, bijv. bij het starten)."""
+        for psalm in self.psalms():
+            vers_map = self.get_vers_map(psalm)
+            for listener in self._listeners:
+                listener(psalm, vers_map)
+
+    async def aprefetch(self, psalm: int, margin: float = 0.0) -> bool:
+        if not self.has_psalm(psalm) and self.fallback is not None:
+            return await self.fallback.aprefetch(psalm, margin)
+        return False
+
+    async def aprobe(self, timeout: float = 3.0) -> Dict[str, object]:
+        if self.fallback is not None:
+            return await self.fallback.aprobe(timeout)
+        return {"reachable": None}
+
+    def cache_stats(self) -> Dict[str, Dict[str, int]]:
+        tiers = self.fallback.cache_stats() if self.fallback is not None else {}
+        tiers["snapshot"] = {"psalms": sum(1 for m in self._max if m), "verses": len(self._index)}
+        return tiers
+
+    def revalidation_stats(self) -> Dict[str, float]:
+        return self.fallback.revalidation_stats() if self.fallback is not None else {}
+
+    def resilience_stats(self) -> Dict[str, object]:
+        return self.fallback.resilience_stats() if self.fallback is not None else {}
+
+    async def aclose(self) -> None:
+        if self.fallback is not None:
+            await self.fallback.aclose()
+
+
+def open_snapshot(path: str, fallback: Optional[object] = None) -> Optional[SnapshotClient]:
+    """Opent de snapshot als path is ingesteld en bestaat; anders None."""
+    if not path or not os.path.exists(path):
+        return None
+    return SnapshotClient(path, fallback=fallback)
+
+
+def crawl(client, psalms: Iterable[int], delay: float = 1.0) -> Dict[int, Dict[int, str]]:
+    """Haalt elke psalm één keer op via de bestaande scraper-logica van PsalmboekClient."""
+    corpus: Dict[int, Dict[int, str]] = {}
+    for psalm in psalms:
+        corpus[psalm] = client._extract_vers_map(client._fetch_overview(psalm))
+        print(f"psalm {psalm}: {len(corpus[psalm])} verzen")
+        if delay:
+            time.sleep(delay)
+    return corpus
+
+
+def _main() -> None:
+    parser = argparse.ArgumentParser(description="Bouw een offline psalm-snapshot.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    build = sub.add_parser("build", help="crawl psalmboek.nl en schrijf een snapshot")
+    build.add_argument("--out", required=True)
+    build.add_argument("--first", type=int, default=1)
+    build.add_argument("--last", type=int, default=150)
+    build.add_argument("--delay", type=float, default=1.0, help="pauze tussen requests (beleefd naar de bron)")
+    args = parser.parse_args()
+
+    from psalm_client import client
+
+    corpus = crawl(client, range(args.first, args.last + 1), delay=args.delay)
+    write_snapshot(args.out, client.berijming, corpus)
+    print(f"snapshot geschreven: {args.out}")
+
+
+if __name__ == "__main__":
+    _main()
@@ -1,8 +1,75 @@
-from psalm_client import PsalmboekClient, client, get_max_vers, get_vers
+from typing import Dict, Iterable
+
+from config import settings
+from max_verses import MaxVerseTable, load_table
+from psalm_client import PsalmboekClient, build_client
+from psalm_client import client as live_client
+from psalm_snapshot import SnapshotClient, open_snapshot
+from sources import GEZANGEN_1938, Source, SourceRegistry
+
+# Een offline snapshot (indien aanwezig) gaat voor; de live scraper is dan alleen fallback.
+client = open_snapshot(settings.PSALM_SNAPSHOT_PATH, fallback=live_client) or live_client
+
+# Vooraf berekende max-verstabel (zie max_verses.py); None als die nog niet gebouwd is.
+max_verses = load_table(settings.PSALM_BERIJMING, settings.MAX_VERSES_PATH or None)
+
+# Alle collecties, elk met eigen client, max-verstabel en cachepartitie (zie sources.py).
+# De psalmen zijn de standaardbron; de bestaande /api/psalm/*-endpoints gebruiken die direct.
+sources = SourceRegistry()
+sources.register(
+    Source(
+        f"psalmen_{settings.PSALM_BERIJMING}",
+        "Psalm",
+        client,
+        count=150,
+        max_verses=max_verses,
+        page_url=live_client.page_url,
+    ),
+    default=True,
+)
+if settings.GEZANGEN_ENABLED:
+    gezangen_client = build_client(
+        GEZANGEN_1938,
+        url_template=settings.GEZANGEN_URL_TEMPLATE,
+        cache_max_entries=settings.GEZANGEN_CACHE_MAX_ENTRIES,
+        cache_max_bytes=settings.GEZANGEN_CACHE_MAX_BYTES,
+        extraction_engine=settings.GEZANGEN_EXTRACTION_ENGINE or settings.EXTRACTION_ENGINE,
+    )
+    sources.register(
+        Source(
+            GEZANGEN_1938,
+            "Gezang",
+            gezangen_client,
+            count=settings.GEZANGEN_COUNT,
+            max_verses=load_table(
+                GEZANGEN_1938, settings.GEZANGEN_MAX_VERSES_PATH or None, max_number=settings.GEZANGEN_COUNT
+            ),
+        )
+    )
+
+
+def get_max_vers(psalm: int) -> int:
+    known = max_verses.get(psalm) if max_verses is not None else None
+    return known if known is not None else client.get_max_vers(psalm)
+
+
+def get_vers(psalm: int, vers: int) -> str:
+    return client.get_vers(psalm, vers)
+
+
+def get_verses(psalm: int, verses: Iterable[int]) -> Dict[int, str]:
+    return client.get_verses(psalm, verses)
+
 
 __all__ = [
+    "MaxVerseTable",
     "PsalmboekClient",
+    "SnapshotClient",
     "client",
+    "live_client",
+    "max_verses",
+    "sources",
     "get_max_vers",
     "get_vers",
+    "get_verses",
 ]
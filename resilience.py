@@ -0,0 +1,356 @@
+"""
+Resilience rond de upstream-fetch naar psalmboek.nl.
+
+- `CircuitBreaker`: opent na N opeenvolgende fouten/timeouts; daarna falen aanroepen direct
+  (CircuitOpenError) tot `reset_timeout` voorbij is en één proefrequest (half-open) slaagt.
+- `RetryBudget`: retries en hedges samen mogen hooguit `ratio` van het aantal requests in het
+  venster zijn (plus een klein minimum), zodat retries een storing niet verergeren.
+- Hedging (alleen async): duurt een request langer dan de p95 van recente fetches, dan gaat
+  er een tweede identiek request uit en wint de snelste.
+- Deadlines: de API zet per inkomend request een deadline (contextvar); upstream-timeouts
+  worden daarop afgekapt en na het verstrijken wordt er niets meer gestart. Een timeout die
+  alleen optrad omdat de aanroeper zelf een kortere deadline koos (`deadline(..., caller=True)`,
+  bijv. X-Request-Timeout), zegt niets over de bron: die telt niet voor de breaker, kost geen
+  retry-budget en wordt een DeadlineExceeded. De standaarddeadline van de server telt wel.
+
+`UpstreamGuard` combineert dit voor één bron.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import sys
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Awaitable, Callable, Deque, Dict, Iterator, Optional, Tuple, TypeVar
+
+T = TypeVar("T")
+
+CLOSED, HALF_OPEN, OPEN = "closed", "half_open", "open"
+STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+# (tijdstip, gekozen door de aanroeper) van de strengste deadline.
+_DEADLINE: ContextVar[Optional[Tuple[float, bool]]] = ContextVar("upstream_deadline", default=None)
+
+
+class CircuitOpenError(RuntimeError):
+    """De breaker staat open: psalmboek.nl wordt tijdelijk niet aangesproken."""
+
+
+class DeadlineExceeded(TimeoutError):
+    """De deadline van het inkomende request is verstreken."""
+
+
+@contextmanager
+def deadline(seconds: Optional[float], *, caller: bool = False) -> Iterator[None]:
+    """
+    Zet een deadline voor alle upstream-calls binnen dit blok (de strengste wint). `caller`:
+    de aanroeper koos hem zelf korter dan de standaard, zie `UpstreamGuard._admit`.
+    """
+    if seconds is None:
+        yield
+        return
+    candidate = (time.monotonic() + seconds, caller)
+    current = _DEADLINE.get()
+    token = _DEADLINE.set(candidate if current is None or candidate[0] < current[0] else current)
+    try:
+        yield
+    finally:
+        _DEADLINE.reset(token)
+
+
+def remaining() -> Optional[float]:
+    """Resterende tijd tot de deadline in seconden, of None zonder deadline."""
+    current = _DEADLINE.get()
+    return None if current is None else current[0] - time.monotonic()
+
+
+def caller_deadline() -> bool:
+    """Of de strengste deadline door de aanroeper gekozen is (en niet de serverstandaard)."""
+    current = _DEADLINE.get()
+    return current is not None and current[1]
+
+
+def is_failure(exc: BaseException) -> bool:
+    """Telt mee voor de breaker: timeouts, verbindingsfouten en 5xx (geen 4xx)."""
+    # httpx wordt lazy geladen (psalm_client._httpx); zonder httpx kan het ook geen httpx-fout zijn.
+    httpx = sys.modules.get("httpx")
+    if httpx is None:
+        return isinstance(exc, TimeoutError)
+    if isinstance(exc, httpx.HTTPStatusError):
+        return exc.response.status_code >= 500
+    return isinstance(exc, (httpx.TransportError, TimeoutError))
+
+
+def is_timeout(exc: BaseException) -> bool:
+    if isinstance(exc, TimeoutError):
+        return True
+    httpx = sys.modules.get("httpx")
+    return httpx is not None and isinstance(exc, httpx.TimeoutException)
+
+
+class CircuitBreaker:
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0, *, clock=time.monotonic):
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_timeout = reset_timeout
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe_started: Optional[float] = None
+        self.transitions: Dict[str, int] = {CLOSED: 0, HALF_OPEN: 0, OPEN: 0}
+        self.rejected = 0
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._current_state()
+
+    def _current_state(self) -> str:
+        if self._state == OPEN and self._clock() - self._opened_at >= self.reset_timeout:
+            self._transition(HALF_OPEN)
+        return self._state
+
+    def _transition(self, state: str) -> None:
+        self._state = state
+        self.transitions[state] += 1
+        self._probe_started = None
+        if state == OPEN:
+            self._opened_at = self._clock()
+
+    def allow(self) -> bool:
+        with self._lock:
+            state = self._current_state()
+            if state == CLOSED:
+                return True
+            # Eén proefrequest tegelijk; een proef die nooit terugmeldt blokkeert niet eeuwig.
+            now = self._clock()
+            if state == HALF_OPEN and (self._probe_started is None or now - self._probe_started > self.reset_timeout):
+                self._probe_started = now
+                return True
+            self.rejected += 1
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._failures = 0
+            if self._state != CLOSED:
+                self._transition(CLOSED)
+
+    def release_probe(self) -> None:
+        """Een proefrequest zonder uitsluitsel (bijv. afgebroken door de deadline van de aanroeper)."""
+        with self._lock:
+            self._probe_started = None
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            if self._state == HALF_OPEN or (self._state == CLOSED and self._failures >= self.failure_threshold):
+                self._transition(OPEN)
+
+
+class RetryBudget:
+    def __init__(self, ratio: float = 0.1, min_retries: int = 3, window: float = 10.0, *, clock=time.monotonic):
+        self.ratio = ratio
+        self.min_retries = min_retries
+        self.window = window
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._requests: Deque[float] = deque()
+        self._retries: Deque[float] = deque()
+        self.exhausted = 0
+
+    def _trim(self, now: float) -> None:
+        for events in (self._requests, self._retries):
+            while events and now - events[0] > self.window:
+                events.popleft()
+
+    def record_request(self) -> None:
+        with self._lock:
+            now = self._clock()
+            self._trim(now)
+            self._requests.append(now)
+
+    def try_spend(self) -> bool:
+        with self._lock:
+            now = self._clock()
+            self._trim(now)
+            if len(self._retries) >= self.min_retries + self.ratio * len(self._requests):
+                self.exhausted += 1
+                return False
+            self._retries.append(now)
+            return True
+
+
+class LatencyTracker:
+    def __init__(self, size: int = 200, min_samples: int = 20):
+        self._samples: Deque[float] = deque(maxlen=size)
+        self.min_samples = min_samples
+        self._lock = threading.Lock()
+
+    def observe(self, seconds: float) -> None:
+        with self._lock:
+            self._samples.append(seconds)
+
+    def percentile(self, pct: float) -> Optional[float]:
+        with self._lock:
+            if len(self._samples) < self.min_samples:
+                return None
+            ordered = sorted(self._samples)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+class UpstreamGuard:
+    def __init__(
+        self,
+        breaker: Optional[CircuitBreaker] = None,
+        budget: Optional[RetryBudget] = None,
+        *,
+        timeout: float = 15.0,
+        retries: int = 1,
+        hedge: bool = False,
+        hedge_min_delay: float = 0.05,
+    ):
+        self.breaker = breaker or CircuitBreaker()
+        self.budget = budget or RetryBudget()
+        self.latency = LatencyTracker()
+        self.timeout = timeout
+        self.retries = retries
+        self.hedge = hedge
+        self.hedge_min_delay = hedge_min_delay
+        self._lock = threading.Lock()
+        self.counts = {"calls": 0, "retries": 0, "hedges": 0, "hedge_wins": 0, "deadline_exceeded": 0, "stale_served": 0}
+
+    def _count(self, key: str) -> None:
+        with self._lock:
+            self.counts[key] += 1
+
+    def count_stale(self) -> None:
+        """De client viel terug op een stale versmap omdat de bron niet aangesproken werd."""
+        self._count("stale_served")
+
+    def _admit(self) -> Tuple[float, bool]:
+        """Controleert deadline en breaker; geeft (timeout, ingekort door de deadline van de aanroeper)."""
+        left = remaining()
+        if left is not None and left <= 0:
+            self._count("deadline_exceeded")
+            raise DeadlineExceeded("Deadline van het verzoek verstreken vóór de upstream-fetch.")
+        if not self.breaker.allow():
+            raise CircuitOpenError("psalmboek.nl is tijdelijk niet beschikbaar (circuit breaker open).")
+        if left is None or left >= self.timeout:
+            return self.timeout, False
+        return left, caller_deadline()
+
+    def _deadline_exceeded(self, timeout: float) -> DeadlineExceeded:
+        """Timeout binnen een door de deadline ingekorte poging: de aanroeper had haast, niet de bron."""
+        self.breaker.release_probe()
+        self._count("deadline_exceeded")
+        return DeadlineExceeded(f"Deadline van het verzoek ({timeout:.2f} s) verstreken tijdens de upstream-fetch.")
+
+    def _succeeded(self, started: float) -> None:
+        self.breaker.record_success()
+        self.latency.observe(time.perf_counter() - started)
+
+    def _may_retry(self, exc: BaseException, attempt: int) -> bool:
+        return is_failure(exc) and attempt < self.retries and self.budget.try_spend()
+
+    def call(self, fn: Callable[[float], T], passthrough: tuple = ()) -> T:
+        """Voert fn(timeout) uit met breaker, retry-budget en deadline."""
+        self._count("calls")
+        self.budget.record_request()
+        attempt = 0
+        while True:
+            timeout, shortened = self._admit()
+            started = time.perf_counter()
+            try:
+                result = fn(timeout)
+            except passthrough:
+                self._succeeded(started)
+                raise
+            except Exception as exc:
+                if shortened and is_timeout(exc):
+                    raise self._deadline_exceeded(timeout) from exc
+                self._failed(exc)
+                if not self._may_retry(exc, attempt):
+                    raise
+                attempt += 1
+                self._count("retries")
+                continue
+            self._succeeded(started)
+            return result
+
+    def _failed(self, exc: BaseException) -> None:
+        if is_failure(exc):
+            self.breaker.record_failure()
+        else:
+            # Een 4xx of parse-fout zegt niets over de beschikbaarheid van de bron.
+            self.breaker.record_success()
+
+    async def acall(self, fn: Callable[[float], Awaitable[T]], passthrough: tuple = ()) -> T:
+        """Async variant van call, met optionele hedging na de p95-latency."""
+        self._count("calls")
+        self.budget.record_request()
+        attempt = 0
+        while True:
+            timeout, shortened = self._admit()
+            started = time.perf_counter()
+            try:
+                result = await self._hedged(fn, timeout, passthrough)
+            except passthrough:
+                self._succeeded(started)
+                raise
+            except Exception as exc:
+                if shortened and is_timeout(exc):
+                    raise self._deadline_exceeded(timeout) from exc
+                self._failed(exc)
+                if not self._may_retry(exc, attempt):
+                    raise
+                attempt += 1
+                self._count("retries")
+                continue
+            self._succeeded(started)
+            return result
+
+    async def _hedged(self, fn: Callable[[float], Awaitable[T]], timeout: float, passthrough: tuple = ()) -> T:
+        p95 = self.latency.percentile(95) if self.hedge else None
+        if p95 is None:
+            return await fn(timeout)
+        delay = max(self.hedge_min_delay, p95)
+        first = asyncio.ensure_future(fn(timeout))
+        done, _ = await asyncio.wait({first}, timeout=delay)
+        if done or not self.budget.try_spend():
+            return await first
+        self._count("hedges")
+        second = asyncio.ensure_future(fn(max(0.001, timeout - delay)))
+        pending = {first, second}
+        error: Optional[BaseException] = None
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    exc = task.exception()
+                    if exc is None or isinstance(exc, passthrough):
+                        if task is second:
+                            self._count("hedge_wins")
+                        return task.result()
+                    error = exc
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
+
+    def stats(self) -> Dict[str, object]:
+        with self._lock:
+            counts = dict(self.counts)
+        return {
+            **counts,
+            "state": self.breaker.state,
+            "transitions": dict(self.breaker.transitions),
+            "rejected": self.breaker.rejected,
+            "budget_exhausted": self.budget.exhausted,
+            "p95_seconds": self.latency.percentile(95),
+        }
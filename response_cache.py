@@ -0,0 +1,139 @@
+"""
+Cache van complete, al gevalideerde en geserialiseerde lookup-responses.
+
+Een herhaald verzoek hoeft dan niet opnieuw geparsed, opgebouwd, gevalideerd en naar JSON
+omgezet te worden: de ruwe query wijst via een memo naar de genormaliseerde sleutel
+("lookup", berijming, psalm, verzen), en die naar de bytes plus headers van het 200-antwoord.
+
+Entries zijn geldig zolang de versmap waarop ze gebaseerd zijn niet verandert. De client
+meldt elke nieuw geëxtraheerde versmap (PsalmboekClient.subscribe); wijkt de content-hash
+af van de vorige melding voor die psalm, dan gaan de entries van die psalm eruit en telt
+de generatie van de psalm op. Een antwoord dat tijdens zo'n wissel gebouwd werd, wordt
+niet meer opgeslagen (put met een verouderde generatie). Een ongewijzigde refresh (304 of
+zelfde HTML) laat de entries staan.
+
+Serialisatie gaat via orjson als dat geïnstalleerd is, anders via de standaard-json.
+"""
+
+from __future__ import annotations
+
+import json
+import threading
+from typing import Any, Dict, Hashable, Mapping, NamedTuple, Optional, Set, Tuple
+
+from cache import TTLCache
+from sqlite_cache import content_hash
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optioneel; standaard-json werkt ook
+    orjson = None
+
+
+def encode_json(payload: Any) -> bytes:
+    """Compacte UTF-8 JSON, identiek aan wat JSONResponse zou sturen."""
+    if orjson is not None:
+        return orjson.dumps(payload)
+    return json.dumps(payload, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+
+
+class CachedResponse(NamedTuple):
+    psalm: int
+    body: bytes
+    headers: Dict[str, str]
+    etag: Optional[str]
+
+
+class ResponseCache:
+    def __init__(self, ttl: float, *, max_entries: int = 4096, max_bytes: int = 16 * 1024 * 1024):
+        self._responses: TTLCache[CachedResponse] = TTLCache(
+            ttl, max_entries=max_entries, max_bytes=max_bytes, sizeof=lambda entry: len(entry.body) + 256
+        )
+        # Ruwe query → genormaliseerde sleutel; alleen voor queries die ooit een 200 gaven.
+        self._queries: TTLCache[Hashable] = TTLCache(ttl, max_entries=max_entries * 2)
+        self._lock = threading.Lock()
+        # Per psalm: content-hash van de laatst gemelde versmap, generatie en gebouwde sleutels.
+        self._versions: Dict[int, str] = {}
+        self._generations: Dict[int, int] = {}
+        self._keys: Dict[int, Set[Hashable]] = {}
+        self.invalidations = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self._responses.enabled and self._responses.max_entries > 0
+
+    def get(self, query: str) -> Optional[CachedResponse]:
+        """Snelle weg: ruwe query → sleutel → antwoord, zonder te parsen."""
+        memo = self._queries.get(query)
+        if memo is None or not memo[1]:
+            return None
+        return self.get_key(memo[0])
+
+    def get_key(self, key: Hashable, query: Optional[str] = None) -> Optional[CachedResponse]:
+        """Na het parsen: een andere schrijfwijze van hetzelfde verzoek; onthoudt dan ook de query."""
+        cached = self._responses.get(key)
+        if cached is None or not cached[1]:
+            return None
+        if query is not None:
+            self._queries.set(query, key)
+        return cached[0]
+
+    def generation(self, psalm: int) -> int:
+        """Vóór het ophalen van de verzen lezen en aan put() meegeven."""
+        with self._lock:
+            return self._generations.get(psalm, 0)
+
+    def put(
+        self,
+        query: str,
+        key: Hashable,
+        psalm: int,
+        generation: int,
+        body: bytes,
+        headers: Dict[str, str],
+        etag: Optional[str] = None,
+    ) -> bool:
+        """Slaat een 200-antwoord op; False als de versmap intussen gewijzigd is."""
+        if not self.enabled:
+            return False
+        with self._lock:
+            if self._generations.get(psalm, 0) != generation:
+                return False
+            self._keys.setdefault(psalm, set()).add(key)
+            self._responses.set(key, CachedResponse(psalm, body, headers, etag))
+        self._queries.set(query, key)
+        return True
+
+    def on_vers_map(self, psalm: int, vers_map: Mapping[int, str]) -> None:
+        """
+        Listener voor PsalmboekClient.subscribe: gewijzigde inhoud maakt de entries ongeldig.
+        De eerste versmap van een psalm wijzigt niets; er kan nog niets verouderds in de cache staan.
+        """
+        version = content_hash(vers_map)
+        with self._lock:
+            previous = self._versions.get(psalm)
+            if previous == version:
+                return
+            self._versions[psalm] = version
+            if previous is None:
+                return
+            self._generations[psalm] = self._generations.get(psalm, 0) + 1
+            keys = self._keys.pop(psalm, set())
+            for key in keys:
+                self._responses.delete(key)
+            self.invalidations += bool(keys)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._responses.clear()
+            self._queries.clear()
+            self._keys.clear()
+
+    def stats(self) -> Dict[str, int]:
+        stats = self._responses.stats()
+        stats["invalidations"] = self.invalidations
+        return stats
+
+
+def cache_key(berijming: str, request: Mapping[str, Any]) -> Tuple[Any, ...]:
+    return ("lookup", berijming, int(request["psalm_number"]), tuple(request["verses"]))
@@ -1,62 +1,356 @@
+"""
+Validatie van psalm_lookup_1773-responses tegen spec/schemas/psalm_lookup_1773.response.schema.json.
+
+Het JSON-schema wordt bij het importeren één keer gecompileerd tot Python-broncode,
+zodat spec en code niet uit elkaar kunnen lopen. Ondersteund is de subset die de specs
+gebruiken; een onbekend keyword geeft al bij het compileren een fout.
+
+`if`/`then`/`else` binnen `allOf` werkt als overschrijving van het basisschema: het schema
+zet `request.verses.minItems` op 0 voor invalid_request, wat bij strikte allOf-semantiek
+nooit zou gelden (de basis eist minItems 1).
+
+Voor streaming (NDJSON) zijn de deelschema's voor `request`, één vers en `status` apart
+gecompileerd: `ResponseValidator.stream()` controleert elk record op het moment dat het
+verstuurd wordt, zodat er nooit een volledige payload in het geheugen hoeft te staan.
+"""
+
 from __future__ import annotations
 
-from typing import Any, Dict, List
+import copy
+import json
+import pathlib
+import random
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+SCHEMA_PATH = pathlib.Path(__file__).resolve().parent / "spec" / "schemas" / "psalm_lookup_1773.response.schema.json"
+
+VALIDATION_MODES = ("full", "sampled", "off")
+
+Check = Callable[[Any], None]
+
+_ANNOTATIONS = {"$schema", "$id", "title", "description", "examples", "default"}
+_KEYWORDS = {
+    "type", "const", "enum", "required", "properties", "additionalProperties",
+    "items", "minItems", "maxItems", "uniqueItems", "minimum", "maximum", "minLength", "allOf",
+}  # fmt: skip
+_TYPE_TESTS = {
+    "object": "isinstance({v}, dict)",
+    "array": "isinstance({v}, list)",
+    "string": "isinstance({v}, str)",
+    "integer": "(isinstance({v}, int) and not isinstance({v}, bool))",
+    "number": "(isinstance({v}, (int, float)) and not isinstance({v}, bool))",
+    "boolean": "isinstance({v}, bool)",
+    "null": "{v} is None",
+}
+
+
+def _fail(path: str, message: str) -> None:
+    raise ValueError(f"{path or 'payload'}: {message}")
+
+
+def _all_unique(items: List[Any]) -> bool:
+    try:
+        return len(set(items)) == len(items)
+    except TypeError:
+        return len({json.dumps(item, sort_keys=True) for item in items}) == len(items)
+
+
+def _merge(base: Dict[str, Any], overlay: Dict[str, Any]) -> Dict[str, Any]:
+    merged = copy.deepcopy(base)
+    for key, value in overlay.items():
+        if isinstance(value, dict) and isinstance(merged.get(key), dict):
+            merged[key] = _merge(merged[key], value)
+        else:
+            merged[key] = copy.deepcopy(value)
+    return merged
+
+
+class _CodeGen:
+    """
+    Zet een schema om in Python-broncode: één functie met inline checks, zonder
+    functieaanroep per knoop. Het pad in een foutmelding wordt pas opgebouwd bij een fout.
+    """
+
+    def __init__(self) -> None:
+        self.namespace: Dict[str, Any] = {"_fail": _fail, "_all_unique": _all_unique}
+        self.functions: List[str] = []
+        self._counter = 0
+
+    def _name(self, prefix: str) -> str:
+        self._counter += 1
+        return f"{prefix}{self._counter}"
+
+    def _const(self, value: Any) -> str:
+        name = self._name("_c")
+        self.namespace[name] = value
+        return name
+
+    def function(self, schema: Dict[str, Any], *, predicate: bool, root: str = "") -> str:
+        name = self._name("_check")
+        body: List[str] = []
+        self._node(schema, "data", root.replace("{", "{{").replace("}", "}}"), body, 1, predicate)
+        body.append("    return True" if predicate else "    return None")
+        self.functions.append("\n".join([f"def {name}(data):", *body]))
+        return name
+
+    @staticmethod
+    def _fail_line(pad: str, path: str, message: str, predicate: bool) -> str:
+        return f"{pad}    return False" if predicate else f"{pad}    _fail(f{path!r}, {message!r})"
 
+    def _node(self, schema: Dict[str, Any], v: str, path: str, out: List[str], depth: int, predicate: bool) -> None:
+        pad = "    " * depth
 
-ALLOWED_STATUSES = {"ok", "not_found", "verification_failed", "invalid_request"}
+        def fail(message: str) -> None:
+            out.append(self._fail_line(pad, path, message, predicate))
 
+        unknown = set(schema) - _ANNOTATIONS - _KEYWORDS
+        if unknown:
+            raise ValueError(f"Niet-ondersteunde schema-keywords: {', '.join(sorted(unknown))}")
 
-def _ensure_condition(condition: bool, message: str) -> None:
-    if not condition:
-        raise ValueError(message)
+        if "allOf" in schema:
+            first, *rest = schema["allOf"]
+            base = {key: value for key, value in schema.items() if key != "allOf"}
+            if rest:
+                base["allOf"] = rest
+            if "if" not in first:
+                self._node(_merge(base, first), v, path, out, depth, predicate)
+                return
+            condition = self.function(first["if"], predicate=True)
+            out.append(f"{pad}if {condition}({v}):")
+            out.append(f"{pad}    pass")
+            self._node(_merge(base, first.get("then", {})), v, path, out, depth + 1, predicate)
+            out.append(f"{pad}else:")
+            out.append(f"{pad}    pass")
+            self._node(_merge(base, first.get("else", {})), v, path, out, depth + 1, predicate)
+            return
 
+        names = schema.get("type", [])
+        names = names if isinstance(names, list) else [names]
+        if names:
+            test = " or ".join(_TYPE_TESTS[name].format(v=v) for name in names)
+            out.append(f"{pad}if not ({test}):")
+            fail(f"moet {' of '.join(names)} zijn")
+        if "const" in schema:
+            out.append(f"{pad}if {v} != {self._const(schema['const'])}:")
+            fail(f"moet {schema['const']!r} zijn")
+        if "enum" in schema:
+            out.append(f"{pad}if {v} not in {self._const(list(schema['enum']))}:")
+            fail("ongeldige waarde")
 
-def _validate_request(request: Dict[str, Any], *, allow_empty_verses: bool) -> None:
-    _ensure_condition(isinstance(request, dict), "request moet een object zijn")
-    _ensure_condition("psalm_number" in request, "psalm_number ontbreekt")
-    _ensure_condition("verses" in request, "verses ontbreekt")
+        is_number = f"(isinstance({v}, (int, float)) and not isinstance({v}, bool))"
+        for keyword, operator, word in (("minimum", "<", ">="), ("maximum", ">", "<=")):
+            if keyword in schema:
+                guard = "" if set(names) <= {"integer", "number"} and names else f"{is_number} and "
+                out.append(f"{pad}if {guard}{v} {operator} {schema[keyword]!r}:")
+                fail(f"moet {word} {schema[keyword]} zijn")
+        if "minLength" in schema:
+            guard = "" if names == ["string"] else f"isinstance({v}, str) and "
+            out.append(f"{pad}if {guard}len({v}) < {schema['minLength']!r}:")
+            fail(f"minimaal {schema['minLength']} tekens verwacht")
 
-    psalm_number = request.get("psalm_number")
-    _ensure_condition(isinstance(psalm_number, int), "psalm_number moet integer zijn")
-    _ensure_condition(1 <= psalm_number <= 150, "psalm_number buiten bereik")
+        if {"required", "properties", "additionalProperties"} & set(schema):
+            self._object(schema, v, path, out, depth, predicate, guarded=names == ["object"])
+        if {"items", "minItems", "maxItems", "uniqueItems"} & set(schema):
+            self._array(schema, v, path, out, depth, predicate, guarded=names == ["array"])
 
-    verses = request.get("verses")
-    _ensure_condition(isinstance(verses, list), "verses moet een array zijn")
-    if not allow_empty_verses:
-        _ensure_condition(len(verses) >= 1, "verses mag niet leeg zijn")
-    for item in verses:
-        _ensure_condition(isinstance(item, int) and item >= 1, "vers moet integer >= 1 zijn")
-    _ensure_condition(len(verses) == len(set(verses)), "verses moeten uniek zijn")
+    def _object(self, schema, v, path, out, depth, predicate, *, guarded: bool) -> None:
+        if not guarded:
+            out.append(f"{'    ' * depth}if isinstance({v}, dict):")
+            out.append(f"{'    ' * depth}    pass")
+            depth += 1
+        pad = "    " * depth
+        prefix = f"{path}." if path else ""
+        for name in schema.get("required", []):
+            out.append(f"{pad}if {name!r} not in {v}:")
+            out.append(self._fail_line(pad, prefix + name, "ontbreekt", predicate))
+        properties = schema.get("properties", {})
+        additional = schema.get("additionalProperties", True)
+        if additional is False:
+            known = self._const(frozenset(properties))
+            out.append(f"{pad}if not {known}.issuperset({v}):")
+            if predicate:
+                out.append(f"{pad}    return False")
+            else:
+                out.append(
+                    f"{pad}    _fail(f{path!r}, 'onbekende velden: ' + ', '.join(sorted(set({v}) - {known})))"
+                )
+        elif additional is not True:
+            raise ValueError("additionalProperties wordt alleen als boolean ondersteund")
+        for name, sub in properties.items():
+            child = self._name("_v")
+            out.append(f"{pad}if {name!r} in {v}:")
+            out.append(f"{pad}    {child} = {v}[{name!r}]")
+            self._node(sub, child, prefix + name.replace("{", "{{").replace("}", "}}"), out, depth + 1, predicate)
 
+    def _array(self, schema, v, path, out, depth, predicate, *, guarded: bool) -> None:
+        if not guarded:
+            out.append(f"{'    ' * depth}if isinstance({v}, list):")
+            out.append(f"{'    ' * depth}    pass")
+            depth += 1
+        pad = "    " * depth
 
-def _validate_result(result: Dict[str, Any]) -> None:
-    allowed_keys = {"verified", "verses", "message"}
-    _ensure_condition(set(result).issubset(allowed_keys), "Onbekende velden in result")
-    if "verified" in result:
-        _ensure_condition(isinstance(result["verified"], bool), "verified moet boolean zijn")
-    if "verses" in result:
-        verses = result["verses"]
-        _ensure_condition(isinstance(verses, list), "result.verses moet een array zijn")
-        for item in verses:
-            _ensure_condition(isinstance(item, dict), "result.verses items moeten objecten zijn")
-            _ensure_condition({"verse", "text"}.issubset(item.keys()), "verse/text vereist in result")
-            _ensure_condition(isinstance(item.get("verse"), int) and item["verse"] >= 1, "verse moet integer >=1")
-            _ensure_condition(isinstance(item.get("text"), str), "text moet string zijn")
-    if "message" in result:
-        _ensure_condition(isinstance(result["message"], str), "message moet string zijn")
+        def fail(message: str) -> None:
+            out.append(self._fail_line(pad, path, message, predicate))
+
+        if schema.get("minItems", 0):
+            out.append(f"{pad}if len({v}) < {schema['minItems']!r}:")
+            fail(f"minimaal {schema['minItems']} items verwacht")
+        if "maxItems" in schema:
+            out.append(f"{pad}if len({v}) > {schema['maxItems']!r}:")
+            fail(f"maximaal {schema['maxItems']} items toegestaan")
+        if "items" in schema:
+            index, item = self._name("_i"), self._name("_v")
+            out.append(f"{pad}for {index}, {item} in enumerate({v}):")
+            self._node(schema["items"], item, f"{path}[{{{index}}}]", out, depth + 1, predicate)
+        if schema.get("uniqueItems"):
+            out.append(f"{pad}if not _all_unique({v}):")
+            fail("items moeten uniek zijn")
+
+
+def compile_schema(schema: Dict[str, Any], *, root: str = "") -> Check:
+    """Compileert een JSON-schema (subset) tot check(value) die ValueError gooit; `root` prefixt foutpaden."""
+    generator = _CodeGen()
+    entry = generator.function(schema, predicate=False, root=root)
+    source = "\n\n".join(generator.functions)
+    exec(compile(source, "<response-schema>", "exec"), generator.namespace)
+    check = generator.namespace[entry]
+    check.source = source
+    return check
+
+
+def load_schema(path: pathlib.Path = SCHEMA_PATH) -> Dict[str, Any]:
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+_SCHEMA = load_schema()
+_check_response = compile_schema(_SCHEMA)
+# Deelschema's voor incrementele validatie van een gestreamde lookup (zie StreamCheck).
+check_request = compile_schema(_SCHEMA["properties"]["request"], root="request")
+check_verse = compile_schema(_SCHEMA["properties"]["result"]["properties"]["verses"]["items"], root="result.verses[*]")
+check_status = compile_schema(_SCHEMA["properties"]["status"], root="status")
 
 
 def ensure_response_matches_schema(payload: Dict[str, Any]) -> None:
-    _ensure_condition(isinstance(payload, dict), "payload moet een object zijn")
-    _ensure_condition(payload.get("intent") == "psalm_lookup_1773", "intent ongeldig")
+    """Volledige validatie, ongeacht de modus; gooit ValueError met het pad van de fout."""
+    _check_response(payload)
+
+
+class ResponseValidator:
+    """
+    Valideert responses volgens VALIDATION_MODE: `full` (tests/staging), `sampled` (een
+    fractie `sample_rate` van de responses, voor productie) of `off`. Houdt bij hoeveel
+    responses gecontroleerd zijn en wat dat kostte.
+    """
+
+    def __init__(
+        self,
+        check: Callable[[Dict[str, Any]], None] = ensure_response_matches_schema,
+        *,
+        mode: str = "full",
+        sample_rate: float = 0.05,
+        rng: Callable[[], float] = random.random,
+        clock: Callable[[], float] = time.perf_counter,
+    ):
+        if mode not in VALIDATION_MODES:
+            raise ValueError(f"Onbekende validatiemodus: {mode} (kies uit {', '.join(VALIDATION_MODES)})")
+        self.mode = mode
+        self.sample_rate = min(1.0, max(0.0, sample_rate))
+        self._check = check
+        self._rng = rng
+        self._clock = clock
+        self._lock = threading.Lock()
+        self.checked = 0
+        self.skipped = 0
+        self.failed = 0
+        self.seconds_total = 0.0
+        self.seconds_max = 0.0
+
+    def _should_check(self) -> bool:
+        if self.mode == "full":
+            return True
+        if self.mode == "sampled":
+            return self._rng() < self.sample_rate
+        return False
+
+    def validate(self, payload: Dict[str, Any]) -> Optional[float]:
+        """Valideert (of slaat over); geeft de gemeten duur in seconden, of None indien overgeslagen."""
+        if not self._should_check():
+            with self._lock:
+                self.skipped += 1
+            return None
+        started = self._clock()
+        failed = True
+        try:
+            self._check(payload)
+            failed = False
+        finally:
+            elapsed = self._clock() - started
+            self._record(elapsed, failed)
+        return elapsed
+
+    def stream(self) -> Optional["StreamCheck"]:
+        """Incrementele controle voor één gestreamde response, of None als die niet gekozen is."""
+        if not self._should_check():
+            with self._lock:
+                self.skipped += 1
+            return None
+        return StreamCheck(self)
+
+    def _record(self, elapsed: float, failed: bool) -> None:
+        with self._lock:
+            self.checked += 1
+            self.failed += failed
+            self.seconds_total += elapsed
+            self.seconds_max = max(self.seconds_max, elapsed)
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            return {
+                "mode": self.mode,
+                "checked": self.checked,
+                "skipped": self.skipped,
+                "failed": self.failed,
+                "seconds_total": self.seconds_total,
+                "seconds_max": self.seconds_max,
+            }
+
+
+class StreamCheck:
+    """
+    Valideert een gestreamde lookup record voor record: eerst het request, dan elk vers,
+    tot slot de status. `close()` telt de stream als één gecontroleerde response (met de
+    opgetelde validatietijd) in de statistieken van de ResponseValidator.
+    """
+
+    def __init__(self, owner: ResponseValidator):
+        self._owner = owner
+        self.seconds = 0.0
+        self.failed = False
+        self._closed = False
+
+    def _run(self, check: Check, value: Any) -> None:
+        started = self._owner._clock()
+        try:
+            check(value)
+        except ValueError:
+            self.failed = True
+            raise
+        finally:
+            self.seconds += self._owner._clock() - started
+
+    def request(self, request: Dict[str, Any]) -> None:
+        self._run(check_request, request)
 
-    status = payload.get("status")
-    _ensure_condition(status in ALLOWED_STATUSES, "status ongeldig")
+    def verse(self, item: Dict[str, Any]) -> None:
+        self._run(check_verse, item)
 
-    request = payload.get("request")
-    allow_empty = status == "invalid_request"
-    _validate_request(request, allow_empty_verses=allow_empty)
+    def status(self, status: str) -> None:
+        self._run(check_status, status)
 
-    if "result" in payload and payload["result"] is not None:
-        _ensure_condition(isinstance(payload["result"], dict), "result moet een object zijn")
-        _validate_result(payload["result"])
+    def close(self) -> float:
+        if not self._closed:
+            self._closed = True
+            self._owner._record(self.seconds, self.failed)
+        return self.seconds
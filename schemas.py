@@ -1,4 +1,6 @@
-from pydantic import BaseModel, Field, HttpUrl
+from typing import List
+
+from pydantic import BaseModel, Field, HttpUrl, PositiveInt
 
 
 class PsalmVersResponse(BaseModel):
@@ -12,3 +14,22 @@ class PsalmMaxResponse(BaseModel):
     psalm: int = Field(..., ge=1, le=150)
     max_vers: int = Field(..., ge=1)
     bron: HttpUrl
+
+
+class PsalmLookupBatchRequest(BaseModel):
+    queries: List[str] = Field(..., min_length=1, max_length=50)
+
+
+class ScriptureRefsRequest(BaseModel):
+    refs: List[str] = Field(..., min_length=1, max_length=500)
+
+
+class SourceLookupItem(BaseModel):
+    bron: str = Field(..., min_length=1, max_length=64)
+    nummer: int = Field(..., ge=1)
+    # Leeg = alle verzen.
+    verzen: List[PositiveInt] = Field(default_factory=list, max_length=200)
+
+
+class SourceLookupRequest(BaseModel):
+    items: List[SourceLookupItem] = Field(..., min_length=1, max_length=50)
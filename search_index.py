@@ -0,0 +1,284 @@
+"""
+In-memory full-text index over de versteksten van berijming 1773.
+
+Tokens zijn hoofdletter- en diakriet-ongevoelig ("Gelijk een hert" vindt ook "gelijk een
+hért"). Een zoekvraag bestaat uit woorden (allemaal verplicht), "frasen tussen
+aanhalingstekens" (opeenvolgend, in volgorde) en prefixen: het laatste woord, of een woord
+met `*`, matcht ook langere woorden, zodat "ik hef mijn og" al resultaten geeft. Een spatie
+achteraan maakt het laatste woord exact.
+
+Ranking: idf van de gematchte termen, een bonus als de woorden als frase voorkomen en een
+kleinere bonus als de match aan het begin van het vers staat (beginregels worden het vaakst
+onthouden); kortere verzen gaan bij gelijke score voor.
+
+Per token houdt het index een bitset (Python-int) bij van de verzen waarin het voorkomt en
+van de verzen die ermee beginnen, plus de posities voor frasecontrole. Doorsnedes en
+prefix-uitbreidingen zijn daarmee een paar int-operaties, en posities worden alleen voor de
+overgebleven kandidaten bekeken. Het index groeit incrementeel: de client meldt elke nieuw
+geëxtraheerde versmap (zie PsalmboekClient.subscribe); een snapshot of volledige crawl vult
+het in één keer.
+"""
+
+from __future__ import annotations
+
+import bisect
+import math
+import re
+import threading
+import unicodedata
+from typing import Dict, Iterable, Iterator, List, Mapping, NamedTuple, Optional, Tuple
+
+_WORD = re.compile(r"[0-9a-z]+")
+_QUERY = re.compile(r'"([^"]*)"?|(\S+)')
+# Kortere prefixen zouden een groot deel van het vocabulaire matchen.
+MIN_PREFIX = 2
+_PREFIX_WEIGHT = 0.8
+_PHRASE_BONUS = 2.0
+_INCIPIT_BONUS = 0.5
+
+
+def normalize(text: str) -> str:
+    decomposed = unicodedata.normalize("NFKD", text.casefold())
+    return "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+
+
+def tokenize(text: str) -> List[str]:
+    return _WORD.findall(normalize(text))
+
+
+def _members(bits: int) -> Iterator[int]:
+    while bits:
+        low = bits & -bits
+        yield low.bit_length() - 1
+        bits ^= low
+
+
+class _Term(NamedTuple):
+    text: str
+    prefix: bool
+
+
+class SearchHit(NamedTuple):
+    psalm: int
+    vers: int
+    score: float
+    text: str
+
+
+class _Posting:
+    __slots__ = ("docs", "starts", "positions")
+
+    def __init__(self) -> None:
+        self.docs = 0  # bitset van verzen met dit token
+        self.starts = 0  # bitset van verzen die met dit token beginnen
+        self.positions: Dict[int, List[int]] = {}
+
+
+def parse_query(query: str) -> Tuple[List[List[_Term]], List[_Term]]:
+    """(frasen, losse woorden); het laatste losse woord en woorden met * zijn prefixen."""
+    phrases: List[List[_Term]] = []
+    words: List[_Term] = []
+    for quoted, bare in _QUERY.findall(query):
+        if quoted:
+            terms = [_Term(token, False) for token in tokenize(quoted)]
+            if terms:
+                phrases.append(terms)
+            continue
+        tokens = tokenize(bare)
+        for index, token in enumerate(tokens):
+            starred = bare.endswith("*") and index == len(tokens) - 1
+            words.append(_Term(token, starred and len(token) >= MIN_PREFIX))
+    # Nog aan het typen: het laatste woord is een prefix, tenzij er een spatie achter staat.
+    if words and not query.endswith((" ", "*", '"')) and len(words[-1].text) >= MIN_PREFIX:
+        words[-1] = _Term(words[-1].text, True)
+    return phrases, words
+
+
+class SearchIndex:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._postings: Dict[str, _Posting] = {}
+        self._psalms: Dict[int, Dict[int, str]] = {}
+        # Per doc-id: (psalm, vers), tekst en lengte in tokens; ids van verwijderde verzen blijven leeg.
+        self._keys: List[Optional[Tuple[int, int]]] = []
+        self._texts: List[str] = []
+        self._lengths: List[int] = []
+        self._psalm_ids: Dict[int, List[int]] = {}
+        self._count = 0
+        self._vocabulary: List[str] = []
+        self._order: List[int] = []
+        self._dirty = False
+
+    def __len__(self) -> int:
+        return self._count
+
+    @property
+    def psalms(self) -> int:
+        return len(self._psalms)
+
+    # --- bijwerken ------------------------------------------------------------
+
+    def add_psalm(self, psalm: int, vers_map: Mapping[int, str]) -> None:
+        """(Her)indexeert alle verzen van één psalm; een ongewijzigde versmap is een no-op."""
+        with self._lock:
+            if self._psalms.get(psalm) == vers_map:
+                return
+            self._remove_psalm(psalm)
+            ids = self._psalm_ids[psalm] = []
+            for vers, text in sorted(vers_map.items()):
+                doc = len(self._keys)
+                tokens = tokenize(text)
+                self._keys.append((psalm, vers))
+                self._texts.append(text)
+                self._lengths.append(len(tokens))
+                ids.append(doc)
+                bit = 1 << doc
+                for position, token in enumerate(tokens):
+                    posting = self._postings.get(token)
+                    if posting is None:
+                        posting = self._postings[token] = _Posting()
+                    posting.docs |= bit
+                    posting.positions.setdefault(doc, []).append(position)
+                if tokens:
+                    self._postings[tokens[0]].starts |= bit
+            self._count += len(ids)
+            self._psalms[psalm] = dict(vers_map)
+            self._dirty = True
+
+    def add_many(self, vers_maps: Iterable[Tuple[int, Mapping[int, str]]]) -> None:
+        for psalm, vers_map in vers_maps:
+            self.add_psalm(psalm, vers_map)
+
+    def _remove_psalm(self, psalm: int) -> None:
+        ids = self._psalm_ids.pop(psalm, [])
+        if not ids:
+            return
+        self._psalms.pop(psalm, None)
+        mask = 0
+        for doc in ids:
+            mask |= 1 << doc
+        for doc in ids:
+            for token in set(tokenize(self._texts[doc])):
+                posting = self._postings[token]
+                posting.positions.pop(doc, None)
+                posting.docs &= ~mask
+                posting.starts &= ~mask
+                if not posting.docs:
+                    del self._postings[token]
+            self._keys[doc] = None
+            self._texts[doc] = ""
+        self._count -= len(ids)
+
+    def _refresh(self) -> None:
+        """Gesorteerd vocabulaire (prefixen) en doc-volgorde (kort eerst) na wijzigingen."""
+        if not self._dirty:
+            return
+        self._vocabulary = sorted(self._postings)
+        live = [doc for doc, key in enumerate(self._keys) if key is not None]
+        self._order = sorted(live, key=lambda doc: (self._lengths[doc], self._keys[doc]))
+        self._dirty = False
+
+    # --- zoeken ---------------------------------------------------------------
+
+    def _expand(self, term: _Term) -> List[_Posting]:
+        if not term.prefix:
+            posting = self._postings.get(term.text)
+            return [posting] if posting is not None else []
+        start = bisect.bisect_left(self._vocabulary, term.text)
+        end = bisect.bisect_left(self._vocabulary, term.text + "\uffff", start)
+        return [self._postings[token] for token in self._vocabulary[start:end]]
+
+    def _idf(self, docs: int, term: _Term) -> float:
+        idf = math.log(1 + self._count / max(1, docs.bit_count()))
+        return idf * (_PREFIX_WEIGHT if term.prefix and term.text not in self._postings else 1.0)
+
+    @staticmethod
+    def _at(postings: List[_Posting], doc: int, position: int) -> bool:
+        return any(position in posting.positions.get(doc, ()) for posting in postings)
+
+    def _phrase_starts(self, expanded: List[List[_Posting]], candidates: int) -> Tuple[int, int]:
+        """(verzen waarin de termen direct na elkaar staan, idem vanaf het begin van het vers)."""
+        found = starts = 0
+        for doc in _members(candidates):
+            first = sorted({p for posting in expanded[0] for p in posting.positions.get(doc, ())})
+            for start in first:
+                if all(self._at(postings, doc, start + offset) for offset, postings in enumerate(expanded[1:], 1)):
+                    found |= 1 << doc
+                    if start == 0:
+                        starts |= 1 << doc
+                    break
+        return found, starts
+
+    def _clause(self, terms: List[_Term], candidates: Optional[int]) -> Tuple[int, int, float, List[List[_Posting]]]:
+        """(verzen, verzen die ermee beginnen, gewicht, uitbreidingen) voor één woord of frase."""
+        expanded = [self._expand(term) for term in terms]
+        weight = 0.0
+        docs = -1 if candidates is None else candidates
+        for term, postings in zip(terms, expanded):
+            term_docs = 0
+            for posting in postings:
+                term_docs |= posting.docs
+            weight += self._idf(term_docs, term)
+            docs &= term_docs
+        if docs <= 0:
+            return 0, 0, 0.0, expanded
+        if len(terms) == 1:
+            starts = 0
+            for posting in expanded[0]:
+                starts |= posting.starts
+            return docs, starts & docs, weight, expanded
+        docs, starts = self._phrase_starts(expanded, docs)
+        return docs, starts, weight, expanded
+
+    def _best(self, bits: int, limit: int) -> List[int]:
+        """De `limit` kortste verzen uit een bitset, zonder de hele set te sorteren."""
+        if bits.bit_count() <= 4 * limit:
+            return sorted(_members(bits), key=lambda doc: (self._lengths[doc], self._keys[doc]))[:limit]
+        best: List[int] = []
+        for doc in self._order:
+            if bits >> doc & 1:
+                best.append(doc)
+                if len(best) == limit:
+                    break
+        return best
+
+    def search(self, query: str, limit: int = 10) -> List[SearchHit]:
+        phrases, words = parse_query(query)
+        if not phrases and not words:
+            return []
+        with self._lock:
+            self._refresh()
+            candidates: Optional[int] = None
+            weight = 0.0
+            incipit = 0
+            word_postings: List[List[_Posting]] = []
+            for clause in phrases + [[word] for word in words]:
+                docs, starts, clause_weight, expanded = self._clause(clause, candidates)
+                if not docs:
+                    return []
+                candidates = docs
+                weight += clause_weight
+                incipit |= starts
+                if len(clause) == 1:
+                    word_postings.append(expanded[0])
+            # Latere clausules kunnen de kandidaten nog verder beperkt hebben.
+            incipit &= candidates
+            phrase = 0
+            if len(words) > 1:
+                phrase, phrase_starts = self._phrase_starts(word_postings, candidates)
+                incipit |= phrase_starts
+
+            # Per bonusklasse de kortste verzen; daaruit de uiteindelijke top.
+            scored = []
+            for klass, bits in enumerate(
+                (candidates & ~incipit & ~phrase, incipit & ~phrase, phrase & ~incipit, phrase & incipit)
+            ):
+                extra = (_INCIPIT_BONUS if klass & 1 else 0.0) + (_PHRASE_BONUS * len(words) if klass & 2 else 0.0)
+                for doc in self._best(bits, limit):
+                    score = (weight + extra) / (1 + 0.01 * self._lengths[doc])
+                    scored.append((-score, self._keys[doc], doc))
+            scored.sort()
+            return [
+                SearchHit(key[0], key[1], round(-negative, 4), self._texts[doc])
+                for negative, key, doc in scored[:limit]
+            ]
@@ -0,0 +1,90 @@
+"""
+In-flight coalescing van identieke upstream-loads ("singleflight").
+
+De eerste aanroeper voor een sleutel voert het werk uit; gelijktijdige aanroepers met
+dezelfde sleutel wachten op diens resultaat of fout. Werkt voor zowel threadpool- als
+async-aanroepers, ook door elkaar: beide wachten op dezelfde concurrent.futures.Future.
+
+Fouten in `leader_only` (bijv. de verstreken deadline van de leider) gaan alleen de leider
+aan: wachtenden krijgen ze niet door, maar doen dan zelf een nieuwe poging.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+from concurrent.futures import Future
+from typing import Awaitable, Callable, Dict, Hashable, Tuple, Type, TypeVar
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    def __init__(self, leader_only: Tuple[Type[BaseException], ...] = ()) -> None:
+        self.leader_only = leader_only
+        self._lock = threading.Lock()
+        self._inflight: Dict[Hashable, Future] = {}
+        self.leaders = 0
+        self.coalesced = 0
+
+    def _join(self, key: Hashable) -> Tuple[Future, bool]:
+        with self._lock:
+            future = self._inflight.get(key)
+            if future is not None:
+                self.coalesced += 1
+                return future, False
+            future = Future()
+            self._inflight[key] = future
+            self.leaders += 1
+            return future, True
+
+    def _finish(self, key: Hashable) -> None:
+        with self._lock:
+            self._inflight.pop(key, None)
+
+    def do(self, key: Hashable, fn: Callable[[], T]) -> T:
+        while True:
+            future, leader = self._join(key)
+            if leader:
+                break
+            try:
+                return future.result()
+            except self.leader_only:
+                continue
+        try:
+            result = fn()
+        except BaseException as exc:
+            # Eerst uit de lijst, zodat een wachtende die opnieuw probeert niet dezelfde fout ophaalt.
+            self._finish(key)
+            future.set_exception(exc)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            self._finish(key)
+
+    async def ado(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        while True:
+            future, leader = self._join(key)
+            if leader:
+                break
+            try:
+                return await asyncio.wrap_future(future)
+            except self.leader_only:
+                continue
+        try:
+            result = await fn()
+        except BaseException as exc:
+            self._finish(key)
+            future.set_exception(exc)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            self._finish(key)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"leaders": self.leaders, "coalesced": self.coalesced, "inflight": len(self._inflight)}
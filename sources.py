@@ -0,0 +1,131 @@
+"""
+Register van bronnen: collecties die de API kan bevragen (psalmen 1773, gezangen 1938, ...).
+
+Elke bron heeft een eigen client (met eigen paginasjabloon en extractie-engine), een eigen
+max-verstabel en een eigen cachepartitie met eigen budget (entries/bytes van de client):
+veel psalmverkeer kan dus geen gezangen uit het geheugen verdringen. Breaker, toelating en
+SQLite-laag zijn wel gedeeld, want alle bronnen wonen op dezelfde host (psalm_client.build_client).
+
+De engine kies je per bron bij `build_client` (voor de gezangen: GEZANGEN_EXTRACTION_ENGINE).
+Zolang er geen eigen gezangen-engine in psalm_extract.ENGINES staat, gebruiken de gezangen de
+psalm-extractor; dat werkt alleen als de pagina's dezelfde versopmaak hebben.
+
+`SourceRegistry.afetch_many` haalt verzoeken voor meerdere bronnen tegelijk op, met een
+begrensde gelijktijdigheid per bron; zo wacht een gezang niet achter een rij psalmen.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+from max_verses import MaxVerseTable
+
+PSALMEN_1773 = "psalmen_1773"
+GEZANGEN_1938 = "gezangen_1938"
+
+
+class UnknownSource(KeyError):
+    """Bron staat niet in het register."""
+
+
+class Source:
+    def __init__(
+        self,
+        name: str,
+        label: str,
+        client,
+        *,
+        count: int,
+        max_verses: Optional[MaxVerseTable] = None,
+        page_url: Optional[Callable[[int], str]] = None,
+    ):
+        self.name = name
+        self.label = label
+        self.client = client
+        self.count = count
+        self.max_verses = max_verses
+        self._page_url = page_url or getattr(client, "page_url", None)
+
+    def check(self, number: int) -> None:
+        if not 1 <= number <= self.count:
+            raise ValueError(f"{self.label} {number} bestaat niet (1 t/m {self.count}).")
+
+    def known_max_vers(self, number: int) -> Optional[int]:
+        return self.max_verses.get(number) if self.max_verses is not None else None
+
+    def url(self, number: int, vers: Optional[int] = None) -> Optional[str]:
+        if self._page_url is None:
+            return None
+        url = self._page_url(number)
+        return f"{url}#{vers}" if vers is not None else url
+
+    async def aget_vers_map(self, number: int) -> Dict[int, str]:
+        self.check(number)
+        return await self.client.aget_vers_map(number)
+
+    def cache_stats(self) -> Dict[str, Dict[str, int]]:
+        return self.client.cache_stats()
+
+    def describe(self) -> Dict[str, object]:
+        memory = self.cache_stats().get("memory", {})
+        return {
+            "naam": self.name,
+            "label": self.label,
+            "aantal": self.count,
+            "max_verses_bekend": len(self.max_verses) if self.max_verses is not None else 0,
+            "cache": {key: memory[key] for key in ("entries", "bytes") if key in memory},
+        }
+
+
+class SourceRegistry:
+    def __init__(self) -> None:
+        self._sources: Dict[str, Source] = {}
+        self.default: Optional[Source] = None
+
+    def register(self, source: Source, *, default: bool = False) -> Source:
+        if source.name in self._sources:
+            raise ValueError(f"Bron {source.name} is al geregistreerd.")
+        self._sources[source.name] = source
+        if default or self.default is None:
+            self.default = source
+        return source
+
+    def get(self, name: str) -> Source:
+        try:
+            return self._sources[name]
+        except KeyError:
+            raise UnknownSource(name) from None
+
+    def names(self) -> List[str]:
+        return list(self._sources)
+
+    def __contains__(self, name: object) -> bool:
+        return name in self._sources
+
+    def __iter__(self) -> Iterator[Source]:
+        return iter(self._sources.values())
+
+    def __len__(self) -> int:
+        return len(self._sources)
+
+    async def afetch_many(
+        self, keys: Iterable[Tuple[str, int]], *, concurrency: int = 4
+    ) -> Dict[Tuple[str, int], Union[Dict[int, str], Exception]]:
+        """
+        Versmappen voor (bron, nummer)-paren, elk paar hooguit één keer, alle bronnen
+        tegelijk. Per paar de versmap of de opgetreden fout (ook UnknownSource/ValueError).
+        """
+        semaphores: Dict[str, asyncio.Semaphore] = {}
+
+        async def fetch(key: Tuple[str, int]) -> Tuple[Tuple[str, int], Union[Dict[int, str], Exception]]:
+            name, number = key
+            try:
+                source = self.get(name)
+                semaphore = semaphores.setdefault(name, asyncio.Semaphore(max(1, concurrency)))
+                async with semaphore:
+                    return key, await source.aget_vers_map(number)
+            except Exception as exc:
+                return key, exc
+
+        return dict(await asyncio.gather(*(fetch(key) for key in dict.fromkeys(keys))))
@@ -0,0 +1,129 @@
+"""
+Persistente cache-laag onder de in-memory TTLCache: één lokaal SQLite-bestand in WAL-modus.
+
+Alle uvicorn-workers delen het bestand en het overleeft herstarts, zodat een deploy niet
+betekent dat elke worker dezelfde psalmen opnieuw van psalmboek.nl moet scrapen.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS verse_maps (
+    berijming TEXT NOT NULL,
+    psalm INTEGER NOT NULL,
+    fetched_at REAL NOT NULL,
+    content_hash TEXT NOT NULL,
+    data TEXT NOT NULL,
+    PRIMARY KEY (berijming, psalm)
+)
+"""
+
+
+def _digest(vers_map: Dict[int, str]) -> str:
+    canonical = json.dumps(sorted(vers_map.items()), ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class HashedVersMap(dict):
+    """
+    Versmap met zijn content_hash, berekend waar de map ontstaat (extractie-thread, -pool of
+    SQLite-rij). Listeners en de SQLite-laag hashen hem dan niet opnieuw op de event loop.
+    Wordt net als elke versmap na het aanmaken niet meer gewijzigd.
+    """
+
+    __slots__ = ("content_hash",)
+
+    def __init__(self, items, digest: str):
+        super().__init__(items)
+        self.content_hash = digest
+
+
+def hashed(vers_map: Dict[int, str]) -> HashedVersMap:
+    return vers_map if isinstance(vers_map, HashedVersMap) else HashedVersMap(vers_map, _digest(vers_map))
+
+
+def content_hash(vers_map: Dict[int, str]) -> str:
+    return vers_map.content_hash if isinstance(vers_map, HashedVersMap) else _digest(vers_map)
+
+
+class SqliteVerseCache:
+    def __init__(self, path: str, *, busy_timeout_ms: int = 5000):
+        self.path = path
+        self.busy_timeout_ms = busy_timeout_ms
+        # sqlite3-connecties horen bij één thread; elke thread krijgt er een eigen.
+        self._local = threading.local()
+        self._stats_lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self._conn()
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=self.busy_timeout_ms / 1000, isolation_level=None)
+            conn.execute(f"PRAGMA busy_timeout={int(self.busy_timeout_ms)}")
+            self._setup(conn)
+            self._local.conn = conn
+        return conn
+
+    def _setup(self, conn: sqlite3.Connection) -> None:
+        # Het omzetten naar WAL op een vers bestand negeert de busy-handler als meerdere
+        # processen tegelijk starten; daarom hier zelf kort opnieuw proberen.
+        deadline = time.monotonic() + self.busy_timeout_ms / 1000
+        while True:
+            try:
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.execute("PRAGMA synchronous=NORMAL")
+                conn.execute(_SCHEMA)
+                return
+            except sqlite3.OperationalError as exc:
+                if "locked" not in str(exc) or time.monotonic() > deadline:
+                    raise
+                time.sleep(0.01)
+
+    def _count(self, field: str) -> None:
+        with self._stats_lock:
+            setattr(self, field, getattr(self, field) + 1)
+
+    def get(self, berijming: str, psalm: int) -> Optional[Tuple[Dict[int, str], float, str]]:
+        """Geeft (versmap, fetched_at, content_hash) of None."""
+        row = self._conn().execute(
+            "SELECT data, fetched_at, content_hash FROM verse_maps WHERE berijming = ? AND psalm = ?",
+            (berijming, psalm),
+        ).fetchone()
+        if row is None:
+            self._count("misses")
+            return None
+        self._count("hits")
+        data, fetched_at, digest = row
+        return HashedVersMap(((int(vers), text) for vers, text in json.loads(data)), digest), fetched_at, digest
+
+    def put(self, berijming: str, psalm: int, vers_map: Dict[int, str], fetched_at: Optional[float] = None) -> str:
+        digest = content_hash(vers_map)
+        data = json.dumps(sorted(vers_map.items()), ensure_ascii=False, separators=(",", ":"))
+        self._conn().execute(
+            "INSERT INTO verse_maps (berijming, psalm, fetched_at, content_hash, data) VALUES (?, ?, ?, ?, ?) "
+            "ON CONFLICT (berijming, psalm) DO UPDATE SET "
+            "fetched_at = excluded.fetched_at, content_hash = excluded.content_hash, data = excluded.data",
+            (berijming, psalm, time.time() if fetched_at is None else fetched_at, digest, data),
+        )
+        self._count("writes")
+        return digest
+
+    def close(self) -> None:
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+    def stats(self) -> Dict[str, int]:
+        with self._stats_lock:
+            return {"hits": self.hits, "misses": self.misses, "writes": self.writes}
@@ -0,0 +1,275 @@
+"""
+Versteksten uit nl_Statenvertaling.txt voor de scripture_refs van pastoral_duiding_reformed.
+
+Het tekstbestand wordt één keer memory-mapped en in één regex-pass geïndexeerd: per
+(boek, hoofdstuk) een array met (begin, eind)-offsets van elk vers in de mmap. Een citaat
+ophalen is daarna een dict-lookup plus een slice van de mmap; het bestand wordt nooit
+opnieuw doorlopen en de teksten staan niet als losse strings in het geheugen.
+
+Ondersteunde regelvormen (UTF-8, één vers per regel):
+
+    Johannes 3:16 Want alzo lief heeft God de wereld gehad, ...
+
+of een boeknaam op een eigen regel, gevolgd door regels zonder boek:
+
+    Psalmen
+    23:1 Een psalm van David. De HEERE is mijn Herder, ...
+
+Overige regels (titels, lege regels) worden overgeslagen. Boeknamen in het bestand en in
+verwijzingen worden via dezelfde aliastabel herkend ("Joh.", "Joh", "Johannes"), hoofdletter-,
+punt-, spatie- en diakriet-ongevoelig.
+"""
+
+from __future__ import annotations
+
+import mmap
+import os
+import pathlib
+import re
+from array import array
+from functools import lru_cache
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from search_index import normalize
+
+DATA_DIR = pathlib.Path(__file__).resolve().parent / "data"
+DEFAULT_PATH = DATA_DIR / "nl_Statenvertaling.txt"
+# Bovengrens per verwijzing, zodat één ref geen half boek terugstuurt (Psalm 119 past).
+MAX_VERSES_PER_REF = 200
+
+# Canonieke naam (zoals de Statenvertaling ze noemt) en gangbare afkortingen.
+BOOKS: Tuple[Tuple[str, Tuple[str, ...]], ...] = (
+    ("Genesis", ("Gen", "Gn")),
+    ("Exodus", ("Ex", "Exod")),
+    ("Leviticus", ("Lev", "Lv")),
+    ("Numeri", ("Num", "Nu")),
+    ("Deuteronomium", ("Deut", "Dt")),
+    ("Jozua", ("Joz",)),
+    ("Richteren", ("Richt", "Re", "Rechters")),
+    ("Ruth", ("Ru",)),
+    ("1 Samuël", ("1 Sam", "1 Sm")),
+    ("2 Samuël", ("2 Sam", "2 Sm")),
+    ("1 Koningen", ("1 Kon", "1 Kn")),
+    ("2 Koningen", ("2 Kon", "2 Kn")),
+    ("1 Kronieken", ("1 Kron", "1 Kr")),
+    ("2 Kronieken", ("2 Kron", "2 Kr")),
+    ("Ezra", ("Ezr",)),
+    ("Nehemia", ("Neh",)),
+    ("Esther", ("Est", "Ester")),
+    ("Job", ()),
+    ("Psalmen", ("Psalm", "Ps", "Psa")),
+    ("Spreuken", ("Spr",)),
+    ("Prediker", ("Pred",)),
+    ("Hooglied", ("Hoogl", "Hl")),
+    ("Jesaja", ("Jes",)),
+    ("Jeremia", ("Jer",)),
+    ("Klaagliederen", ("Klaagl", "Kl")),
+    ("Ezechiël", ("Ez", "Ezech")),
+    ("Daniël", ("Dan",)),
+    ("Hosea", ("Hos",)),
+    ("Joël", ("Jl",)),
+    ("Amos", ("Am",)),
+    ("Obadja", ("Ob",)),
+    ("Jona", ("Jon",)),
+    ("Micha", ("Mi", "Mich")),
+    ("Nahum", ("Nah",)),
+    ("Habakuk", ("Hab",)),
+    ("Sefanja", ("Sef",)),
+    ("Haggaï", ("Hag",)),
+    ("Zacharia", ("Zach",)),
+    ("Maleachi", ("Mal",)),
+    ("Mattheüs", ("Matt", "Mat", "Mt", "Matteüs")),
+    ("Markus", ("Mark", "Mk", "Marcus", "Mc")),
+    ("Lukas", ("Luk", "Lk", "Lucas", "Lc")),
+    ("Johannes", ("Joh", "Jh")),
+    ("Handelingen", ("Hand", "Hnd")),
+    ("Romeinen", ("Rom",)),
+    ("1 Korinthe", ("1 Kor", "1 Korintiërs", "1 Korinthiërs")),
+    ("2 Korinthe", ("2 Kor", "2 Korintiërs", "2 Korinthiërs")),
+    ("Galaten", ("Gal",)),
+    ("Efeze", ("Ef", "Efeziërs")),
+    ("Filippenzen", ("Fil", "Filippensen")),
+    ("Kolossenzen", ("Kol", "Kolossensen")),
+    ("1 Thessalonicenzen", ("1 Thess", "1 Tess", "1 Tessalonicenzen")),
+    ("2 Thessalonicenzen", ("2 Thess", "2 Tess", "2 Tessalonicenzen")),
+    ("1 Timotheüs", ("1 Tim",)),
+    ("2 Timotheüs", ("2 Tim",)),
+    ("Titus", ("Tit",)),
+    ("Filemon", ("Filem", "Flm")),
+    ("Hebreeën", ("Hebr", "Heb")),
+    ("Jakobus", ("Jak", "Jk")),
+    ("1 Petrus", ("1 Petr", "1 Pe")),
+    ("2 Petrus", ("2 Petr", "2 Pe")),
+    ("1 Johannes", ("1 Joh",)),
+    ("2 Johannes", ("2 Joh",)),
+    ("3 Johannes", ("3 Joh",)),
+    ("Judas", ("Jud",)),
+    ("Openbaring", ("Openb", "Op", "Apk", "Apocalyps")),
+)
+
+# Een boeknaam: optioneel een volgnummer ("1 Johannes"), dan een letter en verder geen cijfers of ':'.
+_BOOK = rb"(?:\d[ \t]*)?[^\W\d_][^\r\n\d:]*?"
+_LINE = re.compile(
+    rb"^[ \t]*(?:(?P<book>" + _BOOK + rb")[ \t]+)?(?P<chapter>\d+):(?P<verse>\d+)[ \t]+"
+    rb"(?P<text>[^\r\n]*[^\s])[ \t]*\r?$"
+    rb"|^[ \t]*(?P<header>" + _BOOK + rb")[ \t]*\r?$",
+    re.M,
+)
+_REF = re.compile(
+    r"^\s*(?P<book>(?:[1-3]\s*)?[^\d:]+?)\s*(?P<chapter>\d+)\s*:\s*(?P<start>\d+)(?:\s*-\s*(?P<end>\d+))?\s*$"
+)
+_REF_FORMAT = "Verwacht 'Boek hoofdstuk:vers' of 'Boek hoofdstuk:vers-vers'."
+_ALIAS_STRIP = re.compile(r"[\s.]+")
+
+
+def alias_key(name: str) -> str:
+    """'1 Joh.' → '1joh'; zo matchen schrijfwijzen met/zonder punt, spaties en trema's."""
+    return _ALIAS_STRIP.sub("", normalize(name))
+
+
+@lru_cache(maxsize=4096)
+def _cached_alias_key(name: str) -> str:
+    return alias_key(name)
+
+
+class ResolvedRef(NamedTuple):
+    status: str  # ok | invalid_ref | not_found
+    ref: str
+    book: Optional[str] = None
+    chapter: Optional[int] = None
+    verses: Tuple[Tuple[int, str], ...] = ()
+    message: Optional[str] = None
+
+    def to_dict(self) -> Dict[str, object]:
+        payload: Dict[str, object] = {"ref": self.ref, "status": self.status}
+        if self.book is not None:
+            payload.update(book=self.book, chapter=self.chapter)
+        if self.status == "ok":
+            first, last = self.verses[0][0], self.verses[-1][0]
+            span = f"{first}" if first == last else f"{first}-{last}"
+            payload["citation"] = f"{self.book} {self.chapter}:{span}"
+            payload["verses"] = [{"verse": verse, "text": text} for verse, text in self.verses]
+        if self.message is not None:
+            payload["message"] = self.message
+        return payload
+
+
+class StatenvertalingIndex:
+    def __init__(self, path: os.PathLike):
+        self.path = str(path)
+        with open(path, "rb") as fh:
+            self._mm = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) if os.fstat(fh.fileno()).st_size else b""
+        self.books: List[str] = []
+        self._aliases: Dict[str, int] = {}
+        for name, aliases in BOOKS:
+            self._register(name, aliases)
+        # (boek, hoofdstuk) → [begin1, eind1, begin2, eind2, ...]; vers v op index 2(v-1); eind 0 = ontbreekt.
+        self._chapters: Dict[Tuple[int, int], array] = {}
+        self.verse_count = 0
+        self._build()
+
+    def _register(self, name: str, aliases: Tuple[str, ...] = ()) -> int:
+        book = len(self.books)
+        self.books.append(name)
+        for alias in (name, *aliases):
+            self._aliases.setdefault(alias_key(alias), book)
+        return book
+
+    def book(self, name: str) -> Optional[int]:
+        return self._aliases.get(_cached_alias_key(name))
+
+    def _file_book(self, raw: bytes, seen: Dict[bytes, Optional[int]], register: bool) -> Optional[int]:
+        if raw not in seen:
+            name = raw.decode("utf-8", "replace").strip()
+            book = self.book(name)
+            # Een boeknaam vóór hoofdstuk:vers die we niet kennen is toch een boek (eigen bestand).
+            seen[raw] = book if book is not None or not register else self._register(name)
+        return seen[raw]
+
+    def _build(self) -> None:
+        seen: Dict[bytes, Optional[int]] = {}
+        headers: Dict[bytes, Optional[int]] = {}
+        current: Optional[int] = None
+        chapters = self._chapters
+        for match in _LINE.finditer(self._mm):
+            header = match.group("header")
+            if header is not None:
+                # Alleen een bekende boeknaam opent een nieuw boek; andere tekstregels negeren.
+                book = self._file_book(header, headers, register=False)
+                if book is not None:
+                    current = book
+                continue
+            raw_book = match.group("book")
+            book = self._file_book(raw_book, seen, register=True) if raw_book else current
+            if book is None:
+                continue
+            current = book
+            chapter, verse = int(match.group("chapter")), int(match.group("verse"))
+            if verse < 1:
+                continue
+            offsets = chapters.get((book, chapter))
+            if offsets is None:
+                offsets = chapters[(book, chapter)] = array("I")
+            missing = 2 * verse - len(offsets)
+            if missing > 0:
+                offsets.extend([0] * missing)
+            elif offsets[2 * verse - 1]:
+                continue  # dubbel vers: het eerste telt
+            offsets[2 * verse - 2] = match.start("text")
+            offsets[2 * verse - 1] = match.end("text")
+            self.verse_count += 1
+
+    def __len__(self) -> int:
+        return self.verse_count
+
+    def close(self) -> None:
+        if isinstance(self._mm, mmap.mmap):
+            self._mm.close()
+
+    def verse(self, book: int, chapter: int, verse: int) -> Optional[str]:
+        offsets = self._chapters.get((book, chapter))
+        index = 2 * verse - 1
+        if offsets is None or verse < 1 or index >= len(offsets) or not offsets[index]:
+            return None
+        return self._mm[offsets[index - 1] : offsets[index]].decode("utf-8")
+
+    def resolve(self, ref: str) -> ResolvedRef:
+        parsed = parse_ref(ref)
+        if parsed is None:
+            return ResolvedRef("invalid_ref", ref, message=_REF_FORMAT)
+        name, chapter, start, end = parsed
+        book = self.book(name)
+        if book is None:
+            return ResolvedRef("invalid_ref", ref, message=f"Onbekend bijbelboek: {name}")
+        if end < start:
+            return ResolvedRef("invalid_ref", ref, message=f"Ongeldig bereik: {start}-{end}")
+        if end - start + 1 > MAX_VERSES_PER_REF:
+            return ResolvedRef("invalid_ref", ref, message=f"Hooguit {MAX_VERSES_PER_REF} verzen per verwijzing.")
+        canonical = self.books[book]
+        verses = []
+        for verse in range(start, end + 1):
+            text = self.verse(book, chapter, verse)
+            if text is None:
+                message = f"{canonical} {chapter}:{verse} niet gevonden."
+                return ResolvedRef("not_found", ref, canonical, chapter, message=message)
+            verses.append((verse, text))
+        return ResolvedRef("ok", ref, canonical, chapter, tuple(verses))
+
+
+@lru_cache(maxsize=4096)
+def parse_ref(ref: str) -> Optional[Tuple[str, int, int, int]]:
+    """'Joh. 3:16-18' → ('Joh.', 3, 16, 18); None als het geen hoofdstuk:vers-verwijzing is."""
+    match = _REF.match(ref)
+    if match is None:
+        return None
+    start = int(match.group("start"))
+    end = int(match.group("end")) if match.group("end") else start
+    return match.group("book").strip(), int(match.group("chapter")), start, end
+
+
+def open_statenvertaling(path: Optional[os.PathLike] = None) -> Optional[StatenvertalingIndex]:
+    """Indexeert het tekstbestand (standaard data/nl_Statenvertaling.txt); None als het ontbreekt."""
+    path = pathlib.Path(path) if path else DEFAULT_PATH
+    if not path.exists():
+        return None
+    return StatenvertalingIndex(path)
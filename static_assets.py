@@ -0,0 +1,97 @@
+"""
+Vaste plugin-bestanden (openapi.yaml, ai-plugin.json, logo.svg) als kant-en-klare responses.
+
+Body, ETag en headers worden één keer bij het importeren berekend, plus gzip- (en, als het
+pakket `brotli` geïnstalleerd is, br-)varianten. Per request rest dan alleen de keuze van de
+variant op basis van Accept-Encoding, of een 304 als If-None-Match de ETag van die variant al
+noemt. Elke codering heeft een eigen sterke ETag (RFC 9110 §8.8.3), zodat caches de bodies niet
+verwisselen. Een gecomprimeerde variant die niet kleiner is dan het origineel wordt niet aangeboden.
+"""
+
+from __future__ import annotations
+
+import gzip
+import hashlib
+from typing import Dict, List, Optional, Union
+
+from fastapi.responses import Response
+
+from http_cache import etag_matches
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optioneel; gzip is er altijd
+    brotli = None
+
+# Voorkeursvolgorde bij gelijke q-waarde.
+_PREFERENCE = ("br", "gzip")
+
+
+def accepted_encodings(accept_encoding: Optional[str]) -> List[str]:
+    """Coderingen die de client accepteert (q > 0), in volgorde van q-waarde."""
+    if not accept_encoding:
+        return []
+    weighted = []
+    for part in accept_encoding.split(","):
+        coding, _, params = part.strip().partition(";")
+        quality = 1.0
+        for param in params.split(";"):
+            name, _, value = param.strip().partition("=")
+            if name == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        coding = coding.strip().lower()
+        if coding and quality > 0:
+            weighted.append((-quality, coding))
+    weighted.sort(key=lambda item: (item[0], _PREFERENCE.index(item[1]) if item[1] in _PREFERENCE else 99))
+    return [coding for _, coding in weighted]
+
+
+class StaticAsset:
+    def __init__(self, content: Union[str, bytes], media_type: str, *, max_age: int = 3600):
+        body = content.encode("utf-8") if isinstance(content, str) else content
+        self.media_type = media_type
+        digest = hashlib.blake2b(body, digest_size=16).hexdigest()
+        self.bodies: Dict[str, bytes] = {"identity": body}
+        compressed = {"gzip": gzip.compress(body, compresslevel=9, mtime=0)}
+        if brotli is not None:
+            compressed["br"] = brotli.compress(body, quality=11)
+        for coding, data in compressed.items():
+            if len(data) < len(body):
+                self.bodies[coding] = data
+        self.etags: Dict[str, str] = {
+            coding: f'"{digest}"' if coding == "identity" else f'"{digest}-{coding}"' for coding in self.bodies
+        }
+        base = {
+            "Cache-Control": f"public, max-age={max_age}" if max_age > 0 else "no-cache",
+            "Vary": "Accept-Encoding",
+        }
+        # 304's krijgen de validators van de variant, zonder Content-Encoding.
+        self.not_modified_headers: Dict[str, Dict[str, str]] = {
+            coding: {**base, "ETag": etag} for coding, etag in self.etags.items()
+        }
+        self.headers: Dict[str, Dict[str, str]] = {
+            coding: headers if coding == "identity" else {**headers, "Content-Encoding": coding}
+            for coding, headers in self.not_modified_headers.items()
+        }
+
+    @property
+    def etag(self) -> str:
+        """ETag van de ongecomprimeerde variant."""
+        return self.etags["identity"]
+
+    def encoding(self, accept_encoding: Optional[str]) -> str:
+        for coding in accepted_encodings(accept_encoding):
+            if coding in self.bodies:
+                return coding
+            if coding == "*":
+                return next((c for c in _PREFERENCE if c in self.bodies), "identity")
+        return "identity"
+
+    def response(self, accept_encoding: Optional[str] = None, if_none_match: Optional[str] = None) -> Response:
+        coding = self.encoding(accept_encoding)
+        if etag_matches(if_none_match, self.etags[coding]):
+            return Response(status_code=304, headers=self.not_modified_headers[coding])
+        return Response(content=self.bodies[coding], media_type=self.media_type, headers=self.headers[coding])
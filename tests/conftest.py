@@ -0,0 +1,21 @@
+import pathlib
+import sys
+
+import pytest
+
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+try:
+    import main
+    from response_cache import ResponseCache
+except ImportError:  # pragma: no cover - allows skipping when deps ontbreken
+    main = None  # type: ignore[assignment]
+
+
+@pytest.fixture(autouse=True)
+def fresh_response_cache(monkeypatch):
+    """Tests vervangen client-methodes; een antwoord uit een eerdere test mag niet blijven hangen."""
+    if main is not None:
+        monkeypatch.setattr(main, "response_cache", ResponseCache(600))
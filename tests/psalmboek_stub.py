@@ -0,0 +1,153 @@
+"""
+Lokale stand-in voor psalmboek.nl: serveert psalmen.php-pagina's en telt requests.
+
+Kan latency (vast + jitter), 5xx-fouten en 403's injecteren voor tests en benchmarks;
+de kansen worden per request getrokken uit een eigen, seedbare random-generator.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import pathlib
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, Optional
+from urllib.parse import parse_qs, urlparse
+
+
+def render_page(verses: Dict[int, str]) -> str:
+    body = "".join(
+        f'<p><strong><a name="{num}">Vers {num}</a></strong><br />' + "<br />".join(text.split("\n")) + "</p>"
+        for num, text in verses.items()
+    )
+    return f'<html><body><div id="psalmkolom2">{body}</div></body></html>'
+
+
+def default_page(psalm: int) -> str:
+    return render_page({vers: f"Psalm {psalm} vers {vers} regel een\nregel twee" for vers in range(1, 7)})
+
+
+FIXTURES = pathlib.Path(__file__).resolve().parent / "fixtures"
+
+
+def fixture_pages(fallback: Callable[[int], str] = default_page) -> Callable[[int], str]:
+    """Opgenomen pagina's uit tests/fixtures (psalmen_<n>.html), anders `fallback`."""
+    recorded = {
+        int(path.stem.split("_")[1]): path.read_text(encoding="utf-8")
+        for path in FIXTURES.glob("psalmen_*.html")
+        if path.stem.split("_")[1].isdigit()
+    }
+    return lambda psalm: recorded.get(psalm) or fallback(psalm)
+
+
+class _Server(ThreadingHTTPServer):
+    # De standaard-backlog van 5 laat bij veel gelijktijdige verbindingen SYN's vallen (1s retry).
+    request_queue_size = 128
+    daemon_threads = True
+
+
+class PsalmboekStub:
+    def __init__(
+        self,
+        pages: Optional[Callable[[int], str]] = None,
+        delay: float = 0.0,
+        *,
+        jitter: float = 0.0,
+        error_rate: float = 0.0,
+        forbidden_rate: float = 0.0,
+        seed: Optional[int] = None,
+        validators: bool = False,
+    ):
+        self.pages = pages or default_page
+        self.delay = delay
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.forbidden_rate = forbidden_rate
+        self._random = random.Random(seed)
+        # Met validators=True stuurt de stub ETag/Last-Modified mee en beantwoordt hij
+        # If-None-Match met 304, zoals een webserver met statische pagina's.
+        self.validators = validators
+        self.requests: Dict[int, int] = {}
+        self.statuses: Dict[int, int] = {}
+        self._lock = threading.Lock()
+        self._server = _Server(("127.0.0.1", 0), self._handler())
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def request_count(self) -> int:
+        with self._lock:
+            return sum(self.requests.values())
+
+    def reset_counts(self) -> None:
+        with self._lock:
+            self.requests.clear()
+            self.statuses.clear()
+
+    def _draw(self) -> "tuple[float, int]":
+        """(vertraging, status) voor één request."""
+        with self._lock:
+            delay = self.delay + (self._random.uniform(0, self.jitter) if self.jitter else 0.0)
+            roll = self._random.random()
+        if roll < self.forbidden_rate:
+            return delay, 403
+        if roll < self.forbidden_rate + self.error_rate:
+            return delay, 503
+        return delay, 200
+
+    def __enter__(self) -> "PsalmboekStub":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def _handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args) -> None:  # stil in tests
+                pass
+
+            def do_GET(self) -> None:
+                url = urlparse(self.path)
+                if url.path != "/psalmen.php":
+                    self.send_error(404)
+                    return
+                psalm = int(parse_qs(url.query).get("psalm", ["0"])[0])
+                delay, status = stub._draw()
+                with stub._lock:
+                    stub.requests[psalm] = stub.requests.get(psalm, 0) + 1
+                    stub.statuses[status] = stub.statuses.get(status, 0) + 1
+                if delay:
+                    time.sleep(delay)
+                if status != 200:
+                    self.send_error(status)
+                    return
+                body = stub.pages(psalm).encode("utf-8")
+                etag = f'"{hashlib.sha1(body).hexdigest()}"'
+                if stub.validators and self.headers.get("If-None-Match") == etag:
+                    with stub._lock:
+                        stub.statuses[200] -= 1
+                        stub.statuses[304] = stub.statuses.get(304, 0) + 1
+                    self.send_response(304)
+                    self.send_header("ETag", etag)
+                    self.end_headers()
+                    return
+                self.send_response(200)
+                if stub.validators:
+                    self.send_header("ETag", etag)
+                    self.send_header("Last-Modified", "Mon, 01 Jan 1773 00:00:00 GMT")
+                self.send_header("Content-Type", "text/html; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        return Handler
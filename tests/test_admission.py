@@ -0,0 +1,175 @@
+import asyncio
+import pathlib
+import sys
+import threading
+
+import pytest
+
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+TESTS = pathlib.Path(__file__).resolve().parent
+if str(TESTS) not in sys.path:
+    sys.path.insert(0, str(TESTS))
+
+from admission import CLIENT, Admission, ClientLimiter, ConcurrencyLimiter, Rejected, TokenBucket  # noqa: E402
+from resilience import LatencyTracker, deadline  # noqa: E402
+
+try:
+    from fastapi.testclient import TestClient
+    from psalm_client import PsalmboekClient
+
+    import main
+except ImportError:  # pragma: no cover - allows skipping when deps ontbreken
+    TestClient = None  # type: ignore[assignment]
+
+
+def test_token_bucket_allows_burst_then_reports_wait():
+    bucket = TokenBucket(rate=2.0, burst=2, now=0.0)
+    assert bucket.take(0.0) == 0 and bucket.take(0.0) == 0
+    assert bucket.take(0.0) == pytest.approx(0.5)
+    assert bucket.take(0.5) == 0
+
+
+def test_client_limiter_is_per_client_and_bounded():
+    limiter = ClientLimiter(rate=0.001, burst=1, max_clients=2)
+    assert limiter.take("ip:a") == 0
+    assert limiter.take("ip:a") > 0
+    assert limiter.take("ip:b") == 0
+    limiter.take("ip:c")
+    assert len(limiter) == 2
+
+
+def test_async_waiters_are_served_in_order_and_time_out():
+    limiter = ConcurrencyLimiter(1, max_queue=1)
+
+    async def scenario():
+        await limiter.aacquire(1.0)
+        waiting = asyncio.create_task(limiter.aacquire(1.0))
+        await asyncio.sleep(0)
+        assert limiter.queued == 1
+        with pytest.raises(Rejected) as full:
+            await limiter.aacquire(1.0)
+        assert (full.value.status_code, full.value.reason) == (503, "queue_full")
+
+        limiter.release()
+        await waiting
+        assert (limiter.active, limiter.queued) == (1, 0)
+        with pytest.raises(Rejected) as slow:
+            await limiter.aacquire(0.01)
+        assert slow.value.reason == "queue_timeout"
+        limiter.release()
+        assert limiter.active == 0
+
+    asyncio.run(scenario())
+
+
+def test_sync_acquire_waits_for_release_from_other_thread():
+    limiter = ConcurrencyLimiter(1)
+    limiter.acquire(1.0)
+    threading.Timer(0.05, limiter.release).start()
+    limiter.acquire(1.0)
+    assert limiter.active == 1
+    with pytest.raises(Rejected):
+        limiter.acquire(0.01)
+
+
+def test_predicted_wait_beyond_request_budget_is_shed_immediately():
+    latency = LatencyTracker(min_samples=1)
+    latency.observe(2.0)
+    admission = Admission(ConcurrencyLimiter(1), latency=latency)
+
+    async def scenario():
+        async with admission.aslot():
+            with deadline(0.5), pytest.raises(Rejected) as shed:
+                async with admission.aslot():
+                    pass
+        return shed.value
+
+    shed = asyncio.run(scenario())
+    assert shed.reason == "predicted_wait"
+    assert shed.headers == {"Retry-After": "2", "Cache-Control": "no-store"}
+    assert admission.stats()["predicted_wait"] == 1
+
+
+@pytest.mark.skipif(TestClient is None, reason="fastapi niet geïnstalleerd")
+def test_rate_limit_applies_to_upstream_misses_only():
+    from psalmboek_stub import PsalmboekStub
+
+    with PsalmboekStub() as stub:
+        admission = Admission(clients=ClientLimiter(0.001, 1))
+        client = PsalmboekClient(stub.base_url, "1773", cache_seconds=600, admission=admission)
+        token = CLIENT.set("ip:crawler")
+        try:
+            asyncio.run(client.aget_vers_map(23))
+            with pytest.raises(Rejected) as limited:
+                asyncio.run(client.aget_vers_map(42))
+            # Cache-hits en achtergrondwerk zonder client blijven werken.
+            for _ in range(5):
+                asyncio.run(client.aget_vers_map(23))
+        finally:
+            CLIENT.reset(token)
+        asyncio.run(client.aget_vers_map(42))
+    assert limited.value.status_code == 429
+    assert stub.request_count == 2
+
+
+@pytest.mark.skipif(TestClient is None, reason="fastapi niet geïnstalleerd")
+def test_lookup_returns_429_with_retry_after(monkeypatch):
+    from psalmboek_stub import PsalmboekStub
+
+    with PsalmboekStub() as stub:
+        admission = Admission(clients=ClientLimiter(0.1, 1))
+        client = PsalmboekClient(stub.base_url, "1773", cache_seconds=600, admission=admission)
+        monkeypatch.setattr(main, "client", client)
+        monkeypatch.setattr(main, "max_verses", None)
+        http = TestClient(main.app)
+        assert http.get("/api/psalm/lookup", params={"query": "psalm 23:1"}).status_code == 200
+        response = http.get("/api/psalm/lookup", params={"query": "psalm 42:1"})
+        assert http.get("/api/psalm/lookup", params={"query": "psalm 23:2"}).status_code == 200
+
+    assert response.status_code == 429
+    assert response.headers["Retry-After"] == "10"
+    assert response.headers["Cache-Control"] == "no-store"
+    assert response.json()["status"] == "verification_failed"
+    assert admission.stats()["rate_limited"] == 1
+
+
+def _request(host, headers=(), path="/api/psalm/lookup"):
+    from starlette.requests import Request
+
+    scope = {
+        "type": "http",
+        "method": "GET",
+        "scheme": "http",
+        "server": ("psalm.test", 80),
+        "path": path,
+        "query_string": b"",
+        "headers": [(name.lower().encode(), value.encode()) for name, value in headers],
+        "client": (host, 50000),
+    }
+    return Request(scope)
+
+
+@pytest.mark.skipif(TestClient is None, reason="fastapi niet geïnstalleerd")
+def test_client_key_only_trusts_known_keys_and_own_proxies(monkeypatch):
+    from config import settings
+
+    monkeypatch.setattr(settings, "CLIENT_API_KEYS", "sleutel-a, sleutel-b")
+    monkeypatch.setattr(settings, "TRUSTED_PROXIES", "172.18.0.2")
+
+    # Een willekeurige key per verzoek levert geen eigen bucket op.
+    assert main._client_key(_request("203.0.113.9", [("X-API-Key", "random-1")])) == "ip:203.0.113.9"
+    assert main._client_key(_request("203.0.113.9", [("X-API-Key", "sleutel-a")])).startswith("key:")
+    # Achter de proxy: het laatste adres vóór de proxy, niet wat de client links invult.
+    forwarded = [("X-Forwarded-For", "1.2.3.4, 198.51.100.7")]
+    assert main._client_key(_request("172.18.0.2", forwarded)) == "ip:198.51.100.7"
+    # Niet van een vertrouwde proxy: de header wordt genegeerd.
+    assert main._client_key(_request("203.0.113.9", forwarded)) == "ip:203.0.113.9"
+    assert main._client_key(_request("172.18.0.2", path="/healthz")) is None
+
+
+def test_client_limiter_is_off_by_default():
+    from config import Settings
+
+    assert Settings().CLIENT_MISS_RATE == 0
@@ -0,0 +1,123 @@
+import pathlib
+import sys
+import threading
+
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from cache import TTLCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_ttl_and_stale_window():
+    clock = FakeClock()
+    cache = TTLCache(10, max_stale=5, clock=clock)
+    cache.set("a", 1)
+
+    assert cache.get("a") == (1, True)
+    clock.now += 12
+    assert cache.get("a") == (1, False)
+    clock.now += 4
+    assert cache.get("a") is None
+    assert "a" not in cache
+    assert cache.stats()["stale_hits"] == 1
+
+
+def test_lru_eviction_by_entries_and_bytes():
+    cache = TTLCache(60, max_entries=2, max_bytes=100, sizeof=len)
+    cache.set("a", "x" * 10)
+    cache.set("b", "x" * 10)
+    cache.get("a")
+    cache.set("c", "x" * 10)
+
+    assert "b" not in cache and "a" in cache and "c" in cache
+
+    cache.set("d", "x" * 95)
+    assert len(cache) == 1 and "d" in cache
+    cache.set("huge", "x" * 500)
+    assert "huge" not in cache
+    assert cache.stats()["evictions"] == 3
+    assert cache.stats()["bytes"] == 95
+
+
+def test_disabled_when_ttl_zero():
+    cache = TTLCache(0)
+    cache.set("a", 1)
+    assert cache.get("a") is None
+
+
+def test_touch_refreshes_entry():
+    clock = FakeClock()
+    cache = TTLCache(10, clock=clock)
+    cache.set("a", 1)
+    clock.now += 9
+    assert cache.touch("a")
+    clock.now += 9
+    assert cache.get("a") == (1, True)
+
+
+def test_concurrent_access_keeps_budget():
+    cache = TTLCache(60, max_entries=50, max_bytes=10_000, sizeof=len)
+
+    def worker(offset):
+        for i in range(2000):
+            cache.set((offset, i % 200), "x" * 40)
+            cache.get((offset, (i * 7) % 200))
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    stats = cache.stats()
+    assert stats["entries"] <= 50
+    assert stats["bytes"] == 40 * stats["entries"]
+
+
+def _hammer_sqlite(path, worker):
+    from sqlite_cache import SqliteVerseCache
+
+    cache = SqliteVerseCache(path)
+    for round_ in range(5):
+        for psalm in range(1, 41):
+            cache.put("1773", psalm, {vers: f"psalm {psalm} vers {vers} ronde {round_}" for vers in range(1, 9)})
+            cache.get("1773", (psalm * 7 + worker) % 40 + 1)
+    cache.close()
+
+
+def test_sqlite_cache_concurrent_writers_across_processes(tmp_path):
+    import multiprocessing
+    import sqlite3
+
+    from sqlite_cache import content_hash
+
+    path = str(tmp_path / "verzen.sqlite")
+    ctx = multiprocessing.get_context("spawn")
+    workers = [ctx.Process(target=_hammer_sqlite, args=(path, n)) for n in range(4)]
+    for proc in workers:
+        proc.start()
+    for proc in workers:
+        proc.join(60)
+    assert [proc.exitcode for proc in workers] == [0, 0, 0, 0]
+
+    conn = sqlite3.connect(path)
+    assert conn.execute("PRAGMA integrity_check").fetchone()[0] == "ok"
+    assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    conn.close()
+
+    from sqlite_cache import SqliteVerseCache
+
+    cache = SqliteVerseCache(path)
+    for psalm in range(1, 41):
+        vers_map, _, digest = cache.get("1773", psalm)
+        assert sorted(vers_map) == list(range(1, 9))
+        assert digest == content_hash(vers_map)
@@ -0,0 +1,68 @@
+import asyncio
+import pathlib
+import sys
+from concurrent.futures.process import BrokenProcessPool
+
+import pytest
+
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+TESTS = pathlib.Path(__file__).resolve().parent
+if str(TESTS) not in sys.path:
+    sys.path.insert(0, str(TESTS))
+
+from extract_pool import ExtractionPool  # noqa: E402
+from psalm_extract import extract_vers_map_fast  # noqa: E402
+
+PAGE = (ROOT / "tests" / "fixtures" / "psalmen_23.html").read_text(encoding="utf-8")
+
+
+@pytest.fixture(scope="module")
+def pool():
+    pool = ExtractionPool(1, "fast", min_bytes=1000)
+    pool.start()
+    yield pool
+    pool.shutdown()
+
+
+def test_pool_output_matches_in_process_extraction(pool):
+    before = dict(pool.stats)
+    assert pool.extract(PAGE) == extract_vers_map_fast(PAGE)
+    assert asyncio.run(pool.aextract(PAGE)) == extract_vers_map_fast(PAGE)
+    assert pool.stats["pooled"] == before["pooled"] + 2
+
+
+def test_small_pages_stay_in_process(pool):
+    small = (ROOT / "tests" / "fixtures" / "psalmen_117.html").read_text(encoding="utf-8")
+    before = dict(pool.stats)
+    assert asyncio.run(pool.aextract(small)) == extract_vers_map_fast(small)
+    assert pool.stats["inline"] == before["inline"] + 1
+    assert pool.stats["pooled"] == before["pooled"]
+
+
+def test_broken_pool_falls_back_to_in_process(monkeypatch):
+    class Broken:
+        def submit(self, *args):
+            raise BrokenProcessPool("worker gecrasht")
+
+        def shutdown(self, **kwargs):
+            pass
+
+    pool = ExtractionPool(1, "fast", min_bytes=0)
+    pool._executor = Broken()
+    assert pool.extract(PAGE) == extract_vers_map_fast(PAGE)
+    assert pool.stats["fallback"] == 1
+    assert pool._executor is None
+
+
+def test_client_extracts_through_pool(pool):
+    from psalm_client import PsalmboekClient
+    from psalmboek_stub import PsalmboekStub, fixture_pages
+
+    with PsalmboekStub(fixture_pages()) as stub:
+        plain = PsalmboekClient(stub.base_url, "1773", cache_seconds=600)
+        pooled = PsalmboekClient(stub.base_url, "1773", cache_seconds=600, extraction_pool=pool)
+        before = pool.stats["pooled"]
+        assert asyncio.run(pooled.aget_vers_map(23)) == plain.get_vers_map(23)
+        assert pool.stats["pooled"] == before + 1
@@ -0,0 +1,113 @@
+import pathlib
+import sys
+
+import pytest
+
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+try:
+    from fastapi.testclient import TestClient
+    from http_cache import HttpCachePolicy, etag_matches, make_etag
+    from main import app
+except ImportError:  # pragma: no cover - allows skipping when deps ontbreken
+    TestClient = None  # type: ignore[assignment]
+    app = None  # type: ignore[assignment]
+
+pytestmark = pytest.mark.skipif(TestClient is None or app is None, reason="fastapi niet geïnstalleerd")
+
+
+def test_etag_depends_on_request_and_content():
+    etag = make_etag(("lookup", "1773", 23, (1,)), {1: "tekst"})
+    assert etag.startswith('"') and etag.endswith('"')
+    assert etag == make_etag(("lookup", "1773", 23, (1,)), {1: "tekst"})
+    assert etag != make_etag(("lookup", "1773", 23, (1, 2)), {1: "tekst"})
+    assert etag != make_etag(("lookup", "1773", 23, (1,)), {1: "andere tekst"})
+
+
+@pytest.mark.parametrize(
+    "header,expected",
+    [(None, False), ('"abc"', True), ('W/"abc"', True), ('"x", "abc"', True), ("*", True), ('"abcd"', False)],
+)
+def test_etag_matches(header, expected):
+    assert etag_matches(header, '"abc"') is expected
+
+
+def test_cache_control_per_status():
+    policy = HttpCachePolicy(max_age=3600, immutable=True, error_max_age=30)
+    assert policy.cache_control(200) == "public, max-age=3600, immutable"
+    assert policy.cache_control(404) == "public, max-age=30"
+    assert policy.cache_control(502) == "no-store"
+
+
+def _counting_fake(monkeypatch):
+    calls = []
+
+    async def fake_verses(psalm, verses):
+        calls.append(psalm)
+        return {v: f"tekst {v}" for v in verses}
+
+    monkeypatch.setattr("main.client.aget_verses", fake_verses)
+    monkeypatch.setattr("main.cache_policy", HttpCachePolicy(max_age=86400))
+    return calls
+
+
+def test_lookup_conditional_request_returns_304_without_fetch(monkeypatch):
+    calls = _counting_fake(monkeypatch)
+    http = TestClient(app)
+
+    first = http.get("/api/psalm/lookup", params={"query": "ps 23:1-2"})
+    assert first.status_code == 200
+    assert first.headers["cache-control"] == "public, max-age=86400"
+    etag = first.headers["etag"]
+
+    # andere schrijfwijze, zelfde genormaliseerde verzoek
+    second = http.get("/api/psalm/lookup", params={"query": "Psalm 23 vers 1 en 2"}, headers={"If-None-Match": etag})
+    assert second.status_code == 304
+    assert second.headers["etag"] == etag
+    assert second.content == b""
+    assert calls == [23]
+
+    other = http.get("/api/psalm/lookup", params={"query": "ps 23:3"}, headers={"If-None-Match": etag})
+    assert other.status_code == 200
+    assert other.headers["etag"] != etag
+
+
+def test_lookup_errors_get_short_or_no_caching(monkeypatch):
+    async def failing(psalm, verses):
+        raise RuntimeError("bron onbereikbaar")
+
+    monkeypatch.setattr("main.client.aget_verses", failing)
+    http = TestClient(app)
+
+    invalid = http.get("/api/psalm/lookup", params={"query": "psalm 118:"})
+    assert invalid.status_code == 400
+    assert invalid.headers["cache-control"].startswith("public, max-age=")
+    assert "etag" not in invalid.headers
+
+    failed = http.get("/api/psalm/lookup", params={"query": "ps 23:1"})
+    assert failed.status_code == 502
+    assert failed.headers["cache-control"] == "no-store"
+
+
+def test_vers_endpoint_etag(monkeypatch):
+    async def max_vers(psalm):
+        return 6
+
+    async def vers_text(psalm, vers):
+        return f"tekst {vers}"
+
+    monkeypatch.setattr("main.client.aget_max_vers", max_vers)
+    monkeypatch.setattr("main.client.aget_vers", vers_text)
+    monkeypatch.setattr("main.cache_policy", HttpCachePolicy(max_age=60))
+    http = TestClient(app)
+
+    first = http.get("/api/psalm/vers", params={"psalm": 23, "vers": 2})
+    assert first.status_code == 200 and first.json()["text"] == "tekst 2"
+    second = http.get("/api/psalm/vers", params={"psalm": 23, "vers": 2}, headers={"If-None-Match": first.headers["etag"]})
+    assert second.status_code == 304
+
+    missing = http.get("/api/psalm/vers", params={"psalm": 23, "vers": 9})
+    assert missing.status_code == 400
+    assert missing.headers["cache-control"] == "public, max-age=60"
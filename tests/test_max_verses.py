@@ -0,0 +1,85 @@
+import json
+import pathlib
+import sys
+
+import pytest
+
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from max_verses import MaxVerseTable, build, load_table, verify, write_table
+
+try:
+    from fastapi.testclient import TestClient
+    from main import app
+except ImportError:  # pragma: no cover - allows skipping when deps ontbreken
+    TestClient = None  # type: ignore[assignment]
+    app = None  # type: ignore[assignment]
+
+
+class FakeSource:
+    berijming = "1773"
+    base_url = "https://psalmboek.test"
+
+    def __init__(self, max_verses):
+        self.max_verses = max_verses
+        self.calls = []
+
+    def get_max_vers(self, psalm):
+        self.calls.append(psalm)
+        return self.max_verses[psalm]
+
+
+def test_build_write_and_load_roundtrip(tmp_path):
+    table = build(FakeSource({1: 4, 23: 6}), [1, 23], delay=0)
+    path = tmp_path / "max_verses_1773.json"
+    write_table(path, table)
+
+    data = json.loads(path.read_text(encoding="utf-8"))
+    assert data["format"] == 1 and data["max_verses"] == {"1": 4, "23": 6}
+
+    loaded = load_table("1773", path)
+    assert loaded.get(23) == 6
+    assert loaded.get(24) is None
+    assert 1 in loaded and len(loaded) == 2
+    assert loaded.source == "https://psalmboek.test"
+
+
+def test_load_missing_or_mismatched_table(tmp_path):
+    assert load_table("1773", tmp_path / "ontbreekt.json") is None
+
+    path = tmp_path / "tabel.json"
+    write_table(path, MaxVerseTable("1938", {1: 4}))
+    with pytest.raises(ValueError, match="berijming"):
+        load_table("1773", path)
+
+
+def test_verify_reports_drift():
+    table = MaxVerseTable("1773", {1: 4, 23: 6, 42: 6})
+    drift = verify(table, FakeSource({1: 4, 23: 7, 42: 6}), delay=0)
+    assert drift == {23: (6, 7)}
+
+
+@pytest.mark.skipif(TestClient is None or app is None, reason="fastapi niet geïnstalleerd")
+def test_table_answers_max_and_rejects_out_of_range_without_fetch(monkeypatch):
+    async def unexpected(*args, **kwargs):
+        raise AssertionError("client mag niet aangesproken worden")
+
+    monkeypatch.setattr("main.max_verses", MaxVerseTable("1773", {23: 6}))
+    monkeypatch.setattr("main.client.aget_max_vers", unexpected)
+    monkeypatch.setattr("main.client.aget_verses", unexpected)
+    monkeypatch.setattr("main.client.aget_vers_map", unexpected)
+    http = TestClient(app)
+
+    assert http.get("/api/psalm/max", params={"psalm": 23}).json()["max_vers"] == 6
+
+    lookup = http.get("/api/psalm/lookup", params={"query": "ps 23:5-7"})
+    assert lookup.status_code == 404
+    assert lookup.json()["status"] == "not_found"
+    assert lookup.json()["result"]["message"] == "Vers 7 van Psalm 23 kon niet worden opgehaald."
+
+    assert http.get("/api/psalm/vers", params={"psalm": 23, "vers": 9}).status_code == 400
+
+    batch = http.post("/api/psalm/lookup/batch", json={"queries": ["ps 23:7"]}).json()
+    assert batch["results"][0]["status_code"] == 404
@@ -0,0 +1,101 @@
+import pathlib
+import sys
+
+import pytest
+
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from metrics import Registry
+
+try:
+    from fastapi.testclient import TestClient
+    from main import app
+except ImportError:  # pragma: no cover - allows skipping when deps ontbreken
+    TestClient = None  # type: ignore[assignment]
+    app = None  # type: ignore[assignment]
+
+
+def test_render_prometheus_text():
+    registry = Registry()
+    requests = registry.counter("demo_requests", "Aantal requests.", ("status",))
+    in_flight = registry.gauge("demo_in_flight", "Lopend.")
+    latency = registry.histogram("demo_seconds", "Duur.", buckets=(0.1, 1.0))
+    registry.add_collector(lambda: [("counter", "demo_cache_events", "Events.", [({"tier": "memory"}, 3)])])
+
+    requests.labels(status="200").inc()
+    requests.labels(status="200").inc()
+    with in_flight.track():
+        text_during = registry.render()
+    latency.observe(0.05)
+    latency.observe(0.5)
+    latency.observe(5)
+
+    text = registry.render()
+    assert "demo_in_flight 1" in text_during
+    assert "# TYPE demo_requests counter" in text
+    assert 'demo_requests_total{status="200"} 2' in text
+    assert "demo_in_flight 0" in text
+    assert 'demo_seconds_bucket{le="0.1"} 1' in text
+    assert 'demo_seconds_bucket{le="1"} 2' in text
+    assert 'demo_seconds_bucket{le="+Inf"} 3' in text
+    assert "demo_seconds_count 3" in text
+    assert 'demo_cache_events_total{tier="memory"} 3' in text
+
+
+def test_labelled_metric_requires_labels():
+    registry = Registry()
+    with pytest.raises(ValueError):
+        registry.counter("demo", "Demo.", ("status",)).inc()
+
+
+@pytest.mark.skipif(TestClient is None or app is None, reason="fastapi niet geïnstalleerd")
+def test_metrics_endpoint_after_lookup(monkeypatch):
+    async def fake_verses(psalm, verses):
+        return {v: f"tekst {v}" for v in verses}
+
+    monkeypatch.setattr("main.client.aget_verses", fake_verses)
+    http = TestClient(app)
+    assert http.get("/api/psalm/lookup", params={"query": "ps 23:1"}).status_code == 200
+
+    response = http.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    assert "psalm_parse_seconds_count" in response.text
+    assert "psalm_validation_seconds_count" in response.text
+    assert 'http_request_duration_seconds_count{method="GET",route="/api/psalm/lookup",status="200"}' in response.text
+    assert 'psalm_cache_events_total{tier="memory",event="miss"}' in response.text
+
+
+@pytest.mark.skipif(TestClient is None or app is None, reason="fastapi niet geïnstalleerd")
+def test_healthz_deep_reports_upstream_and_cache(monkeypatch):
+    async def probe(timeout=3.0):
+        return {"reachable": False, "error": "ConnectError"}
+
+    monkeypatch.setattr("main.client.aprobe", probe)
+    http = TestClient(app)
+
+    assert http.get("/healthz").json() == {"status": "ok"}
+    data = http.get("/healthz", params={"deep": "1"}).json()
+    assert data["status"] == "degraded"
+    assert data["upstream"]["reachable"] is False
+    assert "memory" in data["cache"]
+
+
+@pytest.mark.skipif(TestClient is None or app is None, reason="fastapi niet geïnstalleerd")
+def test_singleflight_stats_are_exported_per_source(monkeypatch):
+    from psalm_client import PsalmboekClient
+    from sources import Source, SourceRegistry
+
+    client = PsalmboekClient("https://psalmboek.test", "1773", cache_seconds=600)
+    for _ in range(2):
+        client.singleflight.do(("1773", 23), lambda: {1: "tekst"})
+    registry = SourceRegistry()
+    registry.register(Source("psalmen_1773", "Psalm", client, count=150))
+    monkeypatch.setattr("main.sources", registry)
+
+    text = TestClient(app).get("/metrics").text
+    assert 'psalm_singleflight_events_total{source="psalmen_1773",role="leader"} 2' in text
+    assert 'psalm_singleflight_events_total{source="psalmen_1773",role="coalesced"} 0' in text
+    assert 'psalm_singleflight_inflight{source="psalmen_1773"} 0' in text
@@ -0,0 +1,526 @@
+import pathlib
+import sys
+import time
+
+import pytest
+
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+try:
+    from psalm_client import PsalmboekClient
+except ImportError:  # pragma: no cover - allows skipping when deps ontbreken
+    PsalmboekClient = None  # type: ignore[assignment]
+
+from psalmboek_stub import render_page as _page
+
+pytestmark = pytest.mark.skipif(PsalmboekClient is None, reason="httpx niet geïnstalleerd")
+
+
+PSALM_134 = {
+    1: "Looft, looft nu aller heren HEER,\nGij knechten van den HEER",
+    2: "Heft op uw handen naar Gods troon,\nIn 't heiligdom daarboven",
+    3: "Dat 's HEEREN zegen op u daal',\nUit Sion, Zijn verblijf",
+}
+
+
+def _counting_client(monkeypatch, cache_seconds):
+    client = PsalmboekClient("https://psalmboek.test", "1773", cache_seconds=cache_seconds)
+    calls = {"fetch": 0, "extract": 0}
+    extract = client._extract_vers_map
+
+    def fake_fetch(psalm):
+        calls["fetch"] += 1
+        return _page(PSALM_134)
+
+    def counting_extract(html):
+        calls["extract"] += 1
+        return extract(html)
+
+    monkeypatch.setattr(client, "_fetch_overview", fake_fetch)
+    monkeypatch.setattr(client, "_extract_vers_map", counting_extract)
+    return client, calls
+
+
+def test_get_verses_fetches_and_parses_once_without_cache(monkeypatch):
+    client, calls = _counting_client(monkeypatch, cache_seconds=0)
+
+    found = client.get_verses(134, [1, 2, 3, 4])
+
+    assert list(found) == [1, 2, 3]
+    assert found[2] == PSALM_134[2]
+    assert calls == {"fetch": 1, "extract": 1}
+
+
+def test_vers_map_cache_serves_max_and_verses(monkeypatch):
+    client, calls = _counting_client(monkeypatch, cache_seconds=600)
+
+    assert client.get_max_vers(134) == 3
+    assert client.get_vers(134, 1) == PSALM_134[1]
+    assert client.get_verses(134, [3, 1]) == {3: PSALM_134[3], 1: PSALM_134[1]}
+    with pytest.raises(ValueError):
+        client.get_vers(134, 4)
+    assert calls == {"fetch": 1, "extract": 1}
+
+
+def _fixture_snapshot(tmp_path):
+    from psalm_snapshot import write_snapshot
+
+    path = tmp_path / "psalmen.snap"
+    write_snapshot(str(path), "1773", {134: PSALM_134, 117: {1: "Looft God, looft Zijn naam alom", 2: "Want Zijn genâ is groot"}})
+    return str(path)
+
+
+def test_snapshot_serves_without_network(tmp_path):
+    from psalm_snapshot import SnapshotClient
+
+    snapshot = SnapshotClient(_fixture_snapshot(tmp_path))
+
+    assert snapshot.berijming == "1773"
+    assert snapshot.get_max_vers(134) == 3
+    assert snapshot.get_max_vers(117) == 2
+    assert snapshot.get_vers(117, 2) == "Want Zijn genâ is groot"
+    assert snapshot.get_verses(134, [3, 9, 1]) == {3: PSALM_134[3], 1: PSALM_134[1]}
+    assert snapshot.get_vers_map(134) == PSALM_134
+    with pytest.raises(ValueError):
+        snapshot.get_vers(134, 4)
+    with pytest.raises(ValueError):
+        snapshot.get_max_vers(23)
+    snapshot.close()
+
+
+def test_snapshot_falls_back_to_live_client(tmp_path, monkeypatch):
+    from psalm_snapshot import SnapshotClient
+
+    live, calls = _counting_client(monkeypatch, cache_seconds=0)
+    snapshot = SnapshotClient(_fixture_snapshot(tmp_path), fallback=live)
+
+    assert snapshot.get_max_vers(134) == 3
+    assert calls["fetch"] == 0
+    assert snapshot.get_verses(23, [1, 2]) == {1: PSALM_134[1], 2: PSALM_134[2]}
+    assert calls["fetch"] == 1
+
+
+def test_snapshot_rejects_foreign_file(tmp_path):
+    from psalm_snapshot import SnapshotClient
+
+    path = tmp_path / "kapot.snap"
+    path.write_bytes(b"GEENSNAP" + b"\0" * 64)
+    with pytest.raises(ValueError):
+        SnapshotClient(str(path))
+
+
+def test_async_vers_map_uses_shared_cache(monkeypatch):
+    import asyncio
+
+    client, calls = _counting_client(monkeypatch, cache_seconds=600)
+
+    async def fake_afetch(psalm):
+        calls["fetch"] += 1
+        return _page(PSALM_134)
+
+    monkeypatch.setattr(client, "_afetch_overview", fake_afetch)
+
+    async def scenario():
+        return await client.aget_verses(134, [1, 3]), await client.aget_max_vers(134)
+
+    found, max_vers = asyncio.run(scenario())
+
+    assert found == {1: PSALM_134[1], 3: PSALM_134[3]}
+    assert max_vers == 3
+    assert client.get_vers(134, 2) == PSALM_134[2]
+    assert calls == {"fetch": 1, "extract": 1}
+
+
+def test_concurrent_misses_share_one_upstream_request():
+    import threading
+
+    from psalmboek_stub import PsalmboekStub
+
+    with PsalmboekStub(delay=0.3) as stub:
+        client = PsalmboekClient(stub.base_url, "1773", cache_seconds=600)
+        barrier = threading.Barrier(20)
+        results = []
+
+        def lookup():
+            barrier.wait()
+            results.append(client.get_verses(23, [1, 2]))
+
+        threads = [threading.Thread(target=lookup) for _ in range(20)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert stub.request_count == 1
+        assert len(results) == 20 and all(r == results[0] for r in results)
+        assert client.singleflight.leaders == 1
+        assert client.singleflight.coalesced == 19
+
+
+def test_concurrent_async_and_threaded_misses_coalesce():
+    import asyncio
+
+    from psalmboek_stub import PsalmboekStub
+
+    with PsalmboekStub(delay=0.3) as stub:
+        client = PsalmboekClient(stub.base_url, "1773", cache_seconds=0)
+
+        async def scenario():
+            threaded = [asyncio.to_thread(client.get_max_vers, 42) for _ in range(5)]
+            awaited = [client.aget_max_vers(42) for _ in range(15)]
+            results = await asyncio.gather(*threaded, *awaited)
+            await client.aclose()
+            return results
+
+        results = asyncio.run(scenario())
+
+        assert results == [6] * 20
+        assert stub.request_count == 1
+        assert client.singleflight.stats() == {"leaders": 1, "coalesced": 19, "inflight": 0}
+
+
+def test_coalesced_callers_share_the_error(monkeypatch):
+    import threading
+    import time
+
+    client = PsalmboekClient("https://psalmboek.test", "1773", cache_seconds=600)
+    release = threading.Event()
+    calls = {"fetch": 0}
+
+    def failing_fetch(psalm):
+        calls["fetch"] += 1
+        release.wait(2)
+        raise RuntimeError("bron onbereikbaar")
+
+    monkeypatch.setattr(client, "_fetch_overview", failing_fetch)
+    errors = []
+
+    def lookup():
+        try:
+            client.get_vers_map(23)
+        except RuntimeError as exc:
+            errors.append(str(exc))
+
+    threads = [threading.Thread(target=lookup) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    while client.singleflight.stats()["coalesced"] < 4:
+        time.sleep(0.001)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert calls["fetch"] == 1
+    assert errors == ["bron onbereikbaar"] * 5
+
+
+def test_stale_while_revalidate_serves_stale_and_refreshes_once(monkeypatch):
+    import threading
+    import time
+
+    from cache import TTLCache
+
+    client, calls = _counting_client(monkeypatch, cache_seconds=600)
+    now = [1000.0]
+    client._cache = TTLCache(10, max_stale=100, clock=lambda: now[0])
+    client.get_vers_map(134)
+
+    release = threading.Event()
+    refreshed = threading.Event()
+
+    def slow_fetch(psalm):
+        calls["fetch"] += 1
+        release.wait(2)
+        refreshed.set()
+        return _page({**PSALM_134, 4: "nieuw"})
+
+    monkeypatch.setattr(client, "_fetch_overview", slow_fetch)
+    now[0] += 20
+
+    assert client.get_max_vers(134) == 3
+    assert client.get_max_vers(134) == 3
+    release.set()
+    assert refreshed.wait(2)
+    for _ in range(200):
+        if client._fresh_vers_map(134) is not None:
+            break
+        time.sleep(0.01)
+
+    assert client.get_max_vers(134) == 4
+    assert calls["fetch"] == 2
+
+
+def test_stale_served_on_upstream_error_until_max_stale(monkeypatch):
+    import time
+
+    from cache import TTLCache
+
+    client, calls = _counting_client(monkeypatch, cache_seconds=600)
+    now = [1000.0]
+    client._cache = TTLCache(10, max_stale=100, clock=lambda: now[0])
+    client.get_vers_map(134)
+
+    def failing_fetch(psalm):
+        calls["fetch"] += 1
+        raise RuntimeError("bron onbereikbaar")
+
+    monkeypatch.setattr(client, "_fetch_overview", failing_fetch)
+    now[0] += 50
+    assert client.get_vers(134, 1) == PSALM_134[1]
+    for _ in range(200):
+        if not client._refreshing:
+            break
+        time.sleep(0.01)
+
+    now[0] += 100
+    with pytest.raises(RuntimeError):
+        client.get_vers(134, 1)
+    assert calls["fetch"] == 3
+
+
+def test_sqlite_tier_shared_between_clients(tmp_path, monkeypatch):
+    from sqlite_cache import SqliteVerseCache
+
+    path = str(tmp_path / "verzen.sqlite")
+    first, first_calls = _counting_client(monkeypatch, cache_seconds=600)
+    first._disk = SqliteVerseCache(path)
+    first.get_vers_map(134)
+
+    # "Herstart": een nieuwe client met een leeg geheugen maar hetzelfde bestand.
+    second, second_calls = _counting_client(monkeypatch, cache_seconds=600)
+    second._disk = SqliteVerseCache(path)
+
+    assert second.get_verses(134, [1, 3]) == {1: PSALM_134[1], 3: PSALM_134[3]}
+    assert second.get_max_vers(134) == 3
+    assert first_calls["fetch"] == 1
+    assert second_calls == {"fetch": 0, "extract": 0}
+    assert second._disk.stats()["hits"] == 1
+
+
+def test_stub_injected_403_is_retried_and_errors_surface():
+    import metrics
+    from psalmboek_stub import PsalmboekStub
+
+    with PsalmboekStub(forbidden_rate=1.0) as stub:
+        client = PsalmboekClient(stub.base_url, "1773", cache_seconds=0)
+        with pytest.raises(Exception):
+            client.get_max_vers(23)
+        # eerste poging + retry met browser-User-Agent
+        assert stub.statuses == {403: 2}
+        assert 'psalm_upstream_fetch_seconds_count{status="403",user_agent="fallback"}' in metrics.REGISTRY.render()
+
+    with PsalmboekStub(error_rate=1.0) as stub:
+        client = PsalmboekClient(stub.base_url, "1773", cache_seconds=0)
+        with pytest.raises(Exception):
+            client.get_max_vers(23)
+        # 5xx krijgt één retry binnen het retry-budget (zie resilience.py)
+        assert stub.statuses == {503: 2}
+
+
+def _counting_extract(monkeypatch, client):
+    calls = []
+    extract = client._extract_vers_map
+
+    def counting(html):
+        calls.append(len(html))
+        return extract(html)
+
+    monkeypatch.setattr(client, "_extract_vers_map", counting)
+    return calls
+
+
+def test_expired_entry_revalidates_with_etag_and_skips_parse(monkeypatch):
+    from psalmboek_stub import PsalmboekStub
+
+    with PsalmboekStub(validators=True) as stub:
+        client = PsalmboekClient(stub.base_url, "1773", cache_seconds=600, cache_max_stale=3600)
+        parses = _counting_extract(monkeypatch, client)
+
+        first = client.get_vers_map(23)
+        client._cache.set(("1773", 23), first, age=601)  # TTL verlopen, nog binnen het stale-venster
+        second = client._load_vers_map(23)
+
+        assert second == first
+        assert stub.statuses == {200: 1, 304: 1}
+        assert len(parses) == 1
+        stats = client.revalidation_stats()
+        assert stats["not_modified"] == 1
+        assert stats["bytes_saved"] == parses[0]
+        assert stats["parse_seconds_saved"] > 0
+        assert client._cache.get(("1773", 23)) == (first, True)
+
+
+def test_identical_body_without_validators_skips_parse(monkeypatch):
+    from psalmboek_stub import PsalmboekStub
+
+    with PsalmboekStub() as stub:
+        client = PsalmboekClient(stub.base_url, "1773", cache_seconds=600, cache_max_stale=3600)
+        parses = _counting_extract(monkeypatch, client)
+
+        async def scenario():
+            vers_map = await client.aget_vers_map(23)
+            client._cache.set(("1773", 23), vers_map, age=601)
+            await client._aload_vers_map(23)
+            await client.aclose()
+
+        import asyncio
+
+        asyncio.run(scenario())
+
+        assert stub.statuses == {200: 2}
+        assert len(parses) == 1
+        assert client.revalidation_stats()["unchanged"] == 1
+
+
+def test_evicted_vers_map_is_not_kept_alive_by_validators(monkeypatch):
+    from psalmboek_stub import PsalmboekStub
+
+    with PsalmboekStub(validators=True) as stub:
+        client = PsalmboekClient(stub.base_url, "1773", cache_seconds=600)
+        parses = _counting_extract(monkeypatch, client)
+
+        first = client.get_vers_map(23)
+        client._cache.clear()  # verdrongen door het LRU-/bytebudget
+        assert "vers_map" not in client._validators.peek(("1773", 23))._fields
+
+        # Niets meer om te hergebruiken: geen conditioneel verzoek, gewoon opnieuw ophalen en parsen.
+        assert client.get_vers_map(23) == first
+        assert stub.statuses == {200: 2}
+        assert len(parses) == 2
+
+
+def test_not_modified_reuses_vers_map_from_sqlite_tier(monkeypatch, tmp_path):
+    from psalmboek_stub import PsalmboekStub
+
+    from sqlite_cache import SqliteVerseCache
+
+    with PsalmboekStub(validators=True) as stub:
+        disk = SqliteVerseCache(str(tmp_path / "verses.sqlite3"))
+        client = PsalmboekClient(stub.base_url, "1773", cache_seconds=600, disk_cache=disk)
+        parses = _counting_extract(monkeypatch, client)
+
+        first = client.get_vers_map(23)
+        client._cache.clear()
+        disk.put("1773", 23, first, fetched_at=time.time() - 3600)
+
+        assert client.get_vers_map(23) == first
+        assert stub.statuses == {200: 1, 304: 1}
+        assert len(parses) == 1
+
+
+def test_changed_page_is_parsed_again(monkeypatch):
+    from psalmboek_stub import PsalmboekStub
+
+    versions = iter([{1: "oud"}, {1: "nieuw"}])
+    with PsalmboekStub(lambda psalm: _page(next(versions)), validators=True) as stub:
+        client = PsalmboekClient(stub.base_url, "1773", cache_seconds=600)
+        assert client.get_vers(23, 1) == "oud"
+        client._cache.clear()
+        assert client.get_vers(23, 1) == "nieuw"
+        assert client.revalidation_stats()["changed"] == 1
+        assert stub.statuses == {200: 2}
+
+
+def test_leader_deadline_does_not_fail_coalesced_callers():
+    import threading
+    import time
+
+    from resilience import DeadlineExceeded
+    from singleflight import SingleFlight
+
+    flight = SingleFlight(leader_only=(DeadlineExceeded,))
+    release = threading.Event()
+    results = []
+
+    def leader():
+        release.wait(2)
+        raise DeadlineExceeded("deadline van de leider")
+
+    def follower():
+        results.append(flight.do("ps23", lambda: "eigen fetch"))
+
+    leading = threading.Thread(target=lambda: pytest.raises(DeadlineExceeded, flight.do, "ps23", leader))
+    leading.start()
+    while flight.stats()["inflight"] < 1:
+        time.sleep(0.001)
+    following = threading.Thread(target=follower)
+    following.start()
+    while flight.stats()["coalesced"] < 1:
+        time.sleep(0.001)
+    release.set()
+    leading.join()
+    following.join()
+
+    assert results == ["eigen fetch"]
+    assert flight.stats()["leaders"] == 2
+
+
+def test_locked_sqlite_tier_does_not_block_event_loop(tmp_path, monkeypatch):
+    import asyncio
+    import sqlite3
+    import time
+
+    from sqlite_cache import SqliteVerseCache
+
+    path = str(tmp_path / "verzen.sqlite")
+    client = PsalmboekClient("https://psalmboek.test", "1773", cache_seconds=600)
+    client._disk = SqliteVerseCache(path, busy_timeout_ms=2000)
+
+    async def fake_fetch(psalm, previous=None):
+        return _page(PSALM_134)
+
+    monkeypatch.setattr(client, "_afetch_overview", fake_fetch)
+    # Een andere worker houdt de schrijflock vast.
+    other = sqlite3.connect(path, isolation_level=None)
+    other.execute("BEGIN IMMEDIATE")
+
+    async def scenario():
+        gaps = []
+
+        async def ticker():
+            last = time.perf_counter()
+            while True:
+                await asyncio.sleep(0.01)
+                now = time.perf_counter()
+                gaps.append(now - last)
+                last = now
+
+        ticking = asyncio.ensure_future(ticker())
+        lookup = asyncio.ensure_future(client.aget_vers_map(134))
+        await asyncio.sleep(0.5)
+        other.execute("ROLLBACK")
+        vers_map = await lookup
+        ticking.cancel()
+        return vers_map, max(gaps)
+
+    vers_map, worst_gap = asyncio.run(scenario())
+    other.close()
+    assert vers_map == PSALM_134
+    assert worst_gap < 0.2
+    assert client._disk.stats()["writes"] == 1
+
+
+def test_async_fill_runs_listeners_off_the_event_loop(monkeypatch):
+    import asyncio
+    import threading
+
+    client = PsalmboekClient("https://psalmboek.test", "1773", cache_seconds=600)
+    seen = []
+
+    async def fake_fetch(psalm, previous=None):
+        return _page(PSALM_134)
+
+    monkeypatch.setattr(client, "_afetch_overview", fake_fetch)
+    client.subscribe(lambda psalm, vers_map: seen.append((psalm, threading.get_ident())))
+
+    async def scenario():
+        vers_map = await client.aget_vers_map(134)
+        # Afgewacht: de listener is klaar voordat de aanroeper verder gaat.
+        assert [psalm for psalm, _ in seen] == [134]
+        return vers_map, threading.get_ident()
+
+    vers_map, loop_thread = asyncio.run(scenario())
+    assert vers_map == PSALM_134
+    assert seen[0][1] != loop_thread
@@ -0,0 +1,82 @@
+import pathlib
+import sys
+
+import pytest
+
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from psalm_extract import extract_vers_map_fast, get_engine
+
+try:
+    from psalm_extract import extract_vers_map_bs4
+    import bs4  # noqa: F401
+except ImportError:  # pragma: no cover - allows skipping when deps ontbreken
+    extract_vers_map_bs4 = None  # type: ignore[assignment]
+
+from psalmboek_stub import render_page
+
+FIXTURES = sorted((pathlib.Path(__file__).parent / "fixtures").glob("psalmen_*.html"))
+
+
+@pytest.mark.skipif(extract_vers_map_bs4 is None, reason="beautifulsoup4 niet geïnstalleerd")
+@pytest.mark.parametrize("fixture", FIXTURES, ids=lambda path: path.stem)
+def test_fast_engine_matches_bs4_reference(fixture):
+    html = fixture.read_text(encoding="utf-8")
+    assert extract_vers_map_fast(html) == extract_vers_map_bs4(html)
+
+
+@pytest.mark.skipif(extract_vers_map_bs4 is None, reason="beautifulsoup4 niet geïnstalleerd")
+def test_fast_engine_matches_bs4_on_generated_psalm_119():
+    html = render_page({vers: f"Welzalig vers {vers} &amp; meer\nTweede regel" for vers in range(1, 89)})
+    assert extract_vers_map_fast(html) == extract_vers_map_bs4(html)
+
+
+UNCLOSED_P = (
+    '<div id="psalmkolom2"><p><strong>Vers 1</strong><br>Looft, looft nu aller heren HEER'
+    "<p><strong>Vers 2</strong><br>Heft op uw handen</div>"
+)
+SCRIPT_IN_P = (
+    '<div id="psalmkolom2"><p><strong>Vers 1</strong><br>Looft<script>var s = "</p>";</script>'
+    "<br>nu aller heren HEER</p><p><strong>Vers 2</strong><br>Heft op</p></div>"
+)
+
+
+@pytest.mark.skipif(extract_vers_map_bs4 is None, reason="beautifulsoup4 niet geïnstalleerd")
+@pytest.mark.parametrize("html", [UNCLOSED_P, SCRIPT_IN_P], ids=["unclosed_p", "script_in_p"])
+def test_fast_engine_matches_bs4_on_irregular_markup(html):
+    expected = extract_vers_map_bs4(html)
+    assert expected
+    assert extract_vers_map_fast(html) == expected
+
+
+@pytest.mark.skipif(extract_vers_map_bs4 is None, reason="beautifulsoup4 niet geïnstalleerd")
+def test_fast_engine_falls_back_to_bs4_instead_of_returning_empty_map(monkeypatch):
+    import psalm_extract
+
+    monkeypatch.setattr(psalm_extract, "_scan_paragraphs", lambda container: {})
+    html = (FIXTURES[0].parent / "psalmen_23.html").read_text(encoding="utf-8")
+    assert psalm_extract.extract_vers_map_fast(html) == extract_vers_map_bs4(html) != {}
+
+
+def test_fast_engine_reads_psalmkolom2_only():
+    verses = extract_vers_map_fast((FIXTURES[0].parent / "psalmen_23.html").read_text(encoding="utf-8"))
+
+    assert sorted(verses) == [1, 2, 3, 4]
+    assert verses[1].startswith("De HEER is mijn Herder! 'k Zal niet derven;\nMij zal ontbreken nimmermeer.")
+    assert "benauwers; Gij" in verses[4]
+
+
+def test_fast_engine_decodes_entities_and_prefixes():
+    verses = extract_vers_map_fast((FIXTURES[0].parent / "psalmen_134.html").read_text(encoding="utf-8"))
+
+    assert sorted(verses) == [1, 2, 3]
+    assert verses[2].startswith("Heft op uw handen")
+    assert "éérst het heelal <schiep> & hemel" in verses[3]
+    assert "bij nacht  staat" in verses[1]
+
+
+def test_unknown_engine_rejected():
+    with pytest.raises(ValueError):
+        get_engine("lxml")
@@ -1,3 +1,4 @@
+import json
 import pathlib
 import sys
 
@@ -13,7 +14,7 @@ try:
 except ImportError:  # pragma: no cover - allows skipping when deps ontbreken
     TestClient = None  # type: ignore[assignment]
     app = None  # type: ignore[assignment]
-from psalm_parser import parse_psalm_reference
+from psalm_parser import parse_psalm_reference, parse_psalm_references
 from response_validation import ensure_response_matches_schema
 
 
@@ -38,6 +39,59 @@ def test_parse_psalm_reference_happy(text, expected):
     assert parsed.request == expected
 
 
+GOLDEN_CASES = [
+    case
+    for case in json.loads((ROOT / "tests" / "golden_cases.json").read_text(encoding="utf-8"))
+    if case["expected_intent"] == "psalm_lookup_1773"
+]
+
+
+@pytest.mark.parametrize("case", GOLDEN_CASES, ids=lambda case: case["id"])
+def test_parse_golden_cases(case):
+    payload = parse_psalm_reference(case["utterance"]).to_dict()
+    payload.pop("result", None)
+    assert payload == case["expected_payload"]
+
+
+def test_parse_multiple_references():
+    parsed = parse_psalm_references("Ps 23:1-3; Ps 121:1 en 2")
+
+    assert [p.status for p in parsed] == ["ok", "ok"]
+    assert [p.request for p in parsed] == [
+        {"psalm_number": 23, "verses": [1, 2, 3]},
+        {"psalm_number": 121, "verses": [1, 2]},
+    ]
+    assert parse_psalm_reference("Ps 23:1-3; Ps 121:1 en 2").status == "invalid_request"
+
+
+def test_parse_merges_overlapping_ranges():
+    assert parse_psalm_reference("ps 23:5,1-3,2-4").request == {"psalm_number": 23, "verses": [1, 2, 3, 4, 5]}
+
+
+@pytest.mark.parametrize(
+    "text,message",
+    [("ps 23:3-1", "Ongeldig bereik: 3-1"), ("ps 23:1-2-3", "Ongeldig bereik: 1-2-3"), ("ps 23:0", "Ongeldig vers: 0")],
+)
+def test_parse_invalid_ranges(text, message):
+    parsed = parse_psalm_reference(text)
+    assert parsed.status == "invalid_request"
+    assert parsed.message == message
+
+
+@pytest.mark.parametrize("text", ["ps 1:1-5000000", "ps 1:5000000", "ps 1:1, 3-5000000", "ps 23 vers 201"])
+def test_parse_rejects_verse_numbers_above_bound_before_expanding(text):
+    parsed = parse_psalm_reference(text)
+    assert parsed.status == "invalid_request"
+    assert parsed.message.startswith("Versnummer buiten bereik")
+    assert parsed.request["verses"] == []
+
+
+def test_parse_memo_returns_independent_requests():
+    first = parse_psalm_reference("ps 23:1-3")
+    first.request["verses"].append(99)
+    assert parse_psalm_reference("PS  23:1-3").request == {"psalm_number": 23, "verses": [1, 2, 3]}
+
+
 def test_parse_invalid_missing_verses():
     parsed = parse_psalm_reference("psalm 118:")
     assert parsed.status == "invalid_request"
@@ -101,18 +155,14 @@ def test_response_schema_verification_failed():
 
 @pytest.mark.skipif(TestClient is None or app is None, reason="fastapi niet geïnstalleerd")
 def test_psalm_lookup_integration(monkeypatch):
-    calls = {"max": 0, "vers": []}
-
-    def fake_max(psalm: int) -> int:
-        calls["max"] += 1
-        return 10
+    calls = {"verses": []}
 
-    def fake_vers(psalm: int, vers: int) -> str:
-        calls["vers"].append(vers)
-        return f"Psalm {psalm} vers {vers}"
+    async def fake_verses(psalm: int, verses):
+        verses = list(verses)
+        calls["verses"].append(verses)
+        return {vers: f"Psalm {psalm} vers {vers}" for vers in verses if vers <= 10}
 
-    monkeypatch.setattr("psalms.client.get_max_vers", fake_max)
-    monkeypatch.setattr("psalms.client.get_vers", fake_vers)
+    monkeypatch.setattr("psalms.client.aget_verses", fake_verses)
 
     client_http = TestClient(app)
     response = client_http.get("/api/psalm/lookup", params={"query": "Psalm 118: 1, 2 en 5"})
@@ -123,4 +173,200 @@ def test_psalm_lookup_integration(monkeypatch):
     assert data["status"] == "ok"
     assert data["request"] == {"psalm_number": 118, "verses": [1, 2, 5]}
     assert [v["verse"] for v in data["result"]["verses"]] == [1, 2, 5]
-    assert calls == {"max": 1, "vers": [1, 2, 5]}
+    assert calls == {"verses": [[1, 2, 5]]}
+
+
+@pytest.mark.skipif(TestClient is None or app is None, reason="fastapi niet geïnstalleerd")
+def test_psalm_lookup_not_found(monkeypatch):
+    async def fake_verses(psalm: int, verses):
+        return {vers: "tekst" for vers in verses if vers <= 3}
+
+    monkeypatch.setattr("psalms.client.aget_verses", fake_verses)
+
+    response = TestClient(app).get("/api/psalm/lookup", params={"query": "ps 23:2-5"})
+
+    assert response.status_code == 404
+    data = response.json()
+    ensure_response_matches_schema(data)
+    assert data["status"] == "not_found"
+    assert data["result"]["message"] == "Vers 4 van Psalm 23 kon niet worden opgehaald."
+
+
+@pytest.mark.skipif(TestClient is None or app is None, reason="fastapi niet geïnstalleerd")
+def test_cache_hits_stay_fast_while_upstream_is_slow(monkeypatch):
+    import asyncio
+    import time
+
+    import httpx
+
+    from cache import TTLCache
+    from psalms import live_client
+
+    page = '<div id="psalmkolom2"><p><strong>Vers 1</strong><br />tekst</p></div>'
+
+    async def slow_fetch(psalm: int) -> str:
+        await asyncio.sleep(0.0 if psalm == 23 else 0.5)
+        return page
+
+    monkeypatch.setattr("psalms.client", live_client)
+    monkeypatch.setattr("main.client", live_client)
+    monkeypatch.setattr(live_client, "_afetch_overview", slow_fetch)
+    monkeypatch.setattr(live_client, "_cache", TTLCache(600))
+
+    async def scenario():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as http:
+            await http.get("/api/psalm/lookup", params={"query": "ps 23:1"})
+            cold = [
+                asyncio.create_task(http.get("/api/psalm/lookup", params={"query": f"ps {psalm}:1"}))
+                for psalm in range(100, 120)
+            ]
+            await asyncio.sleep(0.05)
+            started = time.perf_counter()
+            hits = await asyncio.gather(
+                *(http.get("/api/psalm/lookup", params={"query": "ps 23:1"}) for _ in range(50))
+            )
+            hit_elapsed = time.perf_counter() - started
+            misses = await asyncio.gather(*cold)
+        return hit_elapsed, hits, misses
+
+    hit_elapsed, hits, misses = asyncio.run(scenario())
+
+    assert all(r.status_code == 200 for r in hits + misses)
+    assert hit_elapsed < 0.4
+
+
+@pytest.mark.skipif(TestClient is None or app is None, reason="fastapi niet geïnstalleerd")
+def test_psalm_lookup_batch_groups_by_psalm(monkeypatch):
+    calls = []
+
+    async def fake_vers_map(psalm: int):
+        calls.append(psalm)
+        if psalm == 42:
+            raise RuntimeError("bron onbereikbaar")
+        return {vers: f"Psalm {psalm} vers {vers}" for vers in range(1, 7)}
+
+    monkeypatch.setattr("psalms.client.aget_vers_map", fake_vers_map)
+
+    queries = ["Ps 23:1-3", "psalm 118: 1, 2 en 5", "foo bar", "ps 23 vers 6", "ps 118:9", "ps 42:1"]
+    response = TestClient(app).post("/api/psalm/lookup/batch", json={"queries": queries})
+
+    assert response.status_code == 200
+    results = response.json()["results"]
+    assert [item["query"] for item in results] == queries
+    assert [item["status_code"] for item in results] == [200, 200, 400, 200, 404, 502]
+    assert [item["response"]["status"] for item in results] == [
+        "ok",
+        "ok",
+        "invalid_request",
+        "ok",
+        "not_found",
+        "verification_failed",
+    ]
+    for item in results:
+        ensure_response_matches_schema(item["response"])
+    assert results[3]["response"]["result"]["verses"] == [{"verse": 6, "text": "Psalm 23 vers 6"}]
+    assert sorted(calls) == [23, 42, 118]
+
+
+@pytest.mark.skipif(TestClient is None or app is None, reason="fastapi niet geïnstalleerd")
+def test_lookup_and_batch_expand_multiple_references(monkeypatch):
+    calls = []
+
+    async def fake_vers_map(psalm: int):
+        calls.append(psalm)
+        return {vers: f"Psalm {psalm} vers {vers}" for vers in range(1, 7)}
+
+    monkeypatch.setattr("psalms.client.aget_vers_map", fake_vers_map)
+    http = TestClient(app)
+    query = "Ps 23:1-3; Ps 121:1 en 2"
+
+    response = http.get("/api/psalm/lookup", params={"query": query})
+    assert response.status_code == 200
+    results = response.json()["results"]
+    assert [item["status_code"] for item in results] == [200, 200]
+    assert [item["response"]["request"] for item in results] == [
+        {"psalm_number": 23, "verses": [1, 2, 3]},
+        {"psalm_number": 121, "verses": [1, 2]},
+    ]
+
+    batch = http.post("/api/psalm/lookup/batch", json={"queries": [query, "ps 23:4"]}).json()["results"]
+    assert [item["query"] for item in batch] == [query, query, "ps 23:4"]
+    assert [item["response"]["request"]["psalm_number"] for item in batch] == [23, 121, 23]
+    for item in results + batch:
+        ensure_response_matches_schema(item["response"])
+    assert sorted(calls) == [23, 23, 121, 121]
+
+
+@pytest.mark.skipif(TestClient is None or app is None, reason="fastapi niet geïnstalleerd")
+def test_psalm_lookup_batch_rejects_empty_body():
+    response = TestClient(app).post("/api/psalm/lookup/batch", json={"queries": []})
+    assert response.status_code == 422
+
+
+def _ndjson_records(response):
+    return [json.loads(line) for line in response.text.splitlines() if line]
+
+
+@pytest.mark.skipif(TestClient is None or app is None, reason="fastapi niet geïnstalleerd")
+def test_psalm_lookup_stream_emits_header_verses_and_trailer(monkeypatch):
+    async def fake_vers_map(psalm: int):
+        return {vers: f"Psalm {psalm} vers {vers}" for vers in range(1, 89)}
+
+    monkeypatch.setattr("psalms.client.aget_vers_map", fake_vers_map)
+
+    response = TestClient(app).get("/api/psalm/lookup", params={"query": "psalm 119: 1 t/m 88", "stream": "true"})
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    records = _ndjson_records(response)
+    header, verses, trailer = records[0], records[1:-1], records[-1]
+    assert header == {
+        "type": "request",
+        "intent": "psalm_lookup_1773",
+        "request": {"psalm_number": 119, "verses": list(range(1, 89))},
+    }
+    assert [record["verse"] for record in verses] == list(range(1, 89))
+    assert trailer == {"type": "status", "status": "ok", "verified": True, "count": 88}
+
+    # Samengevoegd is de stream gelijk aan het gewone antwoord.
+    ensure_response_matches_schema(
+        {
+            "intent": header["intent"],
+            "status": trailer["status"],
+            "request": header["request"],
+            "result": {"verified": True, "verses": [{"verse": r["verse"], "text": r["text"]} for r in verses]},
+        }
+    )
+
+
+@pytest.mark.skipif(TestClient is None or app is None, reason="fastapi niet geïnstalleerd")
+def test_psalm_lookup_stream_reports_errors_in_trailer(monkeypatch):
+    async def fake_vers_map(psalm: int):
+        if psalm == 42:
+            raise RuntimeError("bron onbereikbaar")
+        if psalm == 1:
+            return {1: 12345}  # geen string: faalt op de verscontrole
+        return {vers: "tekst" for vers in range(1, 4)}
+
+    monkeypatch.setattr("psalms.client.aget_vers_map", fake_vers_map)
+    http = TestClient(app)
+    headers = {"Accept": "application/x-ndjson"}
+
+    records = _ndjson_records(http.get("/api/psalm/lookup", params={"query": "ps 23:2-5"}, headers=headers))
+    assert [record["type"] for record in records] == ["request", "status"]
+    assert records[-1]["status"] == "not_found"
+    assert records[-1]["message"] == "Vers 4 van Psalm 23 kon niet worden opgehaald."
+
+    records = _ndjson_records(http.get("/api/psalm/lookup", params={"query": "ps 42:1"}, headers=headers))
+    assert records[-1]["status"] == "verification_failed"
+    assert "bron onbereikbaar" in records[-1]["message"]
+
+    records = _ndjson_records(http.get("/api/psalm/lookup", params={"query": "ps 1:1"}, headers=headers))
+    assert records[-1]["type"] == "error"
+    assert "result.verses[*].text" in records[-1]["message"]
+
+    # Ongeldige verzoeken worden niet gestreamd.
+    response = http.get("/api/psalm/lookup", params={"query": "foo bar"}, headers=headers)
+    assert response.status_code == 400
+    assert response.json()["status"] == "invalid_request"
@@ -0,0 +1,303 @@
+import asyncio
+import pathlib
+import sys
+import time
+
+import pytest
+
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+TESTS = pathlib.Path(__file__).resolve().parent
+if str(TESTS) not in sys.path:
+    sys.path.insert(0, str(TESTS))
+
+try:
+    import httpx
+    from psalm_client import PsalmboekClient
+    from resilience import (
+        CircuitBreaker,
+        CircuitOpenError,
+        DeadlineExceeded,
+        RetryBudget,
+        UpstreamGuard,
+        deadline,
+        remaining,
+    )
+except ImportError:  # pragma: no cover - allows skipping when deps ontbreken
+    httpx = None  # type: ignore[assignment]
+
+pytestmark = pytest.mark.skipif(httpx is None, reason="httpx niet geïnstalleerd")
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _unavailable() -> Exception:
+    request = httpx.Request("GET", "https://psalmboek.nl/psalmen.php")
+    return httpx.HTTPStatusError("503", request=request, response=httpx.Response(503, request=request))
+
+
+def test_breaker_opens_after_consecutive_failures_and_recovers_via_probe():
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=3, reset_timeout=30, clock=clock)
+    for _ in range(2):
+        assert breaker.allow()
+        breaker.record_failure()
+    breaker.record_success()  # succes reset de reeks
+    for _ in range(3):
+        breaker.record_failure()
+    assert breaker.state == "open"
+    assert not breaker.allow()
+    assert breaker.rejected == 1
+
+    clock.now = 30
+    assert breaker.state == "half_open"
+    assert breaker.allow()  # één proefrequest
+    assert not breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == "open"
+
+    clock.now = 60
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == "closed"
+    assert breaker.transitions == {"closed": 1, "half_open": 2, "open": 2}
+
+
+def test_retry_budget_limits_retries_to_ratio_of_requests():
+    clock = FakeClock()
+    budget = RetryBudget(ratio=0.1, min_retries=1, window=10, clock=clock)
+    for _ in range(20):
+        budget.record_request()
+    spent = sum(budget.try_spend() for _ in range(10))
+    assert spent == 3  # 1 + 10% van 20
+    assert budget.exhausted == 7
+    clock.now = 11  # venster verstreken
+    assert budget.try_spend()
+
+
+def test_guard_does_not_retry_client_errors_or_count_them_as_failures():
+    guard = UpstreamGuard(CircuitBreaker(failure_threshold=1), retries=3)
+    request = httpx.Request("GET", "https://psalmboek.nl/psalmen.php")
+    calls = []
+
+    def not_found(timeout):
+        calls.append(timeout)
+        raise httpx.HTTPStatusError("404", request=request, response=httpx.Response(404, request=request))
+
+    with pytest.raises(httpx.HTTPStatusError):
+        guard.call(not_found)
+    assert len(calls) == 1
+    assert guard.breaker.state == "closed"
+
+
+def test_deadline_caps_timeout_and_stops_new_attempts():
+    guard = UpstreamGuard(timeout=15)
+    timeouts = []
+    with deadline(2):
+        with deadline(5):  # de strengste deadline wint
+            assert remaining() <= 2
+            guard.call(lambda timeout: timeouts.append(timeout))
+    assert remaining() is None
+    assert 0 < timeouts[0] <= 2
+
+    with deadline(0):
+        with pytest.raises(DeadlineExceeded):
+            guard.call(lambda timeout: timeouts.append(timeout))
+    assert len(timeouts) == 1
+    assert guard.stats()["deadline_exceeded"] == 1
+
+
+def test_timeout_shortened_by_caller_deadline_is_not_a_breaker_failure():
+    guard = UpstreamGuard(CircuitBreaker(failure_threshold=1, reset_timeout=60), retries=2, timeout=15)
+    calls = []
+
+    def slow(timeout):
+        calls.append(timeout)
+        raise TimeoutError("te traag")
+
+    for _ in range(3):
+        with deadline(0.05, caller=True):
+            with pytest.raises(DeadlineExceeded, match="Deadline van het verzoek"):
+                guard.call(slow)
+    assert len(calls) == 3  # geen retries op een door de beller ingekorte poging
+    assert guard.breaker.state == "closed"
+    assert guard.stats()["deadline_exceeded"] == 3
+
+    with pytest.raises((TimeoutError, CircuitOpenError)):  # zonder deadline telt een timeout wél
+        guard.call(slow)
+    assert guard.breaker.state == "open"
+
+
+def test_timeouts_under_the_default_request_deadline_open_the_breaker():
+    from config import settings
+
+    # Standaardinstellingen: de serverdeadline (10 s) is korter dan de upstream-timeout (15 s),
+    # maar een timeout binnen die deadline is een echte fout van de bron.
+    breaker = CircuitBreaker(settings.UPSTREAM_BREAKER_FAILURES, settings.UPSTREAM_BREAKER_RESET_SECONDS)
+    guard = UpstreamGuard(breaker, timeout=settings.UPSTREAM_TIMEOUT_SECONDS, retries=0)
+    assert settings.REQUEST_DEADLINE_SECONDS < settings.UPSTREAM_TIMEOUT_SECONDS
+
+    def slow(timeout):
+        raise TimeoutError("te traag")
+
+    for _ in range(settings.UPSTREAM_BREAKER_FAILURES):
+        with deadline(settings.REQUEST_DEADLINE_SECONDS):
+            with pytest.raises(TimeoutError) as raised:
+                guard.call(slow)
+        assert not isinstance(raised.value, DeadlineExceeded)
+    assert guard.breaker.state == "open"
+    assert guard.stats()["deadline_exceeded"] == 0
+
+
+def test_hedged_request_wins_when_first_is_slow():
+    guard = UpstreamGuard(hedge=True, hedge_min_delay=0.01)
+    for _ in range(guard.latency.min_samples):
+        guard.latency.observe(0.01)
+    started = []
+
+    async def fetch(timeout):
+        started.append(timeout)
+        await asyncio.sleep(1.0 if len(started) == 1 else 0.0)
+        return len(started)
+
+    assert asyncio.run(guard.acall(fetch)) == 2
+    stats = guard.stats()
+    assert stats["hedges"] == 1 and stats["hedge_wins"] == 1
+
+
+# --- fault-injection tegen de lokale psalmboek.nl-stub ----------------------
+
+
+def _guarded_client(stub, **client_kwargs):
+    guard = UpstreamGuard(CircuitBreaker(failure_threshold=2, reset_timeout=60), retries=0)
+    return PsalmboekClient(stub.base_url, "1773", resilience=guard, **client_kwargs)
+
+
+def test_open_breaker_fails_fast_without_contacting_stub():
+    from psalmboek_stub import PsalmboekStub
+
+    with PsalmboekStub(error_rate=1.0) as stub:
+        client = _guarded_client(stub)
+        for _ in range(2):
+            with pytest.raises(httpx.HTTPStatusError):
+                client.get_max_vers(23)
+        assert stub.request_count == 2
+        assert client.resilience_stats()["state"] == "open"
+
+        stub.error_rate = 0.0  # bron is hersteld, maar de breaker laat nog niets door
+        with pytest.raises(CircuitOpenError):
+            client.get_max_vers(23)
+        assert stub.request_count == 2
+        assert client.resilience_stats()["rejected"] == 1
+
+
+def test_open_breaker_serves_last_known_vers_map_stale(tmp_path):
+    from psalmboek_stub import PsalmboekStub
+
+    from sqlite_cache import SqliteVerseCache
+
+    with PsalmboekStub() as stub:
+        disk = SqliteVerseCache(str(tmp_path / "verses.sqlite3"))
+        client = _guarded_client(stub, cache_seconds=1, disk_cache=disk)
+        expected = client.get_vers_map(23)
+        # Alsof de entry in het geheugen verdrongen is en die in SQLite verlopen.
+        client._cache.clear()
+        disk.put("1773", 23, expected, fetched_at=time.time() - 60)
+        stub.error_rate = 1.0
+        client.resilience.breaker.record_failure()
+        client.resilience.breaker.record_failure()
+
+        assert asyncio.run(client.aget_vers_map(23)) == expected
+        assert stub.request_count == 1
+        assert client.resilience_stats()["stale_served"] == 1
+
+
+def test_lookup_returns_verification_failed_while_breaker_open(monkeypatch):
+    from fastapi.testclient import TestClient
+    from psalmboek_stub import PsalmboekStub
+
+    import main
+
+    with PsalmboekStub(error_rate=1.0) as stub:
+        client = _guarded_client(stub)
+        monkeypatch.setattr(main, "client", client)
+        monkeypatch.setattr(main, "max_verses", None)
+        http = TestClient(main.app)
+        for _ in range(2):
+            assert http.get("/api/psalm/lookup", params={"query": "psalm 23:1"}).status_code == 502
+        response = http.get("/api/psalm/lookup", params={"query": "psalm 23:1"})
+        assert stub.request_count == 2
+
+    assert response.status_code == 502
+    assert response.json()["status"] == "verification_failed"
+    assert response.headers["Cache-Control"] == "no-store"
+    exported = http.get("/metrics").text
+    assert "psalm_upstream_breaker_state 2" in exported
+    assert 'psalm_upstream_guard_events_total{event="rejected"} 1' in exported
+
+
+def test_short_request_timeout_header_does_not_open_breaker(monkeypatch):
+    from fastapi.testclient import TestClient
+    from psalmboek_stub import PsalmboekStub
+
+    import main
+    from config import settings
+
+    monkeypatch.setattr(settings, "REQUEST_TIMEOUT_FLOOR_SECONDS", 0.01)
+    with PsalmboekStub(delay=0.2) as stub:
+        client = _guarded_client(stub)
+        monkeypatch.setattr(main, "client", client)
+        monkeypatch.setattr(main, "max_verses", None)
+        http = TestClient(main.app)
+        for _ in range(5):
+            response = http.get(
+                "/api/psalm/lookup", params={"query": "psalm 23:1"}, headers={"X-Request-Timeout": "0.01"}
+            )
+            assert response.status_code != 200
+        assert client.resilience_stats()["state"] == "closed"
+        assert http.get("/api/psalm/lookup", params={"query": "psalm 23:1"}).status_code == 200
+
+
+def test_request_timeout_header_has_a_floor(monkeypatch):
+    from fastapi.testclient import TestClient
+    from psalmboek_stub import PsalmboekStub
+
+    import main
+
+    with PsalmboekStub(delay=0.05) as stub:
+        monkeypatch.setattr(main, "client", _guarded_client(stub))
+        monkeypatch.setattr(main, "max_verses", None)
+        http = TestClient(main.app)
+        response = http.get("/api/psalm/lookup", params={"query": "psalm 23:1"}, headers={"X-Request-Timeout": "0.01"})
+    assert response.status_code == 200
+
+
+def test_deep_healthz_probe_is_cached_and_respects_breaker(monkeypatch):
+    from fastapi.testclient import TestClient
+    from psalmboek_stub import PsalmboekStub
+
+    import main
+
+    with PsalmboekStub() as stub:
+        client = _guarded_client(stub)
+        monkeypatch.setattr(main, "client", client)
+        http = TestClient(main.app)
+        for _ in range(3):
+            assert http.get("/healthz", params={"deep": "1"}).json()["upstream"]["reachable"] is True
+        assert stub.request_count == 1
+
+        client._probe = None  # cache verlopen; de breaker staat inmiddels open
+        client.resilience.breaker.record_failure()
+        client.resilience.breaker.record_failure()
+        data = http.get("/healthz", params={"deep": "1"}).json()
+        assert stub.request_count == 1
+
+    assert data["status"] == "degraded"
+    assert data["upstream"] == {"reachable": False, "error": "CircuitOpenError"}
@@ -0,0 +1,153 @@
+import json
+import pathlib
+import sys
+
+import pytest
+
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from response_cache import ResponseCache, cache_key, encode_json  # noqa: E402
+
+try:
+    from fastapi.testclient import TestClient
+
+    import main
+except ImportError:  # pragma: no cover - allows skipping when deps ontbreken
+    TestClient = None  # type: ignore[assignment]
+
+PSALM_23 = {1: "De Heer is mijn Herder", 2: "Hij doet mij nederliggen", 3: "Hij verkwikt mijn ziel"}
+KEY = cache_key("1773", {"psalm_number": 23, "verses": [1, 2]})
+
+
+def test_encode_json_matches_json_response_rendering():
+    payload = {"status": "ok", "result": {"verses": [{"verse": 1, "text": "'k Hijg naar U, ó Heer"}]}}
+    expected = json.dumps(payload, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+    assert encode_json(payload) == expected
+
+
+def test_changed_vers_map_invalidates_only_that_psalm():
+    cache = ResponseCache(600)
+    cache.on_vers_map(23, PSALM_23)
+    assert cache.put("ps 23:1-2", KEY, 23, cache.generation(23), b"{}", {}, '"a"')
+    other = cache_key("1773", {"psalm_number": 121, "verses": [1]})
+    cache.put("ps 121:1", other, 121, cache.generation(121), b"[]", {})
+
+    # Ongewijzigde refresh laat de entry staan.
+    cache.on_vers_map(23, dict(PSALM_23))
+    assert cache.get("ps 23:1-2").body == b"{}"
+
+    cache.on_vers_map(23, {**PSALM_23, 2: "Hij doet mij neerliggen"})
+    assert cache.get("ps 23:1-2") is None
+    assert cache.get_key(KEY) is None
+    assert cache.get("ps 121:1").body == b"[]"
+    assert cache.stats()["invalidations"] == 1
+
+
+def test_put_with_stale_generation_is_ignored():
+    cache = ResponseCache(600)
+    cache.on_vers_map(23, PSALM_23)
+    generation = cache.generation(23)
+    # Tijdens het opbouwen van het antwoord komt een nieuwe versmap binnen.
+    cache.on_vers_map(23, {**PSALM_23, 2: "Hij doet mij neerliggen"})
+    assert cache.put("ps 23:1-2", KEY, 23, generation, b"{}", {}) is False
+    assert cache.get("ps 23:1-2") is None
+
+
+def test_first_vers_map_does_not_bump_generation():
+    cache = ResponseCache(600)
+    generation = cache.generation(23)
+    # Het eerste 200-antwoord: generatie gelezen vóór de fetch die de versmap voor het eerst publiceert.
+    cache.on_vers_map(23, PSALM_23)
+    assert cache.generation(23) == generation
+    assert cache.put("ps 23:1-2", KEY, 23, generation, b"{}", {}) is True
+    assert cache.get("ps 23:1-2").body == b"{}"
+
+
+def test_disabled_cache_stores_nothing():
+    cache = ResponseCache(600, max_entries=0)
+    assert cache.put("ps 23:1-2", KEY, 23, 0, b"{}", {}) is False
+    assert cache.get("ps 23:1-2") is None
+
+
+@pytest.fixture()
+def lookup(monkeypatch):
+    calls = []
+
+    async def fake_verses(psalm, verses):
+        calls.append(psalm)
+        return {v: PSALM_23[v] for v in verses}
+
+    monkeypatch.setattr("main.client.aget_verses", fake_verses)
+    return TestClient(main.app), main.response_cache, calls
+
+
+@pytest.mark.skipif(TestClient is None, reason="fastapi niet geïnstalleerd")
+def test_repeated_lookup_is_served_from_cache(lookup, monkeypatch):
+    http, cache, calls = lookup
+    first = http.get("/api/psalm/lookup", params={"query": "ps 23:1-2"})
+    assert first.status_code == 200
+
+    def no_parse(query):
+        raise AssertionError("cache-hit hoort niet te parsen")
+
+    monkeypatch.setattr(main, "_parse_lookup", no_parse)
+    monkeypatch.setattr(main, "_validate", no_parse)
+    second = http.get("/api/psalm/lookup", params={"query": "ps 23:1-2"})
+    assert second.status_code == 200
+    assert second.content == first.content
+    assert second.headers["etag"] == first.headers["etag"]
+    assert second.headers["cache-control"] == first.headers["cache-control"]
+    assert calls == [23]
+
+    conditional = {"If-None-Match": first.headers["etag"]}
+    revalidated = http.get("/api/psalm/lookup", params={"query": "ps 23:1-2"}, headers=conditional)
+    assert revalidated.status_code == 304
+    assert cache.stats()["hits"] == 2
+
+
+@pytest.mark.skipif(TestClient is None, reason="fastapi niet geïnstalleerd")
+def test_other_spelling_hits_normalized_key_and_new_vers_map_refetches(lookup):
+    http, cache, calls = lookup
+    cache.on_vers_map(23, PSALM_23)  # wat de echte client bij de fetch publiceert
+    first = http.get("/api/psalm/lookup", params={"query": "ps 23:1-2"})
+    again = http.get("/api/psalm/lookup", params={"query": "Psalm 23 vers 1 en 2"})
+    assert again.content == first.content
+    assert calls == [23]
+
+    cache.on_vers_map(23, {**PSALM_23, 1: "De HEERE is mijn Herder"})
+    http.get("/api/psalm/lookup", params={"query": "Psalm 23 vers 1 en 2"})
+    assert calls == [23, 23]
+
+
+def test_async_fill_hashes_vers_map_once_and_off_the_event_loop(monkeypatch):
+    import asyncio
+    import threading
+
+    import sqlite_cache
+    from psalm_client import PsalmboekClient
+    from psalmboek_stub import render_page
+
+    digests = []
+    digest = sqlite_cache._digest
+    monkeypatch.setattr(
+        sqlite_cache, "_digest", lambda vers_map: digests.append(threading.get_ident()) or digest(vers_map)
+    )
+    client = PsalmboekClient("https://psalmboek.test", "1773", cache_seconds=600)
+    cache = ResponseCache(600)
+    client.subscribe(cache.on_vers_map)
+
+    async def fake_fetch(psalm, previous=None):
+        return render_page(PSALM_23)
+
+    monkeypatch.setattr(client, "_afetch_overview", fake_fetch)
+
+    async def scenario():
+        await client.aget_vers_map(23)
+        return threading.get_ident()
+
+    loop_thread = asyncio.run(scenario())
+    assert len(digests) == 1
+    assert digests[0] != loop_thread
+    assert cache._versions[23] == digest(PSALM_23)
@@ -0,0 +1,93 @@
+import pathlib
+import sys
+
+import pytest
+
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from response_validation import ResponseValidator, compile_schema, ensure_response_matches_schema
+
+
+def _payload(**overrides):
+    payload = {
+        "intent": "psalm_lookup_1773",
+        "status": "ok",
+        "request": {"psalm_number": 23, "verses": [1, 2]},
+        "result": {"verified": True, "verses": [{"verse": 1, "text": "a"}, {"verse": 2, "text": "b"}]},
+    }
+    payload.update(overrides)
+    return payload
+
+
+@pytest.mark.parametrize(
+    "payload,message",
+    [
+        (_payload(intent="iets_anders"), "intent"),
+        (_payload(status="onbekend"), "status"),
+        (_payload(extra=1), "onbekende velden"),
+        (_payload(request={"psalm_number": 151, "verses": [1]}), "request.psalm_number"),
+        (_payload(request={"psalm_number": 23, "verses": []}), "request.verses: minimaal 1"),
+        (_payload(request={"psalm_number": 23, "verses": [1, 1]}), "uniek"),
+        (_payload(request={"psalm_number": 23, "verses": [True]}), "request.verses[0]"),
+        (_payload(result={"verses": [{"verse": 1}]}), "result.verses[0].text: ontbreekt"),
+        (_payload(result={"message": 3}), "result.message"),
+    ],
+)
+def test_schema_violations(payload, message):
+    with pytest.raises(ValueError, match=message.replace("[", r"\[").replace("]", r"\]")):
+        ensure_response_matches_schema(payload)
+
+
+def test_conditional_overrides_min_items_for_invalid_request():
+    ensure_response_matches_schema(
+        _payload(status="invalid_request", request={"psalm_number": 1, "verses": []}, result={"message": "leeg"})
+    )
+
+
+def test_unknown_keyword_fails_at_compile_time():
+    with pytest.raises(ValueError, match="pattern"):
+        compile_schema({"type": "string", "pattern": "^a"})
+
+
+def test_validator_modes():
+    calls = []
+    draws = iter([0.5, 0.01])
+
+    sampled = ResponseValidator(calls.append, mode="sampled", sample_rate=0.1, rng=lambda: next(draws))
+    assert sampled.validate({}) is None
+    assert sampled.validate({}) is not None
+    assert len(calls) == 1
+    assert sampled.stats()["checked"] == 1 and sampled.stats()["skipped"] == 1
+
+    off = ResponseValidator(calls.append, mode="off")
+    off.validate({})
+    assert len(calls) == 1
+
+    with pytest.raises(ValueError):
+        ResponseValidator(mode="soms")
+
+
+def test_validator_counts_failures():
+    validator = ResponseValidator(mode="full")
+    with pytest.raises(ValueError):
+        validator.validate({"intent": "x"})
+    assert validator.stats()["failed"] == 1
+    assert validator.stats()["checked"] == 1
+
+
+def test_stream_check_validates_records_and_counts_one_response():
+    validator = ResponseValidator(mode="full")
+    check = validator.stream()
+    check.request({"psalm_number": 119, "verses": [1, 2]})
+    check.verse({"verse": 1, "text": "a"})
+    with pytest.raises(ValueError, match=r"result\.verses\[\*\]\.verse"):
+        check.verse({"verse": 0, "text": "b"})
+    with pytest.raises(ValueError, match="status"):
+        check.status("misschien")
+    check.close()
+    check.close()
+    assert validator.stats()["checked"] == 1
+    assert validator.stats()["failed"] == 1
+    assert ResponseValidator(mode="off").stream() is None
@@ -0,0 +1,105 @@
+import pathlib
+import sys
+
+import pytest
+
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+TESTS = pathlib.Path(__file__).resolve().parent
+if str(TESTS) not in sys.path:
+    sys.path.insert(0, str(TESTS))
+
+from search_index import SearchIndex, parse_query, tokenize  # noqa: E402
+
+try:
+    from fastapi.testclient import TestClient
+
+    import main
+except ImportError:  # pragma: no cover - allows skipping when deps ontbreken
+    TestClient = None  # type: ignore[assignment]
+
+PSALM_42 = {
+    1: "'k Hijg naar U, o Heer, gelijk een hert\nDat naar de waterstromen smacht",
+    2: "Mijn ziel dorst naar God, den levenden God",
+}
+PSALM_121 = {
+    1: "Ik hef mijn ogen op naar 't hooggebergte,\nVanwaar mij hulp zal komen",
+    2: "De HEER is uw bewaarder; 't is de HEER,\nDie u beschaduwt",
+}
+PSALM_23 = {
+    1: "De Heer is mijn Herder, ik zal niet ontberen",
+    4: "Gelijk een hert, dat zoekt naar frisse stromen",
+}
+
+
+@pytest.fixture()
+def index():
+    index = SearchIndex()
+    index.add_many([(42, PSALM_42), (121, PSALM_121), (23, PSALM_23)])
+    return index
+
+
+def test_tokenize_ignores_case_and_diacritics():
+    assert tokenize("Één HEER, gelijk een hért!") == ["een", "heer", "gelijk", "een", "hert"]
+
+
+def test_parse_query_marks_last_word_and_starred_words_as_prefix():
+    phrases, words = parse_query('"mijn ogen" hef* o')
+    assert [[t.text for t in phrase] for phrase in phrases] == [["mijn", "ogen"]]
+    # "o" is te kort voor een prefix
+    assert [(t.text, t.prefix) for t in words] == [("hef", True), ("o", False)]
+    assert parse_query("ik hef mijn og")[1][-1].prefix
+    assert not parse_query("ik hef mijn og ")[1][-1].prefix
+
+
+def test_phrase_match_ranks_incipit_first(index):
+    hits = index.search("Gelijk een hert")
+    assert [(hit.psalm, hit.vers) for hit in hits] == [(23, 4), (42, 1)]
+    assert hits[0].text.startswith("Gelijk een hert")
+    assert hits[0].score > hits[1].score
+
+
+def test_quoted_phrase_requires_order_and_adjacency(index):
+    assert [(hit.psalm, hit.vers) for hit in index.search('"mijn ogen"')] == [(121, 1)]
+    assert index.search('"ogen mijn"') == []
+
+
+def test_prefix_matching_on_last_word(index):
+    assert [(hit.psalm, hit.vers) for hit in index.search("ik hef mijn og")] == [(121, 1)]
+    assert index.search("ik hef mijn og ") == []
+    assert {(hit.psalm, hit.vers) for hit in index.search("water*")} == {(42, 1)}
+
+
+def test_reindexing_a_psalm_replaces_its_verses(index):
+    index.add_psalm(42, {1: "Een geheel nieuwe tekst"})
+    assert index.search("waterstromen") == []
+    assert [(hit.psalm, hit.vers) for hit in index.search("nieuwe tekst")] == [(42, 1)]
+    assert len(index) == 5 and index.psalms == 3
+
+
+def test_client_publishes_extracted_vers_maps_to_index():
+    from psalm_client import PsalmboekClient
+    from psalmboek_stub import PsalmboekStub, fixture_pages
+
+    index = SearchIndex()
+    with PsalmboekStub(fixture_pages()) as stub:
+        client = PsalmboekClient(stub.base_url, "1773", cache_seconds=600)
+        client.subscribe(index.add_psalm)
+        vers_map = client.get_vers_map(23)
+        client.get_vers_map(23)  # cache-hit: niet opnieuw gemeld
+    assert index.psalms == 1 and len(index) == len(vers_map)
+    first_words = " ".join(tokenize(vers_map[1])[:3])
+    assert (23, 1) in [(hit.psalm, hit.vers) for hit in index.search(f'"{first_words}"')]
+
+
+@pytest.mark.skipif(TestClient is None, reason="fastapi niet geïnstalleerd")
+def test_search_endpoint_returns_lookup_payloads(index, monkeypatch):
+    monkeypatch.setattr(main, "search_index", index)
+    response = TestClient(main.app).get("/api/psalm/search", params={"q": "Ik hef mijn ogen", "limit": 5})
+    assert response.status_code == 200
+    body = response.json()
+    assert body["indexed_psalms"] == 3
+    assert [result["response"]["request"] for result in body["results"]] == [{"psalm_number": 121, "verses": [1]}]
+    verse = body["results"][0]["response"]["result"]["verses"][0]
+    assert verse == {"verse": 1, "text": PSALM_121[1]}
@@ -0,0 +1,150 @@
+import asyncio
+import pathlib
+import sys
+import time
+
+import pytest
+
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+TESTS = pathlib.Path(__file__).resolve().parent
+if str(TESTS) not in sys.path:
+    sys.path.insert(0, str(TESTS))
+
+from max_verses import MaxVerseTable, load_table, write_table  # noqa: E402
+from sources import GEZANGEN_1938, PSALMEN_1773, Source, SourceRegistry, UnknownSource  # noqa: E402
+
+try:
+    from fastapi.testclient import TestClient
+    from psalm_client import PsalmboekClient
+
+    import main
+except ImportError:  # pragma: no cover - allows skipping when deps ontbreken
+    TestClient = None  # type: ignore[assignment]
+
+GEZANG_URL = "{base}/psalmen.php?berijming=gezangen&psalm={number}"
+
+
+def _registry(stub, *, psalm_entries=512, gezang_entries=512, max_verses=None):
+    psalmen = PsalmboekClient(stub.base_url, "1773", cache_seconds=600, cache_max_entries=psalm_entries)
+    gezangen = PsalmboekClient(
+        stub.base_url, GEZANGEN_1938, cache_seconds=600, cache_max_entries=gezang_entries, url_template=GEZANG_URL
+    )
+    registry = SourceRegistry()
+    registry.register(Source(PSALMEN_1773, "Psalm", psalmen, count=150), default=True)
+    registry.register(Source(GEZANGEN_1938, "Gezang", gezangen, count=306, max_verses=max_verses))
+    return registry
+
+
+class _FakeClient:
+    def cache_stats(self):
+        return {"memory": {"entries": 0, "bytes": 0}}
+
+
+def test_registry_lookup_and_default():
+    registry = SourceRegistry()
+    first = registry.register(Source("a", "A", _FakeClient(), count=3))
+    registry.register(Source("b", "B", _FakeClient(), count=3, page_url=lambda n: f"https://b.test/{n}"))
+    assert registry.default is first
+    assert registry.names() == ["a", "b"] and "b" in registry and len(registry) == 2
+    assert registry.get("b").url(2, 5) == "https://b.test/2#5"
+    with pytest.raises(UnknownSource):
+        registry.get("c")
+    with pytest.raises(ValueError):
+        registry.register(Source("a", "A", _FakeClient(), count=1))
+    with pytest.raises(ValueError, match="B 4 bestaat niet"):
+        registry.get("b").check(4)
+
+
+@pytest.mark.skipif(TestClient is None, reason="fastapi/httpx niet geïnstalleerd")
+def test_gezangen_are_off_by_default_and_get_their_own_engine():
+    from config import Settings
+    from psalm_client import build_client
+
+    assert Settings().GEZANGEN_ENABLED is False
+    assert GEZANGEN_1938 not in main.sources
+    client = build_client(GEZANGEN_1938, url_template=GEZANG_URL, extraction_engine="bs4")
+    assert client.extraction_engine == "bs4"
+    assert client.page_url(12).endswith("berijming=gezangen&psalm=12")
+
+
+def test_max_verse_table_accepts_numbers_up_to_collection_size(tmp_path):
+    path = tmp_path / "max_verses_gezangen_1938.json"
+    write_table(path, MaxVerseTable(GEZANGEN_1938, {300: 4}))
+    assert load_table(GEZANGEN_1938, path, max_number=306).get(300) == 4
+    with pytest.raises(ValueError):
+        load_table(GEZANGEN_1938, path)
+
+
+@pytest.mark.skipif(TestClient is None, reason="httpx niet geïnstalleerd")
+def test_psalm_traffic_cannot_evict_gezangen():
+    from psalmboek_stub import PsalmboekStub
+
+    with PsalmboekStub() as stub:
+        registry = _registry(stub, psalm_entries=2, gezang_entries=2)
+        gezangen = registry.get(GEZANGEN_1938)
+        asyncio.run(gezangen.aget_vers_map(12))
+        for psalm in range(1, 8):
+            asyncio.run(registry.get(PSALMEN_1773).aget_vers_map(psalm))
+        before = stub.request_count
+        asyncio.run(gezangen.aget_vers_map(12))
+        assert stub.request_count == before
+    assert registry.get(PSALMEN_1773).cache_stats()["memory"]["entries"] == 2
+    assert gezangen.cache_stats()["memory"]["entries"] == 1
+
+
+@pytest.mark.skipif(TestClient is None, reason="httpx niet geïnstalleerd")
+def test_fetch_many_fans_out_across_sources():
+    from psalmboek_stub import PsalmboekStub
+
+    with PsalmboekStub(delay=0.2) as stub:
+        registry = _registry(stub)
+        keys = [(PSALMEN_1773, 23), (GEZANGEN_1938, 5), (PSALMEN_1773, 23), ("liedboek", 1), (GEZANGEN_1938, 400)]
+        started = time.perf_counter()
+        results = asyncio.run(registry.afetch_many(keys, concurrency=1))
+        elapsed = time.perf_counter() - started
+        assert stub.request_count == 2
+    assert elapsed < 0.38
+    assert results[(PSALMEN_1773, 23)][1].startswith("Psalm 23 vers 1")
+    assert results[(GEZANGEN_1938, 5)][1].startswith("Psalm 5 vers 1")
+    assert isinstance(results[("liedboek", 1)], UnknownSource)
+    assert isinstance(results[(GEZANGEN_1938, 400)], ValueError)
+
+
+@pytest.mark.skipif(TestClient is None, reason="fastapi niet geïnstalleerd")
+def test_source_endpoints(monkeypatch):
+    from psalmboek_stub import PsalmboekStub
+
+    with PsalmboekStub() as stub:
+        registry = _registry(stub, max_verses=MaxVerseTable(GEZANGEN_1938, {3: 6}))
+        monkeypatch.setattr(main, "sources", registry)
+        http = TestClient(main.app)
+
+        listing = http.get("/api/bronnen").json()
+        assert listing["standaard"] == PSALMEN_1773
+        assert [source["naam"] for source in listing["bronnen"]] == [PSALMEN_1773, GEZANGEN_1938]
+
+        response = http.get(f"/api/bronnen/{GEZANGEN_1938}/3", params=[("vers", 2), ("vers", 1)])
+        assert response.status_code == 200
+        body = response.json()
+        assert body["status"] == "ok" and [v["verse"] for v in body["verses"]] == [1, 2]
+        assert body["bron_url"].endswith("berijming=gezangen&psalm=3")
+
+        beyond = http.get(f"/api/bronnen/{GEZANGEN_1938}/3", params={"vers": 7})
+        assert (beyond.status_code, beyond.json()["message"]) == (404, "Vers 7 van Gezang 3 kon niet worden opgehaald.")
+        assert http.get("/api/bronnen/liedboek/1").json()["status"] == "unknown_source"
+
+        batch = http.post(
+            "/api/bronnen/lookup",
+            json={
+                "items": [
+                    {"bron": PSALMEN_1773, "nummer": 23, "verzen": [1]},
+                    {"bron": GEZANGEN_1938, "nummer": 3},
+                    {"bron": GEZANGEN_1938, "nummer": 307},
+                ]
+            },
+        ).json()["results"]
+        assert stub.request_count == 2
+    assert [item["status_code"] for item in batch] == [200, 200, 404]
+    assert len(batch[1]["response"]["verses"]) == 6
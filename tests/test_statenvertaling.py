@@ -0,0 +1,90 @@
+import pathlib
+import sys
+
+import pytest
+
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from statenvertaling import StatenvertalingIndex, alias_key, open_statenvertaling, parse_ref  # noqa: E402
+
+try:
+    from fastapi.testclient import TestClient
+
+    import main
+except ImportError:  # pragma: no cover - allows skipping when deps ontbreken
+    TestClient = None  # type: ignore[assignment]
+
+FIXTURE = ROOT / "tests" / "fixtures" / "nl_Statenvertaling_fragment.txt"
+
+
+@pytest.fixture(scope="module")
+def bible():
+    index = StatenvertalingIndex(FIXTURE)
+    yield index
+    index.close()
+
+
+def test_index_reads_prefixed_lines_and_book_headers(bible):
+    assert len(bible) == 9
+    psalmen = bible.book("Psalmen")
+    assert bible.verse(psalmen, 23, 1) == "Een psalm van David. De HEERE is mijn Herder, mij zal niets ontbreken."
+    assert bible.verse(bible.book("Johannes"), 3, 18) is None
+
+
+@pytest.mark.parametrize("name", ["Joh.", "Joh", "johannes", "JOHANNES", "Jh"])
+def test_book_aliases(bible, name):
+    assert bible.books[bible.book(name)] == "Johannes"
+
+
+def test_numbered_books_and_diacritics():
+    assert alias_key("1 Joh.") == alias_key("1Joh") == "1joh"
+    assert alias_key("Ezechiël") == "ezechiel"
+    assert parse_ref("1 Joh. 4:8") == ("1 Joh.", 4, 8, 8)
+    assert parse_ref("Psalm 23: 1 - 3") == ("Psalm", 23, 1, 3)
+    assert parse_ref("Psalm 23") is None
+
+
+def test_resolve_range_quotes_text_exactly(bible):
+    resolved = bible.resolve("Psalm 23:1-3").to_dict()
+    assert resolved["status"] == "ok"
+    assert resolved["citation"] == "Psalmen 23:1-3"
+    assert [verse["verse"] for verse in resolved["verses"]] == [1, 2, 3]
+    expected = FIXTURE.read_text(encoding="utf-8").splitlines()[8]
+    assert resolved["verses"][1]["text"] == expected.split(" ", 1)[1]
+
+
+@pytest.mark.parametrize(
+    "ref,status",
+    [
+        ("Johannes 3:18", "not_found"),
+        ("Openbaring 1:1", "not_found"),
+        ("Henoch 1:1", "invalid_ref"),
+        ("Ps 23:3-1", "invalid_ref"),
+    ],
+)
+def test_resolve_errors(bible, ref, status):
+    assert bible.resolve(ref).status == status
+
+
+def test_missing_file_gives_none(tmp_path):
+    assert open_statenvertaling(tmp_path / "ontbreekt.txt") is None
+
+
+@pytest.mark.skipif(TestClient is None, reason="fastapi niet geïnstalleerd")
+def test_refs_endpoint_resolves_batch(bible, monkeypatch):
+    monkeypatch.setattr(main, "bible", bible)
+    response = TestClient(main.app).post("/api/bijbel/refs", json={"refs": ["Johannes 3:16", "1 Joh. 4:8", "Joh 9:99"]})
+    assert response.status_code == 200
+    results = response.json()["results"]
+    assert [result["status"] for result in results] == ["ok", "ok", "not_found"]
+    assert results[1]["verses"] == [
+        {"verse": 8, "text": "Die niet liefheeft, die heeft God niet gekend; want God is liefde."}
+    ]
+
+
+@pytest.mark.skipif(TestClient is None, reason="fastapi niet geïnstalleerd")
+def test_refs_endpoint_without_text_is_unavailable(monkeypatch):
+    monkeypatch.setattr(main, "bible", None)
+    assert TestClient(main.app).post("/api/bijbel/refs", json={"refs": ["Johannes 3:16"]}).status_code == 503
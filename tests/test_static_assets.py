@@ -0,0 +1,104 @@
+import gzip
+import json
+import pathlib
+import subprocess
+import sys
+
+import pytest
+
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+try:
+    from fastapi.testclient import TestClient
+    from main import OPENAPI_YAML, PLUGIN_MANIFEST, SVG_LOGO, app
+    from static_assets import StaticAsset, accepted_encodings
+except ImportError:  # pragma: no cover - allows skipping when deps ontbreken
+    TestClient = None  # type: ignore[assignment]
+    app = None  # type: ignore[assignment]
+
+pytestmark = pytest.mark.skipif(TestClient is None or app is None, reason="fastapi niet geïnstalleerd")
+
+
+@pytest.mark.parametrize(
+    "header,expected",
+    [
+        (None, []),
+        ("gzip, deflate", ["gzip", "deflate"]),
+        ("gzip;q=0.5, br", ["br", "gzip"]),
+        ("br;q=0, gzip", ["gzip"]),
+        ("deflate, gzip, br", ["br", "gzip", "deflate"]),
+    ],
+)
+def test_accepted_encodings_orders_by_quality(header, expected):
+    assert accepted_encodings(header) == expected
+
+
+def test_asset_precomputes_variants_and_skips_useless_compression():
+    asset = StaticAsset("x" * 2000, "text/plain")
+    assert gzip.decompress(asset.bodies["gzip"]) == b"x" * 2000
+    assert asset.encoding("gzip") == "gzip"
+    assert asset.encoding("identity") == "identity"
+    assert "gzip" not in StaticAsset("x", "text/plain").bodies
+
+
+@pytest.mark.parametrize(
+    "path,media_type",
+    [
+        ("/openapi.yaml", "application/yaml"),
+        ("/.well-known/ai-plugin.json", "application/json"),
+        ("/static/logo.svg", "image/svg+xml"),
+    ],
+)
+def test_static_routes_send_etag_and_revalidate(path, media_type):
+    http = TestClient(app)
+    response = http.get(path)
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith(media_type)
+    assert "Accept-Encoding" in response.headers["vary"]
+    etag = response.headers["etag"]
+
+    again = http.get(path, headers={"If-None-Match": etag})
+    assert again.status_code == 304
+    assert again.content == b""
+    assert again.headers["etag"] == etag
+
+
+def test_each_encoding_has_its_own_strong_etag():
+    asset = StaticAsset("x" * 2000, "text/plain")
+    assert len(set(asset.etags.values())) == len(asset.bodies) >= 2
+    gzip_etag = asset.etags["gzip"]
+
+    assert asset.response("gzip", gzip_etag).status_code == 304
+    # De ETag van de gzip-body valideert de ongecomprimeerde variant niet, en andersom.
+    identity = asset.response("identity", gzip_etag)
+    assert identity.status_code == 200
+    assert identity.headers["etag"] == asset.etag
+    assert asset.response("gzip", asset.etag).headers["content-encoding"] == "gzip"
+    not_modified = asset.response("gzip", gzip_etag)
+    assert not_modified.headers["etag"] == gzip_etag
+    assert "content-encoding" not in not_modified.headers
+
+
+def test_static_content_is_unchanged_and_compressed_when_accepted():
+    http = TestClient(app)
+    plain = http.get("/openapi.yaml", headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in plain.headers
+    assert plain.text == OPENAPI_YAML
+
+    compressed = http.get("/openapi.yaml", headers={"Accept-Encoding": "gzip"})
+    assert compressed.headers["content-encoding"] == "gzip"
+    assert int(compressed.headers["content-length"]) < len(OPENAPI_YAML.encode("utf-8"))
+    assert compressed.text == OPENAPI_YAML
+
+    assert compressed.headers["etag"] != plain.headers["etag"]
+
+    assert http.get("/.well-known/ai-plugin.json").json() == json.loads(json.dumps(PLUGIN_MANIFEST))
+    assert http.get("/static/logo.svg").text == SVG_LOGO
+
+
+def test_importing_the_app_does_not_load_http_client_or_bs4():
+    code = "import sys, main; print(','.join(m for m in ('httpx', 'h2', 'bs4') if m in sys.modules))"
+    loaded = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True)
+    assert loaded.stdout.strip() == ""
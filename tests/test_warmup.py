@@ -0,0 +1,132 @@
+import asyncio
+import pathlib
+import sys
+
+import pytest
+
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+TESTS = pathlib.Path(__file__).resolve().parent
+if str(TESTS) not in sys.path:
+    sys.path.insert(0, str(TESTS))
+
+try:
+    from fastapi.testclient import TestClient
+    from psalm_client import PsalmboekClient
+    from warmup import LeaderLock, PopularityTracker, Warmup, parse_psalm_list, prefetch_loop
+
+    import main
+except ImportError:  # pragma: no cover - allows skipping when deps ontbreken
+    TestClient = None  # type: ignore[assignment]
+
+pytestmark = pytest.mark.skipif(TestClient is None, reason="fastapi niet geïnstalleerd")
+
+
+def test_parse_psalm_list_skips_invalid_and_duplicates():
+    assert parse_psalm_list("23, 42,,x,23,151, 0,119") == [23, 42, 119]
+    assert parse_psalm_list("") == []
+
+
+def test_popularity_tracker_persists_top_n_with_decay(tmp_path):
+    path = tmp_path / "popularity.json"
+    tracker = PopularityTracker(str(path), keep=2)
+    for psalm in (23, 23, 23, 42, 42, 119):
+        tracker.record(psalm)
+    assert tracker.top(2) == [23, 42]
+    tracker.save()
+
+    restored = PopularityTracker(str(path))
+    restored.load()
+    assert restored.counts() == {23: 1.5, 42: 1.0}
+    restored.record(119)
+    restored.record(119)
+    assert restored.top(3) == [119, 23, 42]
+
+
+def test_warmup_loads_warm_set_with_bounded_concurrency():
+    from psalmboek_stub import PsalmboekStub
+
+    with PsalmboekStub(delay=0.02) as stub:
+        client = PsalmboekClient(stub.base_url, "1773", cache_seconds=600)
+        warmup = Warmup(client, [23, 42, 68, 23], concurrency=2, delay=0)
+        assert not warmup.ready
+        asyncio.run(warmup.run())
+        assert warmup.ready
+        assert sorted(warmup.loaded) == [23, 42, 68]
+        assert stub.request_count == 3
+
+        # Een tweede ronde vindt alles vers in de cache.
+        asyncio.run(Warmup(client, [23, 42, 68], delay=0).run())
+        assert stub.request_count == 3
+
+
+def test_prefetch_refreshes_only_entries_close_to_expiry():
+    from psalmboek_stub import PsalmboekStub
+
+    with PsalmboekStub() as stub:
+        client = PsalmboekClient(stub.base_url, "1773", cache_seconds=600)
+        vers_map = client.get_vers_map(23)
+        client.get_vers_map(42)
+        client._cache.set(("1773", 23), vers_map, age=590)
+        assert stub.request_count == 2
+
+        assert asyncio.run(client.aprefetch(23, margin=60)) is True
+        assert asyncio.run(client.aprefetch(42, margin=60)) is False
+        assert stub.request_count == 3
+        assert client._cache.age(("1773", 23)) < 1
+
+
+def test_prefetch_loop_runs_in_one_worker_only(tmp_path):
+    path = str(tmp_path / "prefetch.lock")
+    calls = []
+
+    class FakeClient:
+        async def aprefetch(self, psalm, margin=0.0):
+            calls.append(psalm)
+            return False
+
+    tracker = PopularityTracker(None)
+    tracker.record(23)
+    leader, follower = LeaderLock(path), LeaderLock(path)
+
+    async def rounds(lock):
+        task = asyncio.create_task(prefetch_loop(FakeClient(), tracker, top_n=1, interval=0.01, delay=0, lock=lock))
+        await asyncio.sleep(0.1)
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+
+    assert leader.acquire()
+    asyncio.run(rounds(follower))
+    assert calls == []
+
+    leader.release()  # leider gestopt: de volgende worker neemt het over
+    asyncio.run(rounds(follower))
+    assert calls and set(calls) == {23}
+    assert not leader.acquire()
+    follower.release()
+
+
+def test_readyz_reports_warming_up_until_warm_set_loaded(monkeypatch):
+    calls = []
+
+    class FakeClient:
+        async def aprefetch(self, psalm, margin=0.0):
+            calls.append(psalm)
+            if psalm == 42:
+                raise RuntimeError("bron onbereikbaar")
+            return True
+
+    warmup = Warmup(FakeClient(), [23, 42], delay=0)
+    monkeypatch.setattr(main, "warmup", warmup)
+    http = TestClient(main.app)
+
+    response = http.get("/readyz")
+    assert response.status_code == 503
+    assert response.json()["status"] == "warming_up"
+
+    asyncio.run(warmup.run())
+    response = http.get("/readyz")
+    assert response.status_code == 200
+    assert response.json()["warmup"]["failed"] == [42]
+    assert http.get("/healthz").json() == {"status": "ok"}
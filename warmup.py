@@ -0,0 +1,198 @@
+"""
+Opwarmen van de verscache na een herstart en populariteitsgestuurd vooruit verversen.
+
+- `PopularityTracker`: telt per psalm hoe vaak hij gevraagd wordt (één dict-increment per
+  verzoek) en bewaart de top-N als JSON, zodat de volgende start weet wat populair is.
+- `Warmup`: laadt bij het starten de warm-set (configuratie + bewaarde top-N) met begrensde
+  gelijktijdigheid en een pauze tussen upstream-requests. `/readyz` meldt pas "ready" als
+  de warm-set verwerkt is (psalmen die falen blokkeren readiness niet).
+- `prefetch_loop`: ververst de populairste psalmen op de achtergrond zodra hun cache-entry
+  binnen de marge verloopt, zodat gebruikers geen verlopen entry treffen. Met een `LeaderLock`
+  doet van alle uvicorn-workers op een host er maar één dat.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import os
+import pathlib
+import threading
+import time
+from typing import Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def parse_psalm_list(value: str) -> List[int]:
+    """"23, 42,68" → [23, 42, 68]; ongeldige of dubbele nummers vallen weg."""
+    psalms: List[int] = []
+    for part in value.split(","):
+        part = part.strip()
+        if part.isdigit() and 1 <= int(part) <= 150 and int(part) not in psalms:
+            psalms.append(int(part))
+    return psalms
+
+
+class PopularityTracker:
+    def __init__(self, path: Optional[str] = None, *, keep: int = 50):
+        self.path = pathlib.Path(path) if path else None
+        self.keep = keep
+        self._lock = threading.Lock()
+        self._counts: Dict[int, float] = {}
+
+    def record(self, psalm: int) -> None:
+        with self._lock:
+            self._counts[psalm] = self._counts.get(psalm, 0.0) + 1.0
+
+    def top(self, n: int) -> List[int]:
+        with self._lock:
+            ranked = sorted(self._counts.items(), key=lambda item: (-item[1], item[0]))
+        return [psalm for psalm, _ in ranked[:n]]
+
+    def counts(self) -> Dict[int, float]:
+        with self._lock:
+            return dict(self._counts)
+
+    def load(self) -> None:
+        """Leest de vorige top-N; oude tellingen wegen half, zodat recente populariteit wint."""
+        if self.path is None or not self.path.exists():
+            return
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+            previous = {int(psalm): float(count) / 2 for psalm, count in data["counts"].items()}
+        except (OSError, ValueError, KeyError, TypeError) as exc:
+            logger.warning("Populariteitsbestand %s niet leesbaar: %s", self.path, exc)
+            return
+        with self._lock:
+            for psalm, count in previous.items():
+                self._counts[psalm] = self._counts.get(psalm, 0.0) + count
+
+    def save(self) -> None:
+        """Schrijft de top `keep` atomair weg (no-op zonder pad)."""
+        if self.path is None:
+            return
+        counts = self.counts()
+        top = {str(psalm): round(counts[psalm], 3) for psalm in self.top(self.keep)}
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.path.with_name(self.path.name + ".tmp")
+            tmp_path.write_text(json.dumps({"counts": top}, indent=2) + "\n", encoding="utf-8")
+            os.replace(tmp_path, self.path)
+        except OSError as exc:
+            logger.warning("Populariteitsbestand %s niet schrijfbaar: %s", self.path, exc)
+
+
+class Warmup:
+    def __init__(self, client, psalms: Iterable[int], *, concurrency: int = 2, delay: float = 0.5):
+        self.client = client
+        self.psalms = list(dict.fromkeys(psalms))
+        self.concurrency = max(1, concurrency)
+        self.delay = delay
+        self.state = "pending"
+        self.loaded: List[int] = []
+        self.failed: List[int] = []
+        self.seconds: Optional[float] = None
+
+    @property
+    def ready(self) -> bool:
+        return self.state == "done" or not self.psalms
+
+    async def run(self) -> None:
+        self.state = "running"
+        started = time.perf_counter()
+        queue: "asyncio.Queue[int]" = asyncio.Queue()
+        for psalm in self.psalms:
+            queue.put_nowait(psalm)
+
+        async def worker() -> None:
+            while not queue.empty():
+                psalm = queue.get_nowait()
+                try:
+                    fetched = await self.client.aprefetch(psalm)
+                except Exception as exc:
+                    logger.warning("Opwarmen van psalm %s faalde: %s", psalm, exc)
+                    self.failed.append(psalm)
+                    continue
+                self.loaded.append(psalm)
+                if fetched and self.delay:
+                    # Beleefd naar psalmboek.nl: per worker een pauze na elke echte fetch.
+                    await asyncio.sleep(self.delay)
+
+        try:
+            await asyncio.gather(*(worker() for _ in range(min(self.concurrency, len(self.psalms)))))
+        finally:
+            self.state = "done"
+            self.seconds = round(time.perf_counter() - started, 3)
+            logger.info("Warm-set geladen: %d psalmen, %d mislukt, %ss", len(self.loaded), len(self.failed), self.seconds)
+
+    def status(self) -> Dict[str, object]:
+        return {
+            "state": "done" if self.ready else self.state,
+            "psalms": len(self.psalms),
+            "loaded": len(self.loaded),
+            "failed": sorted(self.failed),
+            "seconds": self.seconds,
+        }
+
+
+class LeaderLock:
+    """
+    Niet-blokkerende flock op een bestand: van alle processen die hetzelfde pad gebruiken houdt
+    er één de lock vast, tot het stopt. Zonder pad (of zonder fcntl) is elk proces leider.
+    """
+
+    def __init__(self, path: Optional[str]):
+        self.path = path
+        self._handle = None
+
+    def acquire(self) -> bool:
+        if self._handle is not None or not self.path:
+            return True
+        try:
+            import fcntl
+        except ImportError:  # pragma: no cover - geen flock op Windows
+            return True
+        handle = open(self.path, "a")
+        try:
+            fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            handle.close()
+            return False
+        self._handle = handle
+        return True
+
+    def release(self) -> None:
+        if self._handle is not None:
+            self._handle.close()
+            self._handle = None
+
+
+async def prefetch_loop(
+    client,
+    tracker: PopularityTracker,
+    *,
+    top_n: int,
+    interval: float,
+    delay: float = 0.5,
+    lock: Optional[LeaderLock] = None,
+) -> None:
+    """
+    Ververst elke `interval` seconden de top-N psalmen die binnen 2×interval verlopen.
+    Met `lock` slaat een worker de ronde over zolang een andere worker leider is; stopt die,
+    dan neemt een volgende het bij de eerstvolgende ronde over.
+    """
+    while True:
+        await asyncio.sleep(interval)
+        if lock is not None and not lock.acquire():
+            continue
+        for psalm in tracker.top(top_n):
+            try:
+                fetched = await client.aprefetch(psalm, margin=2 * interval)
+            except Exception as exc:
+                logger.warning("Vooruit verversen van psalm %s faalde: %s", psalm, exc)
+                continue
+            if fetched and delay:
+                await asyncio.sleep(delay)
+        await asyncio.to_thread(tracker.save)